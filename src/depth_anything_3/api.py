@@ -21,6 +21,7 @@ inference, and export capabilities. It supports both single and nested model arc
 from __future__ import annotations
 
 import time
+from concurrent.futures import Future
 from typing import Optional, Sequence
 import numpy as np
 import torch
@@ -33,9 +34,11 @@ from depth_anything_3.registry import MODEL_REGISTRY
 from depth_anything_3.specs import Prediction
 from depth_anything_3.utils.export import export
 from depth_anything_3.utils.geometry import affine_inverse
+from depth_anything_3.utils.io.aux_store import AuxFeatureSink
 from depth_anything_3.utils.io.input_processor import InputProcessor
 from depth_anything_3.utils.io.output_processor import OutputProcessor
 from depth_anything_3.utils.logger import logger
+from depth_anything_3.utils.parallel_utils import get_export_executor
 from depth_anything_3.utils.pose_align import align_poses_umeyama
 
 torch.backends.cudnn.benchmark = False
@@ -104,6 +107,8 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         intrinsics: torch.Tensor | None = None,
         export_feat_layers: list[int] | None = None,
         infer_gs: bool = False,
+        valid_mask: torch.Tensor | None = None,
+        aux_sink: AuxFeatureSink | None = None,
     ) -> dict[str, torch.Tensor]:
         """
         Forward pass through the model.
@@ -113,6 +118,8 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
             extrinsics: Optional camera extrinsics with shape ``(B, N, 4, 4)``.
             intrinsics: Optional camera intrinsics with shape ``(B, N, 3, 3)``.
             export_feat_layers: Layer indices to return intermediate features for.
+            valid_mask: Optional ``(B, N, H, W)`` bool mask of non-padded pixels.
+            aux_sink: Optional ``AuxFeatureSink`` that stores the exported layers on disk.
 
         Returns:
             Dictionary containing model predictions
@@ -121,7 +128,15 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         autocast_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
         with torch.no_grad():
             with torch.autocast(device_type=image.device.type, dtype=autocast_dtype):
-                return self.model(image, extrinsics, intrinsics, export_feat_layers, infer_gs)
+                return self.model(
+                    image,
+                    extrinsics,
+                    intrinsics,
+                    export_feat_layers,
+                    infer_gs,
+                    valid_mask=valid_mask,
+                    aux_sink=aux_sink,
+                )
 
     def inference(
         self,
@@ -135,9 +150,13 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         render_hw: tuple[int, int] | None = None,
         process_res: int = 504,
         process_res_method: str = "upper_bound_resize",
+        batch_shape_mode: str = "crop",
         export_dir: str | None = None,
         export_format: str = "mini_npz",
         export_feat_layers: Sequence[int] | None = None,
+        aux_sink: AuxFeatureSink | None = None,
+        lazy_outputs: bool = False,
+        async_export: bool = False,
         # GLB export parameters
         conf_thresh_percentile: float = 40.0,
         num_max_points: int = 1_000_000,
@@ -161,9 +180,22 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
             render_hw: Optional render resolution for Gaussian video export
             process_res: Processing resolution
             process_res_method: Resize method for processing
+            batch_shape_mode: How to unify images of different sizes. "crop" center-crops all
+                views to the smallest size; "pad" center-pads them to the largest size, masks
+                padded patches out of attention and stores the valid region in
+                ``Prediction.valid_mask``
             export_dir: Directory to export results
-            export_format: Export format (mini_npz, npz, glb, ply, gs, gs_video)
+            export_format: Export format (mini_npz, npz, da3store, glb, ply, gs, gs_video)
             export_feat_layers: Layer indices to export intermediate features from
+            aux_sink: Optional ``AuxFeatureSink`` (``utils/io/aux_store.py``): the exported
+                layers are pooled / projected / compressed and written to disk during the
+                forward, and ``prediction.aux`` holds memory-mapped ``AuxFeatureHandle``s
+            lazy_outputs: Keep prediction arrays on the model device and copy them to host only
+                when first accessed (useful when only poses or a few frames are needed, or
+                when ``export_feat_layers`` produces large features)
+            async_export: Run the whole export on the shared export executor and return
+                immediately; call ``wait_exports()`` before reading the exported files. The
+                prediction must not be modified while its export is pending
             conf_thresh_percentile: [GLB] Lower percentile for adaptive confidence threshold (default: 40.0) # noqa: E501
             num_max_points: [GLB] Maximum number of points in the point cloud (default: 1,000,000)
             show_cameras: [GLB] Show camera wireframes in the exported scene (default: True)
@@ -180,12 +212,13 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
             assert isinstance(image[0], str), "`image` must be image paths for COLMAP export."
 
         # Preprocess images
-        imgs_cpu, extrinsics, intrinsics = self._preprocess_inputs(
-            image, extrinsics, intrinsics, process_res, process_res_method
+        imgs_cpu, extrinsics, intrinsics, valid_mask = self._preprocess_inputs(
+            image, extrinsics, intrinsics, process_res, process_res_method, batch_shape_mode
         )
 
         # Prepare tensors for model
         imgs, ex_t, in_t = self._prepare_model_inputs(imgs_cpu, extrinsics, intrinsics)
+        mask_t = self._prepare_valid_mask(valid_mask, imgs.device)
 
         # Normalize extrinsics
         ex_t_norm = self._normalize_extrinsics(ex_t.clone() if ex_t is not None else None)
@@ -193,10 +226,18 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         # Run model forward pass
         export_feat_layers = list(export_feat_layers) if export_feat_layers is not None else []
 
-        raw_output = self._run_model_forward(imgs, ex_t_norm, in_t, export_feat_layers, infer_gs)
+        raw_output = self._run_model_forward(
+            imgs,
+            ex_t_norm,
+            in_t,
+            export_feat_layers,
+            infer_gs,
+            valid_mask=mask_t,
+            aux_sink=aux_sink,
+        )
 
         # Convert raw output to prediction
-        prediction = self._convert_to_prediction(raw_output)
+        prediction = self._convert_to_prediction(raw_output, lazy=lazy_outputs)
 
         # Align prediction to extrinsincs
         prediction = self._align_to_input_extrinsics_intrinsics(
@@ -205,57 +246,160 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
 
         # Add processed images for visualization
         prediction = self._add_processed_images(prediction, imgs_cpu)
+        if valid_mask is not None:
+            prediction.valid_mask = valid_mask.numpy()
 
         # Export if requested
         if export_dir is not None:
+            self.export_prediction(
+                prediction,
+                export_dir,
+                export_format,
+                image=image,
+                infer_gs=infer_gs,
+                render_exts=render_exts,
+                render_ixts=render_ixts,
+                render_hw=render_hw,
+                process_res_method=process_res_method,
+                async_export=async_export,
+                conf_thresh_percentile=conf_thresh_percentile,
+                num_max_points=num_max_points,
+                show_cameras=show_cameras,
+                feat_vis_fps=feat_vis_fps,
+                export_kwargs=export_kwargs,
+            )
+
+        if aux_sink is not None:
+            # handles wait for their own files; this completes the store's index.json
+            aux_sink.flush()
+        return prediction
 
-            if "gs" in export_format:
-                if infer_gs and "gs_video" not in export_format:
-                    export_format = f"{export_format}-gs_video"
-                if "gs_video" in export_format:
-                    if "gs_video" not in export_kwargs:
-                        export_kwargs["gs_video"] = {}
-                    export_kwargs["gs_video"].update(
-                        {
-                            "extrinsics": render_exts,
-                            "intrinsics": render_ixts,
-                            "out_image_hw": render_hw,
-                        }
-                    )
-            # Add GLB export parameters
-            if "glb" in export_format:
-                if "glb" not in export_kwargs:
-                    export_kwargs["glb"] = {}
-                export_kwargs["glb"].update(
-                    {
-                        "conf_thresh_percentile": conf_thresh_percentile,
-                        "num_max_points": num_max_points,
-                        "show_cameras": show_cameras,
-                    }
-                )
-            # Add Feat_vis export parameters
-            if "feat_vis" in export_format:
-                if "feat_vis" not in export_kwargs:
-                    export_kwargs["feat_vis"] = {}
-                export_kwargs["feat_vis"].update(
-                    {
-                        "fps": feat_vis_fps,
-                    }
-                )
-            # Add COLMAP export parameters
-            if "colmap" in export_format:
-                if "colmap" not in export_kwargs:
-                    export_kwargs["colmap"] = {}
-                export_kwargs["colmap"].update(
+    def inference_batch(
+        self,
+        images: list[list[np.ndarray | Image.Image | str]],
+        process_res: int = 504,
+        process_res_method: str = "upper_bound_resize",
+        export_feat_layers: Sequence[int] | None = None,
+        lazy_outputs: bool = False,
+        max_batch_size: int | None = None,
+    ) -> list[Prediction]:
+        """
+        Run several independent scenes (without input cameras) with batched forward passes.
+
+        Scenes whose processed inputs share one ``(N, 3, H, W)`` shape are stacked along the
+        batch axis, at most ``max_batch_size`` per forward; every scene still only attends
+        to its own views. Nested (metric) models fit one metric scale per forward, so they
+        run one scene per forward.
+
+        Args:
+            images: One list of images per scene
+            process_res, process_res_method, export_feat_layers, lazy_outputs: As in
+                ``inference``
+
+        Returns:
+            One unexported ``Prediction`` per scene, in input order (see ``export_prediction``)
+        """
+        feat_layers = list(export_feat_layers) if export_feat_layers is not None else []
+        inputs = [
+            self._preprocess_inputs(scene, None, None, process_res, process_res_method)[0]
+            for scene in images
+        ]
+        batchable = getattr(self.model, "da3_metric", None) is None
+        max_batch_size = max(1, max_batch_size or len(inputs))
+        groups: dict = {}
+        for i, imgs_cpu in enumerate(inputs):
+            groups.setdefault(tuple(imgs_cpu.shape) if batchable else i, []).append(i)
+
+        device = self._get_model_device()
+        predictions = [None] * len(inputs)
+        for members in groups.values():
+            for start in range(0, len(members), max_batch_size):
+                chunk = members[start : start + max_batch_size]
+                imgs = torch.stack([inputs[i] for i in chunk]).to(device, non_blocking=True)
+                raw_output = self._run_model_forward(imgs.float(), None, None, feat_layers)
+                for b, i in enumerate(chunk):
+                    scene_output = _select_scene(raw_output, b, len(chunk))
+                    prediction = self._convert_to_prediction(scene_output, lazy=lazy_outputs)
+                    predictions[i] = self._add_processed_images(prediction, inputs[i])
+        return predictions
+
+    def export_prediction(
+        self,
+        prediction: Prediction,
+        export_dir: str,
+        export_format: str = "mini_npz",
+        image: list[np.ndarray | Image.Image | str] | None = None,
+        infer_gs: bool = False,
+        render_exts: np.ndarray | None = None,
+        render_ixts: np.ndarray | None = None,
+        render_hw: tuple[int, int] | None = None,
+        process_res_method: str = "upper_bound_resize",
+        async_export: bool = False,
+        conf_thresh_percentile: float = 40.0,
+        num_max_points: int = 1_000_000,
+        show_cameras: bool = True,
+        feat_vis_fps: int = 15,
+        export_kwargs: Optional[dict] = None,
+    ) -> list[Future]:
+        """
+        Export a prediction the way ``inference(export_dir=...)`` does.
+
+        Arguments mirror ``inference``; ``image`` is only needed for COLMAP export.
+
+        Returns:
+            Futures of exports still running in the background.
+        """
+        export_kwargs = {k: dict(v) for k, v in (export_kwargs or {}).items()}
+        # start the remaining device-to-host copies so they overlap with export setup
+        prediction.prefetch()
+
+        if "gs" in export_format:
+            if infer_gs and "gs_video" not in export_format:
+                export_format = f"{export_format}-gs_video"
+            if "gs_video" in export_format:
+                if "gs_video" not in export_kwargs:
+                    export_kwargs["gs_video"] = {}
+                export_kwargs["gs_video"].update(
                     {
-                        "image_paths": image,
-                        "conf_thresh_percentile": conf_thresh_percentile,
-                        "process_res_method": process_res_method,
+                        "extrinsics": render_exts,
+                        "intrinsics": render_ixts,
+                        "out_image_hw": render_hw,
                     }
                 )
-            self._export_results(prediction, export_format, export_dir, **export_kwargs)
-
-        return prediction
+        # Add GLB export parameters
+        if "glb" in export_format:
+            if "glb" not in export_kwargs:
+                export_kwargs["glb"] = {}
+            export_kwargs["glb"].update(
+                {
+                    "conf_thresh_percentile": conf_thresh_percentile,
+                    "num_max_points": num_max_points,
+                    "show_cameras": show_cameras,
+                }
+            )
+        # Add Feat_vis export parameters
+        if "feat_vis" in export_format:
+            if "feat_vis" not in export_kwargs:
+                export_kwargs["feat_vis"] = {}
+            export_kwargs["feat_vis"].update(
+                {
+                    "fps": feat_vis_fps,
+                }
+            )
+        # Add COLMAP export parameters
+        if "colmap" in export_format:
+            if "colmap" not in export_kwargs:
+                export_kwargs["colmap"] = {}
+            export_kwargs["colmap"].update(
+                {
+                    "image_paths": image,
+                    "conf_thresh_percentile": conf_thresh_percentile,
+                    "process_res_method": process_res_method,
+                }
+            )
+        return self._export_results(
+            prediction, export_format, export_dir, async_export=async_export, **export_kwargs
+        )
 
     def _preprocess_inputs(
         self,
@@ -264,15 +408,18 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         intrinsics: np.ndarray | None = None,
         process_res: int = 504,
         process_res_method: str = "upper_bound_resize",
-    ) -> tuple[torch.Tensor, torch.Tensor | None, torch.Tensor | None]:
+        batch_shape_mode: str = "crop",
+    ) -> tuple[torch.Tensor, torch.Tensor | None, torch.Tensor | None, torch.Tensor | None]:
         """Preprocess input images using input processor."""
         start_time = time.time()
-        imgs_cpu, extrinsics, intrinsics = self.input_processor(
+        imgs_cpu, extrinsics, intrinsics, valid_mask = self.input_processor(
             image,
             extrinsics.copy() if extrinsics is not None else None,
             intrinsics.copy() if intrinsics is not None else None,
             process_res,
             process_res_method,
+            batch_shape_mode=batch_shape_mode,
+            return_valid_mask=True,
         )
         end_time = time.time()
         logger.info(
@@ -281,7 +428,7 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
             "seconds. Shape: ",
             imgs_cpu.shape,
         )
-        return imgs_cpu, extrinsics, intrinsics
+        return imgs_cpu, extrinsics, intrinsics, valid_mask
 
     def _prepare_model_inputs(
         self,
@@ -309,6 +456,14 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
 
         return imgs, ex_t, in_t
 
+    def _prepare_valid_mask(
+        self, valid_mask: torch.Tensor | None, device: torch.device
+    ) -> torch.Tensor | None:
+        """Move the (N, H, W) valid-region mask to the model device as (1, N, H, W)."""
+        if valid_mask is None:
+            return None
+        return valid_mask.to(device, non_blocking=True)[None]
+
     def _normalize_extrinsics(self, ex_t: torch.Tensor | None) -> torch.Tensor | None:
         """Normalize extrinsics"""
         if ex_t is None:
@@ -356,6 +511,8 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         in_t: torch.Tensor | None,
         export_feat_layers: Sequence[int] | None = None,
         infer_gs: bool = False,
+        valid_mask: torch.Tensor | None = None,
+        aux_sink: AuxFeatureSink | None = None,
     ) -> dict[str, torch.Tensor]:
         """Run model forward pass."""
         device = imgs.device
@@ -364,17 +521,21 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
             torch.cuda.synchronize(device)
         start_time = time.time()
         feat_layers = list(export_feat_layers) if export_feat_layers is not None else None
-        output = self.forward(imgs, ex_t, in_t, feat_layers, infer_gs)
+        output = self.forward(
+            imgs, ex_t, in_t, feat_layers, infer_gs, valid_mask=valid_mask, aux_sink=aux_sink
+        )
         if need_sync:
             torch.cuda.synchronize(device)
         end_time = time.time()
         logger.info(f"Model Forward Pass Done. Time: {end_time - start_time} seconds")
         return output
 
-    def _convert_to_prediction(self, raw_output: dict[str, torch.Tensor]) -> Prediction:
+    def _convert_to_prediction(
+        self, raw_output: dict[str, torch.Tensor], lazy: bool = False
+    ) -> Prediction:
         """Convert raw model output to Prediction object."""
         start_time = time.time()
-        output = self.output_processor(raw_output)
+        output = self.output_processor(raw_output, lazy=lazy)
         end_time = time.time()
         logger.info(f"Conversion to Prediction Done. Time: {end_time - start_time} seconds")
         return output
@@ -395,13 +556,53 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
         return prediction
 
     def _export_results(
-        self, prediction: Prediction, export_format: str, export_dir: str, **kwargs
-    ) -> None:
-        """Export results to specified format and directory."""
+        self,
+        prediction: Prediction,
+        export_format: str,
+        export_dir: str,
+        async_export: bool = False,
+        **kwargs,
+    ) -> list[Future]:
+        """
+        Export results to specified format and directory.
+
+        Returns:
+            Futures of exports still running in the background.
+        """
+        if async_export:
+            future = get_export_executor().submit(
+                export, prediction, export_format, export_dir, tag="export", **kwargs
+            )
+            return [future]
         start_time = time.time()
-        export(prediction, export_format, export_dir, **kwargs)
+        futures = export(prediction, export_format, export_dir, **kwargs)
         end_time = time.time()
         logger.info(f"Export Results Done. Time: {end_time - start_time} seconds")
+        return futures
+
+    def wait_exports(self, timeout: float | None = None) -> bool:
+        """
+        Block until all background exports have finished.
+
+        Args:
+            timeout: Maximum number of seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if all exports finished, False if the timeout expired first
+
+        Raises:
+            The first error raised by a finished background export
+        """
+        executor = get_export_executor()
+        done = executor.wait(timeout=timeout)
+        for name, stat in executor.stats().items():
+            logger.info(
+                f"Export timing [{name}]: {stat['count']} job(s), "
+                f"mean {stat['mean_s']:.3f}s, max {stat['max_s']:.3f}s"
+            )
+        return done
+
+    flush_exports = wait_exports
 
     def _get_model_device(self) -> torch.device:
         """
@@ -427,3 +628,29 @@ class DepthAnything3(nn.Module, PyTorchModelHubMixin):
             return buffer.device
 
         raise ValueError("No tensor found in model")
+
+
+# Model outputs stacked along the scene axis; "aux" holds one such tensor per layer
+BATCHED_OUTPUT_KEYS = ("depth", "depth_conf", "ray", "ray_conf", "sky", "extrinsics", "intrinsics")
+
+
+def _select_scene(output: dict, index: int, batch_size: int) -> dict:
+    """
+    Scene ``index`` of a batched model output, keeping a batch dim of 1. Only the
+    ``BATCHED_OUTPUT_KEYS`` and the ``aux`` layers are sliced; other entries are shared.
+    """
+
+    def take(key: str, value: torch.Tensor) -> torch.Tensor:
+        if not isinstance(value, torch.Tensor) or value.shape[:1] != (batch_size,):
+            raise ValueError(f"Output '{key}' is not batched over {batch_size} scenes")
+        return value[index : index + 1]
+
+    scene = type(output)()
+    for key, value in output.items():
+        if key in BATCHED_OUTPUT_KEYS and value is not None:
+            scene[key] = take(key, value)
+        elif key == "aux" and value:
+            scene[key] = type(value)({name: take(name, feat) for name, feat in value.items()})
+        else:
+            scene[key] = value
+    return scene
@@ -587,6 +587,10 @@ def backend(
     host: str = typer.Option("127.0.0.1", help="Host to bind to"),
     port: int = typer.Option(8008, help="Port to bind to"),
     gallery_dir: str = typer.Option(DEFAULT_GALLERY_DIR, help="Gallery directory path (optional)"),
+    batch_window_ms: float = typer.Option(
+        50.0, help="Max extra latency a request waits for batch partners (ms)"
+    ),
+    max_batch_size: int = typer.Option(8, help="Max requests sharing one forward (1 disables)"),
 ):
     """Start model backend service with integrated gallery."""
     typer.echo("=" * 60)
@@ -613,7 +617,7 @@ def backend(
     typer.echo("=" * 60)
 
     try:
-        start_server(model_dir, device, host, port, gallery_dir)
+        start_server(model_dir, device, host, port, gallery_dir, batch_window_ms, max_batch_size)
     except KeyboardInterrupt:
         typer.echo("\n👋 Backend server stopped.")
     except Exception as e:
@@ -30,6 +30,7 @@ from depth_anything_3.utils.alignment import (
     set_sky_regions_to_max_depth,
 )
 from depth_anything_3.utils.geometry import affine_inverse, as_homogeneous, map_pdf_to_opacity
+from depth_anything_3.utils.io.aux_store import AuxFeatureSink
 
 
 def _wrap_cfg(cfg_obj):
@@ -103,6 +104,8 @@ class DepthAnything3Net(nn.Module):
         intrinsics: torch.Tensor | None = None,
         export_feat_layers: list[int] | None = [],
         infer_gs: bool = False,
+        valid_mask: torch.Tensor | None = None,
+        aux_sink: AuxFeatureSink | None = None,
     ) -> Dict[str, torch.Tensor]:
         """
         Forward pass through the network.
@@ -112,6 +115,10 @@ class DepthAnything3Net(nn.Module):
             extrinsics: Camera extrinsics (B, N, 4, 4) - unused
             intrinsics: Camera intrinsics (B, N, 3, 3) - unused
             feat_layers: List of layer indices to extract features from
+            valid_mask: Optional (B, N, H, W) bool mask of non-padded pixels; padded
+                patches are excluded from attention
+            aux_sink: Optional ``AuxFeatureSink``; the exported layers are written to disk
+                as soon as the backbone returns and ``aux`` holds their handles
 
         Returns:
             Dictionary containing predictions and auxiliary features
@@ -124,10 +131,13 @@ class DepthAnything3Net(nn.Module):
             cam_token = None
 
         feats, aux_feats = self.backbone(
-            x, cam_token=cam_token, export_feat_layers=export_feat_layers
+            x, cam_token=cam_token, export_feat_layers=export_feat_layers, valid_mask=valid_mask
         )
         # feats = [[item for item in feat] for feat in feats]
         H, W = x.shape[-2], x.shape[-1]
+        # Extract auxiliary features if requested (written out before the heads run)
+        aux = self._extract_auxiliary_features(aux_feats, export_feat_layers, H, W, aux_sink)
+        del aux_feats
 
         # Process features through depth head
         with torch.autocast(device_type=x.device.type, enabled=False):
@@ -136,8 +146,7 @@ class DepthAnything3Net(nn.Module):
             if infer_gs:
                 output = self._process_gs_head(feats, H, W, output, x, extrinsics, intrinsics)
 
-        # Extract auxiliary features if requested
-        output.aux = self._extract_auxiliary_features(aux_feats, export_feat_layers, H, W)
+        output.aux = aux
 
         return output
 
@@ -223,9 +232,14 @@ class DepthAnything3Net(nn.Module):
         return output
 
     def _extract_auxiliary_features(
-        self, feats: list[torch.Tensor], feat_layers: list[int], H: int, W: int
+        self,
+        feats: list[torch.Tensor],
+        feat_layers: list[int],
+        H: int,
+        W: int,
+        aux_sink: AuxFeatureSink | None = None,
     ) -> Dict[str, torch.Tensor]:
-        """Extract auxiliary features from specified layers."""
+        """Extract auxiliary features from specified layers (handles if ``aux_sink``)."""
         aux_features = Dict()
         assert len(feats) == len(feat_layers)
         for feat, feat_layer in zip(feats, feat_layers):
@@ -239,7 +253,11 @@ class DepthAnything3Net(nn.Module):
                     feat.shape[-1],
                 ]
             )
-            aux_features[f"feat_layer_{feat_layer}"] = feat_reshaped
+            name = f"feat_layer_{feat_layer}"
+            if aux_sink is not None:
+                aux_features[name] = aux_sink.write(name, feat_reshaped)
+            else:
+                aux_features[name] = feat_reshaped
 
         return aux_features
 
@@ -279,6 +297,8 @@ class NestedDepthAnything3Net(nn.Module):
         intrinsics: torch.Tensor | None = None,
         export_feat_layers: list[int] | None = [],
         infer_gs: bool = False,
+        valid_mask: torch.Tensor | None = None,
+        aux_sink: AuxFeatureSink | None = None,
     ) -> Dict[str, torch.Tensor]:
         """
         Forward pass through both branches with metric scaling alignment.
@@ -289,20 +309,28 @@ class NestedDepthAnything3Net(nn.Module):
             intrinsics: Camera intrinsics (B, N, 3, 3) - unused
             feat_layers: List of layer indices to extract features from
             metric_feat: Whether to use metric features (unused)
+            valid_mask: Optional (B, N, H, W) bool mask of non-padded pixels
+            aux_sink: Optional ``AuxFeatureSink`` for the exported layers
 
         Returns:
             Dictionary containing aligned depth predictions and camera parameters
         """
         # Get predictions from both branches
         output = self.da3(
-            x, extrinsics, intrinsics, export_feat_layers=export_feat_layers, infer_gs=infer_gs
+            x,
+            extrinsics,
+            intrinsics,
+            export_feat_layers=export_feat_layers,
+            infer_gs=infer_gs,
+            valid_mask=valid_mask,
+            aux_sink=aux_sink,
         )
-        metric_output = self.da3_metric(x, infer_gs=infer_gs)
+        metric_output = self.da3_metric(x, infer_gs=infer_gs, valid_mask=valid_mask)
 
         # Apply metric scaling and alignment
         output = self._apply_metric_scaling(output, metric_output)
-        output = self._apply_depth_alignment(output, metric_output)
-        output = self._handle_sky_regions(output, metric_output)
+        output = self._apply_depth_alignment(output, metric_output, valid_mask)
+        output = self._handle_sky_regions(output, metric_output, valid_mask=valid_mask)
 
         return output
 
@@ -318,11 +346,16 @@ class NestedDepthAnything3Net(nn.Module):
         return output
 
     def _apply_depth_alignment(
-        self, output: Dict[str, torch.Tensor], metric_output: Dict[str, torch.Tensor]
+        self,
+        output: Dict[str, torch.Tensor],
+        metric_output: Dict[str, torch.Tensor],
+        valid_mask: torch.Tensor | None = None,
     ) -> Dict[str, torch.Tensor]:
         """Apply depth alignment using least squares scaling."""
-        # Compute non-sky mask
+        # Compute non-sky mask (padded pixels never take part in the alignment)
         non_sky_mask = compute_sky_mask(metric_output.sky, threshold=0.3)
+        if valid_mask is not None:
+            non_sky_mask = non_sky_mask & valid_mask
 
         # Ensure we have enough non-sky pixels
         assert non_sky_mask.sum() > 10, "Insufficient non-sky pixels for alignment"
@@ -355,13 +388,19 @@ class NestedDepthAnything3Net(nn.Module):
         output: Dict[str, torch.Tensor],
         metric_output: Dict[str, torch.Tensor],
         sky_depth_def: float = 200.0,
+        valid_mask: torch.Tensor | None = None,
     ) -> Dict[str, torch.Tensor]:
         """Handle sky regions by setting them to maximum depth."""
         non_sky_mask = compute_sky_mask(metric_output.sky, threshold=0.3)
 
         # Compute maximum depth for non-sky regions
         # Use sampling to safely compute quantile on large tensors
-        non_sky_depth = output.depth[non_sky_mask]
+        if valid_mask is not None:
+            non_sky_depth = output.depth[non_sky_mask & valid_mask]
+            # padded pixels are left untouched rather than treated as sky
+            non_sky_mask = non_sky_mask | ~valid_mask
+        else:
+            non_sky_depth = output.depth[non_sky_mask]
         if non_sky_depth.numel() > 100000:
             idx = torch.randint(0, non_sky_depth.numel(), (100000,), device=non_sky_depth.device)
             sampled_depth = non_sky_depth[idx]
@@ -12,6 +12,7 @@ from typing import Callable, List, Sequence, Tuple, Union
 import numpy as np
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.utils.checkpoint
 from einops import rearrange
 
@@ -291,12 +292,38 @@ class DinoVisionTransformer(nn.Module):
                 pos_nodiff = torch.cat([pos_special, pos_nodiff], dim=2)
         return pos, pos_nodiff
 
+    def _prepare_padding_masks(self, valid_mask, B, S):
+        """
+        Build key-padding attention masks from a pixel-level valid mask (B, S, H, W).
+
+        Returns (local_mask, global_mask) with shapes ((B S), 1, n) and (B, 1, (S n)), where
+        True marks tokens that may be attended to. Special tokens are always valid.
+        """
+        if valid_mask is None:
+            return None, None
+        patch_valid = F.max_pool2d(
+            rearrange(valid_mask, "b s h w -> (b s) () h w").float(), self.patch_size
+        )
+        patch_valid = patch_valid.flatten(1) > 0  # (B S), hw
+        special = torch.ones(
+            (patch_valid.shape[0], 1 + self.num_register_tokens),
+            dtype=torch.bool,
+            device=patch_valid.device,
+        )
+        token_valid = torch.cat([special, patch_valid], dim=1)  # (B S), n
+        local_mask = token_valid[:, None]
+        global_mask = rearrange(token_valid, "(b s) n -> b () (s n)", b=B, s=S)
+        return local_mask, global_mask
+
     def _get_intermediate_layers_not_chunked(self, x, n=1, export_feat_layers=[], **kwargs):
         B, S, _, H, W = x.shape
         x = self.prepare_tokens_with_masks(x)
         output, total_block_len, aux_output = [], len(self.blocks), []
         blocks_to_take = range(total_block_len - n, total_block_len) if isinstance(n, int) else n
         pos, pos_nodiff = self._prepare_rope(B, S, H, W, x.device)
+        local_mask, global_mask = self._prepare_padding_masks(kwargs.get("valid_mask", None), B, S)
+        if kwargs.get("attn_mask", None) is not None:
+            global_mask = kwargs.get("attn_mask")
 
         for i, blk in enumerate(self.blocks):
             if i < self.rope_start or self.rope is None:
@@ -315,11 +342,9 @@ class DinoVisionTransformer(nn.Module):
                 x[:, :, 0] = cam_token
 
             if self.alt_start != -1 and i >= self.alt_start and i % 2 == 1:
-                x = self.process_attention(
-                    x, blk, "global", pos=g_pos, attn_mask=kwargs.get("attn_mask", None)
-                )
+                x = self.process_attention(x, blk, "global", pos=g_pos, attn_mask=global_mask)
             else:
-                x = self.process_attention(x, blk, "local", pos=l_pos)
+                x = self.process_attention(x, blk, "local", pos=l_pos, attn_mask=local_mask)
                 local_x = x
 
             if i in blocks_to_take:
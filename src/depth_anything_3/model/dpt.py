@@ -170,7 +170,7 @@ class DPT(nn.Module):
             feats: List of 4 entries, each entry is a tensor like [B, S, T, C] (or the 0th element of tuple/list is that tensor).
             H, W:  Original image dimensions
             patch_start_idx: Starting index of patch tokens in sequence (for cropping non-patch tokens)
-            chunk_size:      Chunk size along time dimension S
+            chunk_size:      Chunk size along the flattened B*S frames
 
         Returns:
             Dict[str, Tensor]
@@ -183,14 +183,16 @@ class DPT(nn.Module):
         if "images" in kwargs:
             extra_kwargs.update({"images": rearrange(kwargs["images"], "B S ... -> (B S) ...")})
 
-        if chunk_size is None or chunk_size >= S:
+        # chunk the flattened frames so every scene of a B > 1 batch is covered
+        num_frames = B * S
+        if chunk_size is None or chunk_size >= num_frames:
             out_dict = self._forward_impl(feats, H, W, patch_start_idx, **extra_kwargs)
             out_dict = {k: v.view(B, S, *v.shape[1:]) for k, v in out_dict.items()}
             return Dict(out_dict)
 
         out_dicts: List[TyDict[str, torch.Tensor]] = []
-        for s0 in range(0, S, chunk_size):
-            s1 = min(s0 + chunk_size, S)
+        for s0 in range(0, num_frames, chunk_size):
+            s1 = min(s0 + chunk_size, num_frames)
             kw = {}
             if "images" in extra_kwargs:
                 kw.update({"images": extra_kwargs["images"][s0:s1]})
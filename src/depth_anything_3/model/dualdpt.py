@@ -166,7 +166,7 @@ class DualDPT(nn.Module):
             aggregated_tokens_list: List of 4 tensors [B, S, T, C] from transformer.
             images:                [B, S, 3, H, W], in [0, 1].
             patch_start_idx:       Patch-token start in the token sequence (to drop non-patch tokens).
-            frames_chunk_size:     Optional chunking along S for memory.
+            chunk_size:            Optional chunking along the flattened B*S frames for memory.
 
         Returns:
             Dict[str, Tensor] with keys based on `head_names`, e.g.:
@@ -180,13 +180,15 @@ class DualDPT(nn.Module):
         """
         B, S, N, C = feats[0][0].shape
         feats = [feat[0].reshape(B * S, N, C) for feat in feats]
-        if chunk_size is None or chunk_size >= S:
+        # chunk the flattened frames so every scene of a B > 1 batch is covered
+        num_frames = B * S
+        if chunk_size is None or chunk_size >= num_frames:
             out_dict = self._forward_impl(feats, H, W, patch_start_idx)
             out_dict = {k: v.reshape(B, S, *v.shape[1:]) for k, v in out_dict.items()}
             return Dict(out_dict)
         out_dicts = []
-        for s0 in range(0, S, chunk_size):
-            s1 = min(s0 + chunk_size, S)
+        for s0 in range(0, num_frames, chunk_size):
+            s1 = min(s0 + chunk_size, num_frames)
             out_dict = self._forward_impl(
                 [feat[s0:s1] for feat in feats],
                 H,
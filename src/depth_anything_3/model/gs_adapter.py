@@ -14,14 +14,14 @@
 
 from typing import Optional
 import torch
-from einops import einsum, rearrange, repeat
+from einops import einsum, rearrange
 from torch import nn
 
-from depth_anything_3.model.utils.transform import cam_quat_xyzw_to_world_quat_wxyz
+from depth_anything_3.model.utils.transform import cam_quat_xyzw_to_world_quat_wxyz_per_view
 from depth_anything_3.specs import Gaussians
 from depth_anything_3.utils.geometry import affine_inverse, get_world_rays, sample_image_grid
 from depth_anything_3.utils.pose_align import batch_align_poses_umeyama
-from depth_anything_3.utils.sh_helpers import rotate_sh
+from depth_anything_3.utils.sh_helpers import rotate_sh_grouped
 
 
 class GaussianAdapter(nn.Module):
@@ -108,11 +108,11 @@ class GaussianAdapter(nn.Module):
             offset_xy = raw_gaussians[..., :2]
             xy_ray = xy_ray + offset_xy * pixel_size
             raw_gaussians = raw_gaussians[..., 2:]  # skip the offset_xy
-        # 1.4) unproject depth + xy to world ray
+        # 1.4) unproject depth + xy to world ray; per-view matrices broadcast over pixels
         origins, directions = get_world_rays(
             xy_ray,
-            repeat(cam2worlds, "b v i j -> b v h w i j", h=H, w=W),
-            repeat(intr_normed, "b v i j -> b v h w i j", h=H, w=W),
+            cam2worlds[:, :, None, None],
+            intr_normed[:, :, None, None],
         )
         gs_means_world = origins + directions * gs_depths[..., None]
         gs_means_world = rearrange(gs_means_world, "b v h w d -> b (v h w) d")
@@ -134,16 +134,9 @@ class GaussianAdapter(nn.Module):
         # due to historical issue, assume quaternion in order xyzw, not wxyz
         # Normalize the quaternion features to yield a valid quaternion.
         rotations = rotations / (rotations.norm(dim=-1, keepdim=True) + eps)
-        # rotate them to world space
-        cam_quat_xyzw = rearrange(rotations, "b v h w c -> b (v h w) c")
-        c2w_mat = repeat(
-            cam2worlds,
-            "b v i j -> b (v h w) i j",
-            h=H,
-            w=W,
-        )
-        world_quat_wxyz = cam_quat_xyzw_to_world_quat_wxyz(cam_quat_xyzw, c2w_mat)
-        gs_rotations_world = world_quat_wxyz  # b (v h w) c
+        # rotate them to world space, one camera rotation per view
+        world_quat_wxyz = cam_quat_xyzw_to_world_quat_wxyz_per_view(rotations, cam2worlds)
+        gs_rotations_world = rearrange(world_quat_wxyz, "b v h w c -> b (v h w) c")
 
         # 2.3) 3DGS color / SH coefficient (world space)
         sh = rearrange(sh, "... (xyz d_sh) -> ... xyz d_sh", xyz=3)
@@ -154,7 +147,10 @@ class GaussianAdapter(nn.Module):
             # predict pre-computed color or predict only DC band, no need to transform
             gs_sh_world = sh
         else:
-            gs_sh_world = rotate_sh(sh, cam2worlds[:, :, None, None, None, :3, :3])
+            # only v distinct rotations: build their Wigner-D matrices once per view; cached
+            # matrices carry no gradient, so skip the cache when backpropagating into poses
+            use_cache = not (torch.is_grad_enabled() and cam2worlds.requires_grad)
+            gs_sh_world = rotate_sh_grouped(sh, cam2worlds[..., :3, :3], use_cache=use_cache)
         gs_sh_world = rearrange(gs_sh_world, "b v h w xyz d_sh -> b (v h w) xyz d_sh")
 
         # 2.4) 3DGS opacity
@@ -0,0 +1,407 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Reference CPU rasterizer for 3D Gaussian splats.
+
+A torch re-implementation of the forward pass of ``gsplat.rasterization`` (pinhole
+cameras, non-packed, no antialiasing) for machines without CUDA/gsplat:
+
+1. EWA projection of every Gaussian to a 2D mean, conic and 3-sigma radius,
+2. assignment to 16x16 tiles, with one global sort by (tile, depth),
+3. front-to-back alpha compositing per tile, with the same 1/255 alpha floor and 1e-4
+   transmittance cut-off as gsplat.
+
+Tiles are independent and are composited on a thread pool (torch kernels release the
+GIL). Slow compared to gsplat, but it makes ``gs_video`` export work on CPU-only hosts.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal, Optional
+import torch
+
+SH_C0 = 0.28209479177387814
+SH_C1 = 0.4886025119029199
+SH_C2 = (
+    1.0925484305920792,
+    -1.0925484305920792,
+    0.31539156525252005,
+    -1.0925484305920792,
+    0.5462742152960396,
+)
+SH_C3 = (
+    -0.5900435899266435,
+    2.890611442640554,
+    -0.4570457994644658,
+    0.3731763325901154,
+    -0.4570457994644658,
+    1.445305721320277,
+    -0.5900435899266435,
+)
+
+ALPHA_MIN = 1.0 / 255.0
+ALPHA_MAX = 0.999
+TRANSMITTANCE_MIN = 1e-4
+
+
+def spherical_harmonics(
+    degree: int,
+    dirs: torch.Tensor,  # "N 3", need not be normalized
+    coeffs: torch.Tensor,  # "N K 3"
+) -> torch.Tensor:  # "N 3"
+    """Evaluate real SH colours up to ``degree`` <= 3 (gsplat / 3DGS convention)."""
+    x, y, z = (dirs / dirs.norm(dim=-1, keepdim=True).clamp_min(1e-12)).unbind(-1)
+    x, y, z = x[:, None], y[:, None], z[:, None]
+    result = SH_C0 * coeffs[:, 0]
+    if degree > 0:
+        result = result - SH_C1 * y * coeffs[:, 1] + SH_C1 * z * coeffs[:, 2]
+        result = result - SH_C1 * x * coeffs[:, 3]
+    if degree > 1:
+        xx, yy, zz = x * x, y * y, z * z
+        result = (
+            result
+            + SH_C2[0] * x * y * coeffs[:, 4]
+            + SH_C2[1] * y * z * coeffs[:, 5]
+            + SH_C2[2] * (2 * zz - xx - yy) * coeffs[:, 6]
+            + SH_C2[3] * x * z * coeffs[:, 7]
+            + SH_C2[4] * (xx - yy) * coeffs[:, 8]
+        )
+    if degree > 2:
+        result = (
+            result
+            + SH_C3[0] * y * (3 * xx - yy) * coeffs[:, 9]
+            + SH_C3[1] * x * y * z * coeffs[:, 10]
+            + SH_C3[2] * y * (4 * zz - xx - yy) * coeffs[:, 11]
+            + SH_C3[3] * z * (2 * zz - 3 * xx - 3 * yy) * coeffs[:, 12]
+            + SH_C3[4] * x * (4 * zz - xx - yy) * coeffs[:, 13]
+            + SH_C3[5] * z * (xx - yy) * coeffs[:, 14]
+            + SH_C3[6] * x * (xx - 3 * yy) * coeffs[:, 15]
+        )
+    return result
+
+
+def _quat_wxyz_to_rotmat(quats: torch.Tensor) -> torch.Tensor:  # "N 4" -> "N 3 3"
+    w, x, y, z = (quats / quats.norm(dim=-1, keepdim=True).clamp_min(1e-12)).unbind(-1)
+    return torch.stack(
+        (
+            1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y),
+            2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x),
+            2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y),
+        ),
+        dim=-1,
+    ).reshape(-1, 3, 3)  # fmt: skip
+
+
+def project_gaussians(
+    means: torch.Tensor,  # "N 3"
+    covars: torch.Tensor,  # world covariances, "N 3 3"
+    viewmat: torch.Tensor,  # world2cam, "4 4"
+    K: torch.Tensor,  # unnormed, "3 3"
+    width: int,
+    height: int,
+    eps2d: float = 0.3,
+    near_plane: float = 0.01,
+    far_plane: float = 1e10,
+) -> tuple[
+    torch.Tensor,  # means2d, "N 2"
+    torch.Tensor,  # conics (a, b, c) of the inverse 2D covariance, "N 3"
+    torch.Tensor,  # camera-space depths, "N"
+    torch.Tensor,  # radii in pixels, 0 for culled Gaussians, "N"
+]:
+    """EWA splatting of world-space Gaussians into one pinhole view, as in gsplat."""
+    R, t = viewmat[:3, :3], viewmat[:3, 3]
+    p = means @ R.T + t
+    x, y, z = p.unbind(-1)
+    fx, fy, cx, cy = K[0, 0], K[1, 1], K[0, 2], K[1, 2]
+    z_safe = z.clamp_min(1e-6)
+
+    # clamp the Jacobian's evaluation point to slightly beyond the frustum, like gsplat
+    tan_fovx, tan_fovy = 0.5 * width / fx, 0.5 * height / fy
+    tx = z_safe * (x / z_safe).clamp(
+        -(cx / fx + 0.3 * tan_fovx), (width - cx) / fx + 0.3 * tan_fovx
+    )
+    ty = z_safe * (y / z_safe).clamp(
+        -(cy / fy + 0.3 * tan_fovy), (height - cy) / fy + 0.3 * tan_fovy
+    )
+    J = torch.zeros(len(means), 2, 3, dtype=means.dtype, device=means.device)
+    J[:, 0, 0] = fx / z_safe
+    J[:, 0, 2] = -fx * tx / z_safe**2
+    J[:, 1, 1] = fy / z_safe
+    J[:, 1, 2] = -fy * ty / z_safe**2
+    cov2d = J @ (R @ covars @ R.T) @ J.transpose(-1, -2)
+
+    a = cov2d[:, 0, 0] + eps2d
+    b = cov2d[:, 0, 1]
+    c = cov2d[:, 1, 1] + eps2d
+    det = a * c - b * b
+    det_safe = det.clamp_min(1e-12)
+    conics = torch.stack((c / det_safe, -b / det_safe, a / det_safe), dim=-1)
+
+    mid = 0.5 * (a + c)
+    lambda_max = mid + (mid * mid - det).clamp_min(0.1).sqrt()
+    radii = (3 * lambda_max.sqrt()).ceil()
+    means2d = torch.stack((fx * x / z_safe + cx, fy * y / z_safe + cy), dim=-1)
+
+    valid = (z > near_plane) & (z < far_plane) & (det > 0)
+    valid &= (means2d[:, 0] + radii > 0) & (means2d[:, 0] - radii < width)
+    valid &= (means2d[:, 1] + radii > 0) & (means2d[:, 1] - radii < height)
+    radii = torch.where(valid, radii, torch.zeros_like(radii)).long()
+    return means2d, conics, z, radii
+
+
+def _composite_tile(
+    pixels: torch.Tensor,  # pixel centres, "P 2"
+    means2d: torch.Tensor,  # depth-sorted, "K 2"
+    conics: torch.Tensor,  # "K 3"
+    opacities: torch.Tensor,  # "K"
+    features: torch.Tensor,  # "K D"
+    chunk: int = 2048,
+) -> tuple[torch.Tensor, torch.Tensor]:  # accumulated features "P D", transmittance "P"
+    """Front-to-back compositing of one tile, ``chunk`` Gaussians at a time."""
+    num_pixels = len(pixels)
+    accum = features.new_zeros(num_pixels, features.shape[-1])
+    trans = features.new_ones(num_pixels)
+    alive = torch.ones(num_pixels, dtype=torch.bool, device=features.device)
+    for s in range(0, len(means2d), chunk):
+        d = pixels[None] - means2d[s : s + chunk, None]  # K P 2
+        con = conics[s : s + chunk, None]
+        sigma = 0.5 * (con[..., 0] * d[..., 0] ** 2 + con[..., 2] * d[..., 1] ** 2)
+        sigma = sigma + con[..., 1] * d[..., 0] * d[..., 1]
+        alpha = (opacities[s : s + chunk, None] * torch.exp(-sigma)).clamp_max(ALPHA_MAX)
+        alpha = torch.where((sigma >= 0) & (alpha >= ALPHA_MIN), alpha, torch.zeros_like(alpha))
+
+        # a Gaussian is composited while the transmittance after it stays above the cut-off
+        trans_after = trans * torch.cumprod(1 - alpha, dim=0)
+        include = (trans_after > TRANSMITTANCE_MIN) & alive
+        trans_before = torch.cat([trans[None], trans_after[:-1]])
+        weights = torch.where(include, alpha * trans_before, torch.zeros_like(alpha))
+        accum += weights.T @ features[s : s + chunk]
+
+        trans = trans * torch.where(include, 1 - alpha, torch.ones_like(alpha)).prod(dim=0)
+        alive = include[-1]  # pixels whose transmittance hit the cut-off are done
+        if not alive.any():
+            break
+    return accum, trans
+
+
+def rasterization_cpu(
+    means: torch.Tensor,  # "*B N 3"
+    quats: torch.Tensor,  # wxyz, "*B N 4"
+    scales: torch.Tensor,  # "*B N 3"
+    opacities: torch.Tensor,  # "*B N"
+    colors: torch.Tensor,  # "*B N D" | SH coefficients "*B N K 3"
+    viewmats: torch.Tensor,  # world2cam, "*B C 4 4"
+    Ks: torch.Tensor,  # unnormed, "*B C 3 3"
+    width: int,
+    height: int,
+    backgrounds: Optional[torch.Tensor] = None,  # "*B C D"
+    render_mode: Literal["RGB", "D", "ED", "RGB+D", "RGB+ED"] = "RGB",
+    sh_degree: Optional[int] = None,
+    near_plane: float = 0.01,
+    far_plane: float = 1e10,
+    eps2d: float = 0.3,
+    tile_size: int = 16,
+    num_workers: Optional[int] = None,
+    **kwargs,
+) -> tuple[
+    torch.Tensor,  # render_colors, "*B C height width D(+1)"
+    torch.Tensor,  # render_alphas, "*B C height width 1"
+    dict,
+]:
+    """
+    Drop-in CPU counterpart of ``gsplat.rasterization`` for the arguments used by
+    ``render_3dgs``. With ``sh_degree`` set, ``colors`` are SH coefficients evaluated
+    per view as ``max(sh + 0.5, 0)``. Depth modes append the accumulated ("D") or
+    alpha-normalized expected ("ED") camera depth as the last channel. Extra gsplat
+    arguments (``packed``, ...) are ignored.
+
+    Like gsplat, an optional leading batch dim renders ``B`` scenes in one call, each
+    scene's cameras seeing only its own Gaussians. The scenes are packed into one Gaussian
+    set (scene ``b`` owns rows ``b * N : (b + 1) * N``) and every camera carries its scene
+    id, so covariances are built once for all scenes.
+    """
+    device = means.device
+    batch_shape = means.shape[:-2]
+    num_scenes, num_gs, num_cams = batch_shape.numel(), means.shape[-2], viewmats.shape[-3]
+    means = means.reshape(-1, 3).float()
+    scales, quats = scales.reshape(-1, 3).float(), quats.reshape(-1, 4).float()
+    opacities = opacities.reshape(len(means)).float()
+    colors = colors.reshape((len(means),) + colors.shape[len(batch_shape) + 1 :]).float()
+    viewmats, Ks = viewmats.reshape(-1, 4, 4), Ks.reshape(-1, 3, 3)
+    if backgrounds is not None:
+        backgrounds = backgrounds.reshape(len(viewmats), -1)
+    camera_scene_ids = torch.arange(num_scenes).repeat_interleave(num_cams).tolist()
+    num_workers = num_workers or os.cpu_count() or 1
+
+    M = _quat_wxyz_to_rotmat(quats) * scales[:, None, :]
+    covars = M @ M.transpose(-1, -2)
+    tiles_x, tiles_y = math.ceil(width / tile_size), math.ceil(height / tile_size)
+    ys, xs = torch.meshgrid(
+        torch.arange(tile_size, device=device),
+        torch.arange(tile_size, device=device),
+        indexing="ij",
+    )
+    tile_pixels = torch.stack((xs.reshape(-1), ys.reshape(-1)), dim=-1).float() + 0.5
+
+    out_colors, out_alphas, all_radii, all_means2d, all_depths = [], [], [], [], []
+    executor = ThreadPoolExecutor(max_workers=num_workers) if num_workers > 1 else None
+    try:
+        for cam, scene in enumerate(camera_scene_ids):
+            gs = slice(scene * num_gs, (scene + 1) * num_gs)
+            viewmat, K = viewmats[cam].float(), Ks[cam].float()
+            means2d, conics, depths, radii = project_gaussians(
+                means[gs], covars[gs], viewmat, K, width, height, eps2d, near_plane, far_plane
+            )
+            scene_opacities = opacities[gs]
+            all_radii.append(radii)
+            all_means2d.append(means2d)
+            all_depths.append(depths)
+
+            if sh_degree is not None:
+                campos = -viewmat[:3, :3].T @ viewmat[:3, 3]
+                feats = spherical_harmonics(sh_degree, means[gs] - campos, colors[gs])
+                feats = (feats + 0.5).clamp_min(0.0)
+            else:
+                feats = colors[gs]
+            if render_mode in ("D", "ED"):
+                feats = depths[:, None]
+            elif render_mode in ("RGB+D", "RGB+ED"):
+                feats = torch.cat((feats, depths[:, None]), dim=-1)
+            num_channels = feats.shape[-1]
+
+            # (tile, gaussian) pairs for every tile overlapped by a 3-sigma square
+            visible = (radii > 0).nonzero().squeeze(-1)
+            r = radii[visible]
+            x0 = ((means2d[visible, 0] - r) / tile_size).floor().long().clamp(0, tiles_x)
+            x1 = ((means2d[visible, 0] + r) / tile_size).ceil().long().clamp(0, tiles_x)
+            y0 = ((means2d[visible, 1] - r) / tile_size).floor().long().clamp(0, tiles_y)
+            y1 = ((means2d[visible, 1] + r) / tile_size).ceil().long().clamp(0, tiles_y)
+            nx, ny = x1 - x0, y1 - y0
+            counts = nx * ny
+            pair_gs = torch.repeat_interleave(torch.arange(len(visible), device=device), counts)
+            local = torch.arange(len(pair_gs), device=device)
+            local = local - torch.repeat_interleave(counts.cumsum(0) - counts, counts)
+            pair_tile = (y0[pair_gs] + local // nx[pair_gs]) * tiles_x + x0[pair_gs]
+            pair_tile = pair_tile + local % nx[pair_gs]
+
+            # one sort by (tile, depth rank) gives every tile its depth-ordered list
+            depth_rank = torch.empty_like(visible)
+            depth_rank[depths[visible].argsort()] = torch.arange(len(visible), device=device)
+            order = (pair_tile * len(visible) + depth_rank[pair_gs]).argsort()
+            pair_gs = visible[pair_gs[order]]
+            tile_ends = torch.bincount(pair_tile, minlength=tiles_x * tiles_y).cumsum(0).tolist()
+
+            image = means.new_zeros(tiles_y * tile_size, tiles_x * tile_size, num_channels)
+            trans_image = means.new_ones(tiles_y * tile_size, tiles_x * tile_size)
+
+            def render_tile(tile_id: int) -> None:
+                start = tile_ends[tile_id - 1] if tile_id > 0 else 0
+                end = tile_ends[tile_id]
+                if start == end:
+                    return
+                ty, tx = divmod(tile_id, tiles_x)
+                offset = means.new_tensor([tx * tile_size, ty * tile_size])
+                idx = pair_gs[start:end]
+                accum, trans = _composite_tile(
+                    tile_pixels + offset,
+                    means2d[idx],
+                    conics[idx],
+                    scene_opacities[idx],
+                    feats[idx],
+                )
+                ys_, xs_ = slice(ty * tile_size, (ty + 1) * tile_size), slice(
+                    tx * tile_size, (tx + 1) * tile_size
+                )
+                image[ys_, xs_] = accum.reshape(tile_size, tile_size, num_channels)
+                trans_image[ys_, xs_] = trans.reshape(tile_size, tile_size)
+
+            if executor is None:
+                for tile_id in range(tiles_x * tiles_y):
+                    render_tile(tile_id)
+            else:
+                list(executor.map(render_tile, range(tiles_x * tiles_y)))
+
+            image, trans_image = image[:height, :width], trans_image[:height, :width]
+            alpha = 1 - trans_image[..., None]
+            if backgrounds is not None:
+                bg = backgrounds[cam].float().reshape(-1)
+                if bg.numel() < num_channels:  # depth channel composites over 0
+                    bg = torch.cat([bg, bg.new_zeros(num_channels - bg.numel())])
+                image = image + trans_image[..., None] * bg
+            if render_mode in ("ED", "RGB+ED"):
+                image = torch.cat([image[..., :-1], image[..., -1:] / alpha.clamp_min(1e-10)], -1)
+            out_colors.append(image)
+            out_alphas.append(alpha)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def unpack(tensors: list[torch.Tensor]) -> torch.Tensor:
+        stacked = torch.stack(tensors)
+        return stacked.reshape(batch_shape + (num_cams,) + stacked.shape[1:])
+
+    info = dict(
+        radii=unpack(all_radii),
+        means2d=unpack(all_means2d),
+        depths=unpack(all_depths),
+        width=width,
+        height=height,
+        tile_size=tile_size,
+    )
+    return unpack(out_colors), unpack(out_alphas), info
+
+
+# ===========================
+# Throughput benchmark
+# ===========================
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark the CPU Gaussian rasterizer.")
+    parser.add_argument("--gaussians", type=int, default=200_000)
+    parser.add_argument("--views", type=int, default=4)
+    parser.add_argument("--height", type=int, default=280)
+    parser.add_argument("--width", type=int, default=504)
+    parser.add_argument("--sh-degree", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    N, H, W = args.gaussians, args.height, args.width
+    means = torch.randn(N, 3) * torch.tensor([1.5, 1.0, 0.5]) + torch.tensor([0.0, 0.0, 4.0])
+    quats = torch.nn.functional.normalize(torch.randn(N, 4), dim=-1)
+    scales = torch.rand(N, 3) * 0.02 + 0.002
+    opacities = torch.rand(N)
+    sh = torch.randn(N, (args.sh_degree + 1) ** 2, 3) * 0.3
+    viewmats = torch.eye(4).repeat(args.views, 1, 1)
+    viewmats[:, 0, 3] = torch.linspace(-0.2, 0.2, args.views)
+    Ks = torch.tensor([[0.9 * W, 0.0, W / 2], [0.0, 0.9 * W, H / 2], [0.0, 0.0, 1.0]])
+    Ks = Ks.repeat(args.views, 1, 1)
+
+    t0 = time.time()
+    colors, alphas, _ = rasterization_cpu(
+        means, quats, scales, opacities, sh, viewmats, Ks, W, H,
+        render_mode="RGB+ED", sh_degree=args.sh_degree, num_workers=args.workers,
+    )  # fmt: skip
+    seconds = time.time() - t0
+    print(
+        f"{N} Gaussians, {args.views} views at {H}x{W} with {args.workers or os.cpu_count()} "
+        f"workers: {seconds:.2f} s, {args.views / seconds:.2f} views/s, "
+        f"{args.views * H * W / seconds / 1e6:.2f} Mpx/s"
+    )
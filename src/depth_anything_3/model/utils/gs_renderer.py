@@ -14,33 +14,49 @@
 
 import math
 from math import isqrt
-from typing import Literal, Optional
+from typing import Iterator, Literal, Optional
 import torch
 from einops import rearrange, repeat
 from tqdm import tqdm
 
+from depth_anything_3.model.utils.gs_rasterizer_cpu import rasterization_cpu
 from depth_anything_3.specs import Gaussians
-from depth_anything_3.utils.camera_trj_helpers import (
-    interpolate_extrinsics,
-    interpolate_intrinsics,
-    render_dolly_zoom_path,
-    render_stabilization_path,
-    render_wander_path,
-    render_wobble_inter_path,
+from depth_anything_3.utils.camera_trajectory import (
+    get_cached_trajectory,
+    interpolated_path,
+    put_cached_trajectory,
+    smooth_trajectory,
+    trajectory_cache_key,
+    wobble_inter_path,
 )
+from depth_anything_3.utils.camera_trj_helpers import render_dolly_zoom_path, render_wander_path
 from depth_anything_3.utils.geometry import affine_inverse, as_homogeneous, get_fov
 from depth_anything_3.utils.logger import logger
 
 try:
     from gsplat import rasterization
 except ImportError:
+    rasterization = None
     logger.warn(
-        "Dependency `gsplat` is required for rendering 3DGS. "
-        "Install via: pip install git+https://github.com/nerfstudio-project/"
-        "gsplat.git@0b4dddf04cb687367602c01196913cde6a743d70"
+        "Dependency `gsplat` is required for rendering 3DGS on GPU; falling back to the "
+        "(slow) CPU rasterizer. Install via: pip install git+https://github.com/"
+        "nerfstudio-project/gsplat.git@0b4dddf04cb687367602c01196913cde6a743d70"
     )
 
 
+def select_render_backend(
+    backend: Literal["auto", "gsplat", "cpu"], device: torch.device
+) -> Literal["gsplat", "cpu"]:
+    """``auto`` picks gsplat for CUDA tensors when it is installed, else the CPU rasterizer."""
+    if backend == "auto":
+        return "gsplat" if rasterization is not None and device.type == "cuda" else "cpu"
+    if backend == "gsplat" and rasterization is None:
+        raise ImportError("render backend 'gsplat' requested but gsplat is not installed")
+    if backend not in ("gsplat", "cpu"):
+        raise ValueError(f"Unknown render backend: {backend}")
+    return backend
+
+
 def render_3dgs(
     extrinsics: torch.Tensor,  # "batch_views 4 4", w2c
     intrinsics: torch.Tensor,  # "batch_views 3 3", normalized
@@ -50,11 +66,18 @@ def render_3dgs(
     use_sh: bool = True,
     num_view: int = 1,
     color_mode: Literal["RGB+D", "RGB+ED"] = "RGB+D",
+    backend: Literal["auto", "gsplat", "cpu"] = "auto",
     **kwargs,
 ) -> tuple[
     torch.Tensor,  # "batch_views 3 height width"
     torch.Tensor,  # "batch_views height width"
 ]:
+    # gsplat on CUDA, the reference rasterizer (gs_rasterizer_cpu) otherwise
+    rasterize_fn = (
+        rasterization
+        if select_render_backend(backend, gaussian.means.device) == "gsplat"
+        else rasterization_cpu
+    )
     # extract gaussian params
     gaussian_means = gaussian.means
     gaussian_scales = gaussian.scales
@@ -85,58 +108,60 @@ def render_3dgs(
     focal_length_x = w / (2 * tan_fov_x)
     focal_length_y = h / (2 * tan_fov_y)
 
-    view_matrix = extrinsics.float()
-
-    all_images = []
-    all_radii = []
-    all_depths = []
     # render view in a batch based, each batch contains one scene
     # assume the Gaussian parameters are originally repeated along the view dim
     batch_scene = b // num_view
 
-    def index_i_gs_attr(full_attr, idx):
-        # return rearrange(full_attr, "(b v) ... -> b v ...", v=num_view)[idx, 0]
-        return full_attr[idx]
+    # pixel-space intrinsics of all views at once, "batch_scene view 3 3"
+    K = torch.zeros(b, 3, 3, dtype=gaussian_means.dtype, device=gaussian_means.device)
+    K[:, 0, 0] = focal_length_x
+    K[:, 1, 1] = focal_length_y
+    K[:, 0, 2] = w / 2.0
+    K[:, 1, 2] = h / 2.0
+    K[:, 2, 2] = 1.0
+    K = rearrange(K, "(b v) i j -> b v i j", v=num_view)
+    view_matrix = rearrange(extrinsics.float(), "(b v) i j -> b v i j", v=num_view)
+    backgrounds = rearrange(background_color, "(b v) c -> b v c", v=num_view)
+    raster_kwargs = dict(
+        render_mode=color_mode,
+        width=w,
+        height=h,
+        packed=False,
+        sh_degree=degree if use_sh else None,
+    )
+
+    if not (torch.is_grad_enabled() and gaussian_means.requires_grad):
+        # inference: all scenes and views in one rasterizer call, no autograd bookkeeping
+        with torch.no_grad():
+            render_colors = _rasterize_scenes(
+                rasterize_fn,
+                means=gaussian_means,  # [b, N, 3]
+                quats=gaussian_quats,
+                scales=gaussian_scales,
+                opacities=gaussian_opacities,
+                colors=shs,
+                viewmats=view_matrix,  # [b, v, 4, 4]
+                Ks=K,  # [b, v, 3, 3]
+                backgrounds=backgrounds,
+                **raster_kwargs,
+            )
+        render_colors = rearrange(render_colors, "b v h w c -> (b v) h w c")
+        return rearrange(render_colors[..., :3], "bv h w c -> bv c h w"), render_colors[..., -1]
 
+    all_images = []
+    all_radii = []
+    all_depths = []
     for i in range(batch_scene):
-        K = repeat(
-            torch.tensor(
-                [
-                    [0, 0, w / 2.0],
-                    [0, 0, h / 2.0],
-                    [0, 0, 1],
-                ]
-            ),
-            "i j -> v i j",
-            v=num_view,
-        ).to(gaussian_means)
-        K[:, 0, 0] = focal_length_x.reshape(batch_scene, num_view)[i]
-        K[:, 1, 1] = focal_length_y.reshape(batch_scene, num_view)[i]
-
-        i_means = index_i_gs_attr(gaussian_means, i)  # [N, 3]
-        i_scales = index_i_gs_attr(gaussian_scales, i)
-        i_quats = index_i_gs_attr(gaussian_quats, i)
-        i_opacities = index_i_gs_attr(gaussian_opacities, i)  # [N,]
-        i_colors = index_i_gs_attr(shs, i)  # [N, K, 3]
-        i_viewmats = rearrange(view_matrix, "(b v) ... -> b v ...", v=num_view)[i]  # [v, 4, 4]
-        i_backgrounds = rearrange(background_color, "(b v) ... -> b v ...", v=num_view)[
-            i
-        ]  # [v, 3]
-
-        render_colors, render_alphas, info = rasterization(
-            means=i_means,
-            quats=i_quats,  # [N, 4]
-            scales=i_scales,  # [N, 3]
-            opacities=i_opacities,
-            colors=i_colors,
-            viewmats=i_viewmats,  # [v, 4, 4]
-            Ks=K,  # [v, 3, 3]
-            backgrounds=i_backgrounds,
-            render_mode=color_mode,
-            width=w,
-            height=h,
-            packed=False,
-            sh_degree=degree if use_sh else None,
+        render_colors, render_alphas, info = rasterize_fn(
+            means=gaussian_means[i],  # [N, 3]
+            quats=gaussian_quats[i],  # [N, 4]
+            scales=gaussian_scales[i],  # [N, 3]
+            opacities=gaussian_opacities[i],  # [N,]
+            colors=shs[i],  # [N, K, 3]
+            viewmats=view_matrix[i],  # [v, 4, 4]
+            Ks=K[i],  # [v, 3, 3]
+            backgrounds=backgrounds[i],  # [v, 3]
+            **raster_kwargs,
         )
         depth = render_colors[..., -1].unbind(dim=0)
 
@@ -153,12 +178,59 @@ def render_3dgs(
     return torch.stack(all_images), torch.stack(all_depths)
 
 
-def run_renderer_in_chunk_w_trj_mode(
-    gaussians: Gaussians,
+# gsplat supports leading batch dims from 1.5; None = unknown version, probed on first use
+GSPLAT_BATCHED_VERSION = (1, 5)
+_batched_rasterization_supported = {}
+
+
+def _gsplat_batch_support() -> Optional[bool]:
+    """Whether the installed gsplat takes leading batch dims, from its version."""
+    try:
+        import gsplat
+
+        version = tuple(int(part) for part in gsplat.__version__.split(".")[:2])
+    except (ImportError, AttributeError, ValueError):
+        return None
+    return version >= GSPLAT_BATCHED_VERSION
+
+
+def _rasterize_scenes(rasterize_fn, **kwargs) -> torch.Tensor:  # "b v h w c"
+    """
+    Rasterize ``b`` scenes, each with its own Gaussians and views, in one call using the
+    leading batch dimension of ``gsplat.rasterization`` / ``rasterization_cpu``. Falls back
+    to one call per scene for gsplat versions without batch support. That is decided from
+    the gsplat version, or, if it cannot be parsed, from a shape / signature error on the
+    first batched call; OOM and other runtime errors propagate.
+    """
+    batch_scene = kwargs["means"].shape[0]
+
+    def scene_kwargs(i: int) -> dict:
+        return {k: v[i] if isinstance(v, torch.Tensor) else v for k, v in kwargs.items()}
+
+    if rasterize_fn not in _batched_rasterization_supported:
+        supported = True if rasterize_fn is rasterization_cpu else _gsplat_batch_support()
+        _batched_rasterization_supported[rasterize_fn] = supported
+    supported = _batched_rasterization_supported[rasterize_fn]
+
+    if batch_scene > 1 and supported is not False:
+        if supported:
+            return rasterize_fn(**kwargs)[0]
+        try:
+            result = rasterize_fn(**kwargs)[0]
+        except (AssertionError, TypeError, ValueError):
+            # gsplat without batch dims rejects the leading scene axis in its shape checks
+            _batched_rasterization_supported[rasterize_fn] = False
+            logger.warn("gsplat has no batched rasterization, rendering scenes one by one")
+        else:
+            _batched_rasterization_supported[rasterize_fn] = True
+            return result
+    return torch.stack([rasterize_fn(**scene_kwargs(i))[0] for i in range(batch_scene)])
+
+
+def get_render_trajectory(
     extrinsics: torch.Tensor,  # world2cam, "batch view 4 4" | "batch view 3 4"
     intrinsics: torch.Tensor,  # unnormed intrinsics, "batch view 3 3"
     image_shape: tuple[int, int],
-    chunk_size: Optional[int] = 8,
     trj_mode: Literal[
         "original",
         "smooth",
@@ -170,12 +242,29 @@ def run_renderer_in_chunk_w_trj_mode(
         "wobble_inter",
     ] = "smooth",
     input_shape: Optional[tuple[int, int]] = None,
-    enable_tqdm: Optional[bool] = False,
-    **kwargs,
+    use_cache: bool = True,
 ) -> tuple[
-    torch.Tensor,  # color, "batch view 3 height width"
-    torch.Tensor,  # depth, "batch view height width"
+    torch.Tensor,  # render world2cam, "batch render_view 4 4"
+    torch.Tensor,  # render normed intrinsics, "batch render_view 3 3"
 ]:
+    """
+    Camera path rendered by ``run_renderer_in_chunk_w_trj_mode`` for ``trj_mode``.
+
+    Paths are built for all scenes at once (see ``utils.camera_trajectory``) and cached
+    per input poses, mode and shapes, so repeated exports of one prediction reuse them.
+    """
+    if use_cache:
+        cache_key = trajectory_cache_key(
+            extrinsics,
+            intrinsics,
+            image_shape=tuple(image_shape),
+            trj_mode=trj_mode,
+            input_shape=None if input_shape is None else tuple(input_shape),
+        )
+        cached = get_cached_trajectory(cache_key)
+        if cached is not None:
+            return cached
+
     cam2world = affine_inverse(as_homogeneous(extrinsics))
     if input_shape is not None:
         in_h, in_w = input_shape
@@ -192,10 +281,7 @@ def run_renderer_in_chunk_w_trj_mode(
 
     def _smooth_trj_fn_batch(raw_c2ws, k_size=50):
         try:
-            smooth_c2ws = torch.stack(
-                [render_stabilization_path(c2w_i, k_size) for c2w_i in raw_c2ws],
-                dim=0,
-            )
+            smooth_c2ws = smooth_trajectory(raw_c2ws, k_size)
         except Exception as e:
             print(f"[DEBUG] Path smoothing failed with error: {e}.")
             smooth_c2ws = raw_c2ws
@@ -219,26 +305,7 @@ def run_renderer_in_chunk_w_trj_mode(
         if inter_len > 2:
             t = torch.linspace(0, 1, inter_len, dtype=torch.float32, device=cam2world.device)
             t = (torch.cos(torch.pi * (t + 1)) + 1) / 2
-            tgt_c2w_b = []
-            tgt_intr_b = []
-            for b_idx in range(cam2world.shape[0]):
-                tgt_c2w = []
-                tgt_intr = []
-                for cur_idx in range(cam2world.shape[1] - 1):
-                    tgt_c2w.append(
-                        interpolate_extrinsics(
-                            cam2world[b_idx, cur_idx], cam2world[b_idx, cur_idx + 1], t
-                        )[(0 if cur_idx == 0 else 1) :]
-                    )
-                    tgt_intr.append(
-                        interpolate_intrinsics(
-                            intr_normed[b_idx, cur_idx], intr_normed[b_idx, cur_idx + 1], t
-                        )[(0 if cur_idx == 0 else 1) :]
-                    )
-                tgt_c2w_b.append(torch.cat(tgt_c2w))
-                tgt_intr_b.append(torch.cat(tgt_intr))
-            tgt_c2w = torch.stack(tgt_c2w_b)  # b v 4 4
-            tgt_intr = torch.stack(tgt_intr_b)  # b v 3 3
+            tgt_c2w, tgt_intr = interpolated_path(cam2world, intr_normed, t)  # b v 4 4, b v 3 3
         else:
             tgt_c2w = cam2world
             tgt_intr = intr_normed
@@ -299,7 +366,7 @@ def run_renderer_in_chunk_w_trj_mode(
         tgt_c2w = torch.stack(tgt_c2w)
         tgt_intr = torch.stack(tgt_intr)
     elif trj_mode == "wobble_inter":
-        tgt_c2w, tgt_intr = render_wobble_inter_path(
+        tgt_c2w, tgt_intr = wobble_inter_path(
             cam2world=cam2world,
             intr_normed=intr_normed,
             inter_len=10,
@@ -308,13 +375,34 @@ def run_renderer_in_chunk_w_trj_mode(
     else:
         raise Exception(f"trj mode [{trj_mode}] is not implemented.")
 
-    _, v = tgt_c2w.shape[:2]
-    tgt_extr = affine_inverse(tgt_c2w)
+    trajectory = (affine_inverse(tgt_c2w), tgt_intr)
+    if use_cache:
+        put_cached_trajectory(cache_key, trajectory)
+    return trajectory
+
+
+def render_trajectory_in_chunks(
+    gaussians: Gaussians,
+    tgt_extr: torch.Tensor,  # world2cam, "batch render_view 4 4"
+    tgt_intr: torch.Tensor,  # normed intrinsics, "batch render_view 3 3"
+    image_shape: tuple[int, int],
+    chunk_size: Optional[int] = 8,
+    enable_tqdm: Optional[bool] = False,
+    **kwargs,
+) -> Iterator[
+    tuple[
+        torch.Tensor,  # color, "batch chunk_view 3 height width"
+        torch.Tensor,  # depth, "batch chunk_view height width"
+    ]
+]:
+    """
+    Render a camera path ``chunk_size`` views at a time, yielding each chunk as soon as it
+    is rendered so callers can consume frames without holding the whole video.
+    """
+    v = tgt_extr.shape[1]
     if chunk_size is None:
         chunk_size = v
-    chunk_size = min(v, chunk_size)
-    all_colors = []
-    all_depths = []
+    chunk_size = max(1, min(v, chunk_size))
     for chunk_idx in tqdm(
         range(math.ceil(v / chunk_size)),
         desc="Rendering novel views",
@@ -332,8 +420,51 @@ def run_renderer_in_chunk_w_trj_mode(
             num_view=cur_n_view,
             **kwargs,
         )
-        all_colors.append(rearrange(color, "(b v) ... -> b v ...", v=cur_n_view))
-        all_depths.append(rearrange(depth, "(b v) ... -> b v ...", v=cur_n_view))
+        yield (
+            rearrange(color, "(b v) ... -> b v ...", v=cur_n_view),
+            rearrange(depth, "(b v) ... -> b v ...", v=cur_n_view),
+        )
+
+
+def run_renderer_in_chunk_w_trj_mode(
+    gaussians: Gaussians,
+    extrinsics: torch.Tensor,  # world2cam, "batch view 4 4" | "batch view 3 4"
+    intrinsics: torch.Tensor,  # unnormed intrinsics, "batch view 3 3"
+    image_shape: tuple[int, int],
+    chunk_size: Optional[int] = 8,
+    trj_mode: Literal[
+        "original",
+        "smooth",
+        "interpolate",
+        "interpolate_smooth",
+        "wander",
+        "dolly_zoom",
+        "extend",
+        "wobble_inter",
+    ] = "smooth",
+    input_shape: Optional[tuple[int, int]] = None,
+    enable_tqdm: Optional[bool] = False,
+    **kwargs,
+) -> tuple[
+    torch.Tensor,  # color, "batch view 3 height width"
+    torch.Tensor,  # depth, "batch view height width"
+]:
+    tgt_extr, tgt_intr = get_render_trajectory(
+        extrinsics, intrinsics, image_shape, trj_mode=trj_mode, input_shape=input_shape
+    )
+    all_colors = []
+    all_depths = []
+    for color, depth in render_trajectory_in_chunks(
+        gaussians,
+        tgt_extr,
+        tgt_intr,
+        image_shape,
+        chunk_size=chunk_size,
+        enable_tqdm=enable_tqdm,
+        **kwargs,
+    ):
+        all_colors.append(color)
+        all_depths.append(depth)
     all_colors = torch.cat(all_colors, dim=1)
     all_depths = torch.cat(all_depths, dim=1)
 
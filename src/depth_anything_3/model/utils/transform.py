@@ -206,3 +206,51 @@ def cam_quat_xyzw_to_world_quat_wxyz(cam_quat_xyzw, c2w):
     world_quat_wxyz_flat = mat_to_quat(rotmat_world_flat)
     world_quat_wxyz = world_quat_wxyz_flat.reshape(b, n, 4)
     return world_quat_wxyz
+
+
+def quat_left_mul_matrix(quat_xyzw: torch.Tensor) -> torch.Tensor:
+    """
+    Matrix ``L`` with ``L @ q2 == quat_xyzw * q2`` (Hamilton product, XYZW order).
+
+    Args:
+        quat_xyzw: (..., 4)
+
+    Returns:
+        (..., 4, 4)
+    """
+    x, y, z, w = torch.unbind(quat_xyzw, -1)
+    o = torch.stack(
+        (
+            w, -z, y, x,
+            z, w, -x, y,
+            -y, x, w, z,
+            -x, -y, -z, w,
+        ),
+        -1,
+    )  # fmt: skip
+    return o.reshape(quat_xyzw.shape[:-1] + (4, 4))
+
+
+def cam_quat_xyzw_to_world_quat_wxyz_per_view(cam_quat_xyzw, c2w):
+    """
+    Same result as ``cam_quat_xyzw_to_world_quat_wxyz`` when the quaternions of each view
+    share one camera, without repeating ``c2w`` per quaternion: the camera rotation is
+    applied as a per-view quaternion product.
+
+    Args:
+        cam_quat_xyzw: (b, v, ..., 4) unit quaternions in xyzw
+        c2w: (b, v, 4, 4)
+
+    Returns:
+        (b, v, ..., 4)
+    """
+    # same axis convention as cam_quat_xyzw_to_world_quat_wxyz: the wxyz-ordered input is
+    # read as xyzw by quat_to_mat
+    cam_quat = cam_quat_xyzw.roll(1, dims=-1)
+    c2w_quat = mat_to_quat(c2w[..., :3, :3].float()).to(cam_quat)
+    c2w_quat = c2w_quat / c2w_quat.norm(dim=-1, keepdim=True)
+    b, v = c2w.shape[:2]
+    world_quat = torch.einsum(
+        "bvij,bvnj->bvni", quat_left_mul_matrix(c2w_quat), cam_quat.reshape(b, v, -1, 4)
+    )
+    return standardize_quaternion(world_quat).reshape(cam_quat_xyzw.shape)
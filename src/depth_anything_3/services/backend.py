@@ -20,9 +20,11 @@ Provides HTTP API for model inference with persistent model loading.
 
 import os
 import posixpath
+import threading
 import time
 import uuid
 
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 from urllib.parse import quote
@@ -34,6 +36,7 @@ from fastapi.responses import FileResponse, HTMLResponse
 from pydantic import BaseModel
 
 from ..api import DepthAnything3
+from .task_queue import TaskQueue
 from ..utils.memory import (
     get_gpu_memory_info,
     cleanup_cuda_memory,
@@ -60,6 +63,10 @@ class InferenceRequest(BaseModel):
     show_cameras: bool = True
     # Feat_vis export parameters
     feat_vis_fps: int = 15
+    # Scheduling parameters
+    priority: int = 0  # Higher runs first
+    client_id: Optional[str] = None  # Clients with queued tasks take turns
+    deadline: Optional[float] = None  # Unix time by which the task must start, else it expires
 
 
 class InferenceResponse(BaseModel):
@@ -77,7 +84,7 @@ class TaskStatus(BaseModel):
     """Task status model."""
 
     task_id: str
-    status: str  # "pending", "running", "completed", "failed"
+    status: str  # "pending", "running", "completed", "failed", "cancelled", "expired"
     message: str
     progress: Optional[float] = None  # 0.0 to 1.0
     created_at: float
@@ -92,6 +99,10 @@ class TaskStatus(BaseModel):
     process_res_method: Optional[str] = None  # Processing resolution method
     video_path: Optional[str] = None  # Source video path
 
+    # Scheduling
+    queue_wait: Optional[float] = None  # Seconds between submission and start
+    batch_size: Optional[int] = None  # Number of requests sharing the forward pass
+
 
 class ModelBackend:
     """Model backend service with persistent model loading."""
@@ -162,29 +173,155 @@ _app: Optional[FastAPI] = None
 _tasks: Dict[str, TaskStatus] = {}
 _executor = ThreadPoolExecutor(max_workers=1)  # Restrict to single-task execution
 _running_task_id: Optional[str] = None  # Currently running task ID
-_task_queue: List[str] = []  # Pending task queue
+_task_queue = TaskQueue()  # Pending tasks by priority, then round-robin over clients
+_queue_lock = threading.Lock()  # Guards _task_queue between the API and the worker thread
+_cancel_requested: set = set()  # Running tasks to stop at their next stage boundary
+
+ACTIVE_STATUSES = ("pending", "running")
+FINISHED_STATUSES = ("completed", "failed", "cancelled", "expired")
 
 # Task cleanup configuration
 MAX_TASK_HISTORY = 100  # Maximum number of tasks to keep in memory
 CLEANUP_INTERVAL = 300  # Cleanup interval in seconds (5 minutes)
 
+# Dynamic batching configuration (see create_app)
+BATCH_WINDOW_MS = 50.0  # Longest a request waits after submission for batch partners
+MAX_BATCH_SIZE = 8  # Most requests sharing one forward pass
+_batch_window_s = BATCH_WINDOW_MS / 1000.0
+_max_batch_size = MAX_BATCH_SIZE
+_queue_waits: deque = deque(maxlen=1000)  # Recent queue waits in seconds
+_batch_stats = {"forwards": 0, "tasks": 0, "cancelled": 0, "expired": 0}
 
-def _process_next_task():
-    """Process the next task in the queue."""
-    global _task_queue, _running_task_id
 
-    if not _task_queue or _running_task_id is not None:
-        return
+class TaskCancelled(Exception):
+    """Raised between pipeline stages of a task cancelled via ``DELETE /task/{id}``."""
+
 
-    # Get next task from queue
-    task_id = _task_queue.pop(0)
+def _check_cancelled(task_id: str):
+    """Stop ``task_id`` at this stage boundary if its cancellation was requested."""
+    if task_id in _cancel_requested:
+        raise TaskCancelled(f"[{task_id}] Cancelled")
 
-    # Get task request from tasks dict (we need to store the request)
-    if task_id not in _tasks:
+
+def _finish_task(task_id: str, status: str, message: str):
+    """Move a task that did not run to completion into a final state."""
+    _cancel_requested.discard(task_id)
+    task = _tasks.get(task_id)
+    if task is None:
         return
+    task.status = status
+    task.message = message
+    task.completed_at = time.time()
+    if status in ("cancelled", "expired"):
+        _batch_stats[status] += 1
+
+
+def _expire_pending_tasks():
+    """Expire queued tasks whose deadline has passed."""
+    now = time.time()
+    with _queue_lock:
+        expired = _task_queue.expire(now)
+    for task_id in expired:
+        print(f"[{task_id}] Deadline passed before the task could start")
+        _finish_task(task_id, "expired", f"[{task_id}] Expired: deadline passed while queued")
+
+
+def _batch_key(request: InferenceRequest) -> Optional[tuple]:
+    """Requests with equal keys can share one forward pass; None if this one cannot."""
+    if request.extrinsics or request.intrinsics or not request.image_paths:
+        return None
+    return (
+        request.process_res,
+        request.process_res_method,
+        len(request.image_paths),
+        tuple(request.export_feat_layers),
+    )
+
+
+def _record_task_start(task_id: str, started_at: float, batch_size: int):
+    """Mark a task as running and record its queue wait."""
+    task = _tasks[task_id]
+    task.status = "running"
+    task.started_at = started_at
+    task.queue_wait = started_at - task.created_at
+    task.batch_size = batch_size
+    _queue_waits.append(task.queue_wait)
+
+
+def _scheduler_metrics() -> Dict[str, Any]:
+    """Batching configuration, batch sizes and recent queue waits."""
+    waits = np.asarray(_queue_waits, dtype=np.float64)
+    forwards = _batch_stats["forwards"]
+    return {
+        "batch_window_ms": _batch_window_s * 1000.0,
+        "max_batch_size": _max_batch_size,
+        "queued_tasks": len(_task_queue),
+        "queued_by_client": _task_queue.counts_by_client(),
+        "cancelled_tasks": _batch_stats["cancelled"],
+        "expired_tasks": _batch_stats["expired"],
+        "forward_passes": forwards,
+        "mean_batch_size": _batch_stats["tasks"] / forwards if forwards else None,
+        "queue_wait_s": (
+            {
+                "mean": float(waits.mean()),
+                "p50": float(np.percentile(waits, 50)),
+                "p95": float(np.percentile(waits, 95)),
+                "max": float(waits.max()),
+                "samples": int(waits.size),
+            }
+            if waits.size
+            else None
+        ),
+    }
+
+
+def _process_next_task():
+    """Process the next task in the queue."""
+    global _running_task_id
+
+    _expire_pending_tasks()
+    with _queue_lock:
+        if _running_task_id is not None:
+            return
+
+        # Get next task from queue, skipping tasks removed from _tasks meanwhile
+        while True:
+            item = _task_queue.pop()
+            if item is None:
+                return
+            task_id, key = item
+            if task_id in _tasks:
+                break
+        _running_task_id = task_id
 
     # Submit task to executor
-    _executor.submit(_run_inference_task, task_id)
+    _executor.submit(_run_next_batch, task_id, key)
+
+
+def _run_next_batch(lead_id: str, key: Optional[tuple]):
+    """
+    Run ``lead_id`` together with queued tasks of the same batch ``key`` (None runs alone).
+
+    Tasks are collected until ``_max_batch_size`` is reached or the lead has waited
+    ``_batch_window_s`` since submission, so batching adds at most that much latency.
+    """
+    lead = _tasks[lead_id]
+    group = [lead_id]
+    if key is not None and _max_batch_size > 1:
+        deadline = lead.created_at + _batch_window_s
+        while True:
+            with _queue_lock:
+                taken = _task_queue.pop_matching(key, _max_batch_size - len(group))
+            group.extend(task_id for task_id in taken if task_id in _tasks)
+            remaining = deadline - time.time()
+            if len(group) >= _max_batch_size or remaining <= 0:
+                break
+            time.sleep(min(remaining, 0.005))
+
+    if len(group) == 1:
+        _run_inference_task(lead_id)
+    else:
+        _run_batched_inference_tasks(group)
 
 
 # get_gpu_memory_info imported from depth_anything_3.utils.memory
@@ -201,7 +338,7 @@ def _process_next_task():
 
 def _run_inference_task(task_id: str):
     """Run inference task in background thread with OOM protection."""
-    global _tasks, _backend, _running_task_id, _task_queue
+    global _tasks, _backend, _running_task_id
 
     model = None
     inference_started = False
@@ -220,10 +357,12 @@ def _run_inference_task(task_id: str):
         _running_task_id = task_id
 
         # Update task status to running
-        _tasks[task_id].status = "running"
-        _tasks[task_id].started_at = start_time
+        _record_task_start(task_id, start_time, batch_size=1)
+        _batch_stats["forwards"] += 1
+        _batch_stats["tasks"] += 1
         _tasks[task_id].message = f"[{task_id}] Starting inference on {num_images} frames..."
         print(f"[{task_id}] Starting inference on {num_images} frames")
+        _check_cancelled(task_id)
 
         # Pre-inference cleanup to ensure maximum available memory
         print(f"[{task_id}] Pre-inference cleanup...")
@@ -269,24 +408,17 @@ def _run_inference_task(task_id: str):
 
         print(f"[{task_id}] Model loaded successfully")
         _tasks[task_id].progress = 0.2
+        _check_cancelled(task_id)
 
-        # Prepare inference parameters
+        # Prepare inference parameters (export runs as a separate, cancellable stage)
         inference_kwargs = {
             "image": request.image_paths,
-            "export_format": request.export_format,
             "process_res": request.process_res,
             "process_res_method": request.process_res_method,
             "export_feat_layers": request.export_feat_layers,
             "align_to_input_ext_scale": request.align_to_input_ext_scale,
-            "conf_thresh_percentile": request.conf_thresh_percentile,
-            "num_max_points": request.num_max_points,
-            "show_cameras": request.show_cameras,
-            "feat_vis_fps": request.feat_vis_fps,
         }
 
-        if request.export_dir:
-            inference_kwargs["export_dir"] = request.export_dir
-
         if request.extrinsics:
             inference_kwargs["extrinsics"] = np.array(request.extrinsics, dtype=np.float32)
 
@@ -302,7 +434,7 @@ def _run_inference_task(task_id: str):
         inference_started = True
 
         try:
-            model.inference(**inference_kwargs)
+            prediction = model.inference(**inference_kwargs)
             inference_time = time.time() - inference_start_time
             avg_time_per_image = inference_time / num_images if num_images > 0 else 0
 
@@ -324,6 +456,24 @@ def _run_inference_task(task_id: str):
                 )
             raise
 
+        _tasks[task_id].progress = 0.7
+        _check_cancelled(task_id)
+
+        if request.export_dir:
+            _tasks[task_id].message = f"[{task_id}] Exporting results..."
+            model.export_prediction(
+                prediction,
+                request.export_dir,
+                request.export_format,
+                image=request.image_paths,
+                process_res_method=request.process_res_method,
+                conf_thresh_percentile=request.conf_thresh_percentile,
+                num_max_points=request.num_max_points,
+                show_cameras=request.show_cameras,
+                feat_vis_fps=request.feat_vis_fps,
+            )
+        del prediction
+
         _tasks[task_id].progress = 0.9
 
         # Post-inference cleanup
@@ -355,6 +505,17 @@ def _run_inference_task(task_id: str):
             f"Avg per image: {avg_time_per_image:.2f}s"
         )
 
+    except TaskCancelled as e:
+        print(f"[{task_id}] Cancelled after {time.time() - start_time:.2f}s")
+        cleanup_cuda_memory()
+        _finish_task(task_id, "cancelled", str(e))
+
+        # Clear running state
+        _running_task_id = None
+
+        # Process next task in queue
+        _process_next_task()
+
     except Exception as e:
         # Update task status to failed
         error_msg = str(e)
@@ -376,6 +537,8 @@ def _run_inference_task(task_id: str):
         _process_next_task()
 
     finally:
+        _cancel_requested.discard(task_id)
+
         # Final cleanup in finally block to ensure it always runs
         # This is critical for releasing resources even if unexpected errors occur
         try:
@@ -389,8 +552,142 @@ def _run_inference_task(task_id: str):
         _schedule_task_cleanup()
 
 
+def _drop_cancelled(task_ids: List[str]) -> List[str]:
+    """Finish the tasks of a batch whose cancellation was requested; returns the others."""
+    for task_id in task_ids:
+        if task_id in _cancel_requested:
+            print(f"[{task_id}] Cancelled before batched inference")
+            _finish_task(task_id, "cancelled", f"[{task_id}] Cancelled")
+    return [task_id for task_id in task_ids if _tasks[task_id].status != "cancelled"]
+
+
+def _run_batched_inference_tasks(task_ids: List[str]):
+    """Run compatible tasks as one batched forward and export each result to its own task."""
+    global _running_task_id
+
+    try:
+        _run_batch(task_ids)
+    except Exception as e:
+        # Unexpected error outside the guarded stages: fail the tasks that are still active
+        print(f"[BATCH x{len(task_ids)}] Batch failed: {e}")
+        with _queue_lock:
+            stalled = [task_id for task_id in task_ids if task_id not in _task_queue]
+        for task_id in stalled:
+            task = _tasks.get(task_id)
+            if task is not None and task.status in ACTIVE_STATUSES:
+                _finish_task(task_id, "failed", f"[{task_id}] Batched run failed: {e}")
+    finally:
+        # Always release the worker, or the queue would stall
+        _running_task_id = None
+        _process_next_task()
+        _schedule_task_cleanup()
+
+
+def _run_batch(task_ids: List[str]):
+    """Stages of ``_run_batched_inference_tasks``; the caller releases the worker."""
+    start_time = time.time()
+    task_ids = _drop_cancelled(task_ids)
+    if not task_ids:
+        return
+    requests = [_tasks[task_id].request for task_id in task_ids]
+    lead = requests[0]
+    num_images = sum(len(request.image_paths) for request in requests)
+    tag = f"BATCH x{len(task_ids)}"
+
+    try:
+        for task_id in task_ids:
+            _record_task_start(task_id, start_time, batch_size=len(task_ids))
+            _tasks[task_id].message = (
+                f"[{task_id}] Running batched inference with {len(task_ids) - 1} other task(s)..."
+            )
+            _tasks[task_id].progress = 0.1
+        print(f"[{tag}] Starting batched inference on {num_images} frames: {task_ids}")
+
+        cleanup_cuda_memory()
+        estimated_memory = estimate_memory_requirement(num_images, lead.process_res)
+        mem_available, mem_msg = check_memory_availability(estimated_memory)
+        print(f"[{tag}] {mem_msg}")
+        if not mem_available:
+            raise RuntimeError(f"Insufficient GPU memory for the batch. {mem_msg}")
+
+        model = _backend.get_model()
+        task_ids = _drop_cancelled(task_ids)
+        requests = [_tasks[task_id].request for task_id in task_ids]
+        if not task_ids:
+            raise TaskCancelled(f"[{tag}] All tasks cancelled")
+        for task_id in task_ids:
+            _tasks[task_id].progress = 0.3
+        predictions = model.inference_batch(
+            [request.image_paths for request in requests],
+            process_res=lead.process_res,
+            process_res_method=lead.process_res_method,
+            export_feat_layers=lead.export_feat_layers,
+            max_batch_size=_max_batch_size,
+        )
+        _batch_stats["forwards"] += 1
+        _batch_stats["tasks"] += len(task_ids)
+    except TaskCancelled as e:
+        print(str(e))
+        return
+    except Exception as e:
+        # Fall back to running the tasks one by one, in their original order
+        print(f"[{tag}] Batched inference failed ({e}); running the tasks one by one")
+        cleanup_cuda_memory()
+        with _queue_lock:
+            _task_queue.push_front(task_ids, [request.client_id for request in requests])
+        for task_id in task_ids:
+            task = _tasks[task_id]
+            task.status, task.started_at, task.progress = "pending", None, None
+            task.message = f"[{task_id}] Re-queued to run without batching"
+        return
+
+    inference_time = time.time() - start_time
+    print(f"[{tag}] Batched inference completed in {inference_time:.2f}s")
+
+    # Fan the results out to each task's export directory
+    for task_id, request, prediction in zip(task_ids, requests, predictions):
+        task = _tasks[task_id]
+        if task_id in _cancel_requested:
+            print(f"[{task_id}] Cancelled before export")
+            _finish_task(task_id, "cancelled", f"[{task_id}] Cancelled after batched inference")
+            continue
+        try:
+            task.progress = 0.6
+            if request.export_dir:
+                model.export_prediction(
+                    prediction,
+                    request.export_dir,
+                    request.export_format,
+                    image=request.image_paths,
+                    process_res_method=request.process_res_method,
+                    conf_thresh_percentile=request.conf_thresh_percentile,
+                    num_max_points=request.num_max_points,
+                    show_cameras=request.show_cameras,
+                    feat_vis_fps=request.feat_vis_fps,
+                )
+            total_time = time.time() - task.created_at
+            task.status = "completed"
+            task.message = (
+                f"[{task_id}] Completed in {time.time() - start_time:.2f}s "
+                f"(batched with {len(task_ids) - 1} other task(s), "
+                f"queue wait {task.queue_wait:.2f}s)"
+            )
+            task.progress = 1.0
+            task.export_dir = request.export_dir
+            print(f"[{task_id}] Task completed successfully ({total_time:.2f}s since submission)")
+        except Exception as e:
+            print(f"[{task_id}] Export failed: {e}")
+            task.status = "failed"
+            task.message = f"[{task_id}] Export failed after batched inference: {e}"
+        task.completed_at = time.time()
+
+    del predictions
+    _cancel_requested.difference_update(task_ids)
+    cleanup_cuda_memory()
+
+
 def _cleanup_old_tasks():
-    """Clean up old completed/failed tasks to prevent memory buildup."""
+    """Clean up old finished tasks to prevent memory buildup."""
     global _tasks
 
     current_time = time.time()
@@ -398,9 +695,9 @@ def _cleanup_old_tasks():
 
     # Find tasks to remove - more aggressive cleanup
     for task_id, task in _tasks.items():
-        # Remove completed/failed tasks older than 10 minutes (instead of 1 hour)
+        # Remove finished tasks older than 10 minutes (instead of 1 hour)
         if (
-            task.status in ["completed", "failed"]
+            task.status in FINISHED_STATUSES
             and task.completed_at
             and current_time - task.completed_at > 600
         ):  # 10 minutes
@@ -411,12 +708,10 @@ def _cleanup_old_tasks():
         del _tasks[task_id]
         print(f"[CLEANUP] Removed old task: {task_id}")
 
-    # If still too many tasks, remove oldest completed/failed tasks
+    # If still too many tasks, remove oldest finished tasks
     if len(_tasks) > MAX_TASK_HISTORY:
         completed_tasks = [
-            (task_id, task)
-            for task_id, task in _tasks.items()
-            if task.status in ["completed", "failed"]
+            (task_id, task) for task_id, task in _tasks.items() if task.status in FINISHED_STATUSES
         ]
         completed_tasks.sort(key=lambda x: x[1].completed_at or 0)
 
@@ -427,7 +722,7 @@ def _cleanup_old_tasks():
             print(f"[CLEANUP] Removed excess task: {task_id}")
 
     # Count active tasks (only pending and running)
-    active_count = sum(1 for task in _tasks.values() if task.status in ["pending", "running"])
+    active_count = sum(1 for task in _tasks.values() if task.status in ACTIVE_STATUSES)
     print(
         "[CLEANUP] Task cleanup completed. "
         f"Total tasks: {len(_tasks)}, Active tasks: {active_count}"
@@ -556,11 +851,26 @@ def build_group_manifest(root_dir: str, group: str) -> dict:
     return {"group": group, "items": items}
 
 
-def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str] = None) -> FastAPI:
-    """Create FastAPI application with model backend."""
-    global _backend, _app
+def create_app(
+    model_dir: str,
+    device: str = "cuda",
+    gallery_dir: Optional[str] = None,
+    batch_window_ms: float = BATCH_WINDOW_MS,
+    max_batch_size: int = MAX_BATCH_SIZE,
+) -> FastAPI:
+    """
+    Create FastAPI application with model backend.
+
+    Compatible queued requests (same resolution settings and view count, no input
+    cameras) share one batched forward pass: a request waits at most ``batch_window_ms``
+    after submission for up to ``max_batch_size - 1`` partners. ``max_batch_size=1``
+    disables batching.
+    """
+    global _backend, _app, _batch_window_s, _max_batch_size
 
     _backend = ModelBackend(model_dir, device)
+    _batch_window_s = max(0.0, batch_window_ms) / 1000.0
+    _max_batch_size = max(1, int(max_batch_size))
     _app = FastAPI(
         title="Depth Anything 3 Backend",
         description="Model inference service for Depth Anything 3",
@@ -848,10 +1158,8 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
             uptime_str = "Not running"
 
         # Get tasks information
-        active_tasks = [task for task in _tasks.values() if task.status in ["pending", "running"]]
-        completed_tasks = [
-            task for task in _tasks.values() if task.status in ["completed", "failed"]
-        ]
+        active_tasks = [task for task in _tasks.values() if task.status in ACTIVE_STATUSES]
+        completed_tasks = [task for task in _tasks.values() if task.status in FINISHED_STATUSES]
 
         # Generate task HTML
         active_tasks_html = ""
@@ -1023,6 +1331,10 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
             background: #f8d7da;
             color: #721c24;
         }}
+        .status-cancelled, .status-expired {{
+            background: #e2e3e5;
+            color: #383d41;
+        }}
         .refresh-btn {{
             background: #007bff;
             color: white;
@@ -1173,6 +1485,7 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
         else:
             status["gpu_memory"] = None
 
+        status["scheduler"] = _scheduler_metrics()
         return status
 
     @_app.post("/inference", response_model=InferenceResponse)
@@ -1209,7 +1522,14 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
         )
 
         # Add task to queue
-        _task_queue.append(task_id)
+        with _queue_lock:
+            _task_queue.push(
+                task_id,
+                priority=request.priority,
+                client=request.client_id,
+                deadline=request.deadline,
+                key=_batch_key(request),
+            )
 
         # If no task is running, start processing the queue
         if _running_task_id is None:
@@ -1229,6 +1549,7 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
         if task_id not in _tasks:
             raise HTTPException(status_code=404, detail="Task not found")
 
+        _expire_pending_tasks()
         return _tasks[task_id]
 
     @_app.get("/gpu-memory")
@@ -1259,10 +1580,8 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
     async def list_tasks():
         """List all tasks."""
         # Separate active and completed tasks
-        active_tasks = [task for task in _tasks.values() if task.status in ["pending", "running"]]
-        completed_tasks = [
-            task for task in _tasks.values() if task.status in ["completed", "failed"]
-        ]
+        active_tasks = [task for task in _tasks.values() if task.status in ACTIVE_STATUSES]
+        completed_tasks = [task for task in _tasks.values() if task.status in FINISHED_STATUSES]
 
         return {
             "tasks": list(_tasks.values()),
@@ -1283,16 +1602,30 @@ def create_app(model_dir: str, device: str = "cuda", gallery_dir: Optional[str]
 
     @_app.delete("/task/{task_id}")
     async def delete_task(task_id: str):
-        """Delete a specific task."""
+        """
+        Cancel a pending or running task, or delete a finished one.
+
+        Pending tasks leave the queue immediately; running tasks stop at their next stage
+        boundary (before model loading, inference or export) and end as "cancelled".
+        """
         if task_id not in _tasks:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        # Only allow deletion of completed/failed tasks
-        if _tasks[task_id].status not in ["completed", "failed"]:
-            raise HTTPException(status_code=400, detail="Cannot delete running or pending tasks")
+        if _tasks[task_id].status in FINISHED_STATUSES:
+            del _tasks[task_id]
+            return {"message": f"Task {task_id} deleted successfully"}
 
-        del _tasks[task_id]
-        return {"message": f"Task {task_id} deleted successfully"}
+        with _queue_lock:
+            removed = _task_queue.remove(task_id)
+            if not removed:
+                # Already handed to the worker: stop it between stages
+                _cancel_requested.add(task_id)
+        if removed:
+            _finish_task(task_id, "cancelled", f"[{task_id}] Cancelled while queued")
+            return {"message": f"Task {task_id} cancelled"}
+
+        _tasks[task_id].message = f"[{task_id}] Cancellation requested"
+        return {"message": f"Task {task_id} will be cancelled at its next stage"}
 
     @_app.post("/reload")
     async def reload_model():
@@ -1374,9 +1707,11 @@ def start_server(
     host: str = "127.0.0.1",
     port: int = 8000,
     gallery_dir: Optional[str] = None,
+    batch_window_ms: float = BATCH_WINDOW_MS,
+    max_batch_size: int = MAX_BATCH_SIZE,
 ):
     """Start the backend server."""
-    app = create_app(model_dir, device, gallery_dir)
+    app = create_app(model_dir, device, gallery_dir, batch_window_ms, max_batch_size)
 
     print("Starting Depth Anything 3 Backend...")
     print(f"Model directory: {model_dir}")
@@ -1412,6 +1747,23 @@ if __name__ == "__main__":
     parser.add_argument("--host", default="127.0.0.1", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind to")
     parser.add_argument("--gallery-dir", help="Gallery directory path (optional)")
+    parser.add_argument(
+        "--batch-window-ms",
+        type=float,
+        default=BATCH_WINDOW_MS,
+        help="Max extra latency a request waits for batch partners",
+    )
+    parser.add_argument(
+        "--max-batch-size", type=int, default=MAX_BATCH_SIZE, help="Max requests per forward"
+    )
 
     args = parser.parse_args()
-    start_server(args.model_dir, args.device, args.host, args.port, args.gallery_dir)
+    start_server(
+        args.model_dir,
+        args.device,
+        args.host,
+        args.port,
+        args.gallery_dir,
+        args.batch_window_ms,
+        args.max_batch_size,
+    )
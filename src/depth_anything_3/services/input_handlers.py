@@ -24,7 +24,8 @@ import cv2
 import numpy as np
 import typer
 
-from ..utils.read_write_model import read_model
+from ..utils.colmap_io import qvecs_to_rotmats, read_colmap_model
+from ..utils.read_write_model import CAMERA_MODEL_IDS
 
 
 class InputHandler:
@@ -126,52 +127,49 @@ class ColmapHandler(InputHandler):
         # Load COLMAP data
         typer.echo("Loading COLMAP reconstruction data...")
         try:
-            cameras, images, points3D = read_model(sparse_dir)
+            # Only poses are needed: skip observations and the (possibly huge) points3D
+            cameras, images, _ = read_colmap_model(
+                sparse_dir, load_points2D=False, load_points3D=False
+            )
 
             typer.echo(
-                f"Loaded COLMAP data: {len(cameras)} cameras, {len(images)} images, "
-                f"{len(points3D)} 3D points."
+                f"Loaded COLMAP data: {len(cameras)} cameras, {len(images)} images "
+                "(3D points not loaded)."
             )
 
-            # Get image files and pose data
-            image_files = []
-            extrinsics = []
+            # Keep images whose files exist
+            keep = [
+                i
+                for i, name in enumerate(images.names)
+                if os.path.exists(os.path.join(images_dir, name))
+            ]
+            image_files = [os.path.join(images_dir, images.names[i]) for i in keep]
+
+            # Create extrinsic matrices (world to camera)
+            extrinsics = np.tile(np.eye(4), (len(keep), 1, 1))
+            extrinsics[:, :3, :3] = qvecs_to_rotmats(images.qvecs[keep])
+            extrinsics[:, :3, 3] = images.tvecs[keep]
+
+            # Create intrinsic matrices from each image's camera
+            camera_rows = {int(cid): row for row, cid in enumerate(cameras.ids)}
             intrinsics = []
+            for i in keep:
+                c = camera_rows[int(images.camera_ids[i])]
+                model = CAMERA_MODEL_IDS[int(cameras.models[c])].model_name
+                params = cameras.params[c, : cameras.num_params(c)]
+                if model == "PINHOLE":
+                    fx, fy, cx, cy = params
+                elif model == "SIMPLE_PINHOLE":
+                    f, cx, cy = params
+                    fx = fy = f
+                else:
+                    # For other models, use basic pinhole approximation
+                    fx = fy = params[0] if len(params) > 0 else 1000
+                    cx = cameras.widths[c] / 2
+                    cy = cameras.heights[c] / 2
 
-            for image_id, image_data in images.items():
-                image_name = image_data.name
-                image_path = os.path.join(images_dir, image_name)
-
-                if os.path.exists(image_path):
-                    image_files.append(image_path)
-
-                    # Get camera parameters
-                    camera = cameras[image_data.camera_id]
-
-                    # Convert quaternion to rotation matrix
-                    R = image_data.qvec2rotmat()
-                    t = image_data.tvec
-
-                    # Create extrinsic matrix (world to camera)
-                    extrinsic = np.eye(4)
-                    extrinsic[:3, :3] = R
-                    extrinsic[:3, 3] = t
-                    extrinsics.append(extrinsic)
-
-                    # Create intrinsic matrix
-                    if camera.model == "PINHOLE":
-                        fx, fy, cx, cy = camera.params
-                    elif camera.model == "SIMPLE_PINHOLE":
-                        f, cx, cy = camera.params
-                        fx = fy = f
-                    else:
-                        # For other models, use basic pinhole approximation
-                        fx = fy = camera.params[0] if len(camera.params) > 0 else 1000
-                        cx = camera.width / 2
-                        cy = camera.height / 2
-
-                    intrinsic = np.array([[fx, 0, cx], [0, fy, cy], [0, 0, 1]])
-                    intrinsics.append(intrinsic)
+                intrinsic = np.array([[fx, 0, cx], [0, fy, cy], [0, 0, 1]])
+                intrinsics.append(intrinsic)
 
             if not image_files:
                 raise typer.BadParameter("No valid images found in COLMAP data")
@@ -0,0 +1,211 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Pending-task queue for the backend service.
+
+Tasks are ordered by priority (higher first); within a priority, clients take turns
+(round-robin) and each client's tasks run in submission order. Tasks can also be looked
+up by batch key, so the scheduler finds batch partners without scanning the queue, and
+expire once their deadline passes.
+
+Every task is referenced from a few deques / heaps. Removing a task only marks its entry
+dead; the structures drop dead entries when they reach them, so push, pop, cancel and
+expiry are O(log n) amortized.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from collections import deque
+from typing import Hashable, Optional
+
+DEFAULT_CLIENT = "anonymous"
+
+
+class _Entry:
+    __slots__ = ("task_id", "priority", "client", "deadline", "key", "alive")
+
+    def __init__(self, task_id, priority, client, deadline, key):
+        self.task_id = task_id
+        self.priority = priority
+        self.client = client
+        self.deadline = deadline
+        self.key = key
+        self.alive = True
+
+
+class _PriorityLevel:
+    """Round-robin over the clients with queued tasks at one priority."""
+
+    __slots__ = ("clients", "turns", "size")
+
+    def __init__(self):
+        self.clients: dict[str, deque] = {}  # client -> its entries, oldest first
+        self.turns: deque = deque()  # clients with queued entries, next turn first
+        self.size = 0
+
+    def push(self, entry: _Entry) -> None:
+        if entry.client not in self.clients:
+            self.clients[entry.client] = deque()
+            self.turns.append(entry.client)
+        self.clients[entry.client].append(entry)
+        self.size += 1
+
+    def pop(self) -> _Entry:
+        while True:
+            client = self.turns.popleft()
+            entries = self.clients[client]
+            while entries and not entries[0].alive:
+                entries.popleft()
+            if not entries:
+                del self.clients[client]
+                continue
+            entry = entries.popleft()
+            while entries and not entries[0].alive:
+                entries.popleft()
+            if entries:
+                self.turns.append(client)
+            else:
+                del self.clients[client]
+            return entry
+
+
+class TaskQueue:
+    """
+    Priority queue of pending task ids with per-client fairness.
+
+    Not thread-safe; the backend guards it with its queue lock.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, _Entry] = {}
+        self._levels: dict[int, _PriorityLevel] = {}
+        self._priorities: list[int] = []  # heap of negated priorities with queued tasks
+        self._retry: deque = deque()  # entries put back in front of everything else
+        self._by_key: dict[Hashable, deque] = {}
+        self._deadlines: list = []  # heap of (deadline, seq, entry)
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._entries
+
+    def push(
+        self,
+        task_id: str,
+        priority: int = 0,
+        client: Optional[str] = None,
+        deadline: Optional[float] = None,
+        key: Optional[Hashable] = None,
+    ) -> None:
+        """
+        Queue ``task_id``. ``deadline`` is the latest time (``time.time()``) it may start;
+        tasks with equal, non-None ``key`` can be taken together by ``pop_matching``.
+        """
+        if task_id in self._entries:
+            raise ValueError(f"Task {task_id} is already queued")
+        entry = _Entry(task_id, priority, client or DEFAULT_CLIENT, deadline, key)
+        self._entries[task_id] = entry
+        level = self._levels.get(priority)
+        if level is None:
+            level = self._levels[priority] = _PriorityLevel()
+            heapq.heappush(self._priorities, -priority)
+        level.push(entry)
+        self._index(entry)
+
+    def push_front(self, task_ids: list[str], clients: Optional[list[str]] = None) -> None:
+        """Queue ``task_ids`` ahead of all other tasks, in order, without batch keys."""
+        for i, task_id in enumerate(task_ids):
+            if task_id in self._entries:
+                raise ValueError(f"Task {task_id} is already queued")
+            client = clients[i] if clients else None
+            entry = _Entry(task_id, None, client or DEFAULT_CLIENT, None, None)
+            self._entries[task_id] = entry
+        self._retry.extendleft(self._entries[task_id] for task_id in reversed(task_ids))
+
+    def _index(self, entry: _Entry) -> None:
+        if entry.key is not None:
+            self._by_key.setdefault(entry.key, deque()).append(entry)
+        if entry.deadline is not None:
+            heapq.heappush(self._deadlines, (entry.deadline, next(self._seq), entry))
+
+    def _take(self, entry: _Entry) -> _Entry:
+        entry.alive = False
+        del self._entries[entry.task_id]
+        if entry.priority is not None:
+            self._levels[entry.priority].size -= 1
+        # drop dead entries at the head of the key index so unused keys do not pile up
+        entries = self._by_key.get(entry.key)
+        if entries is not None:
+            while entries and not entries[0].alive:
+                entries.popleft()
+            if not entries:
+                del self._by_key[entry.key]
+        return entry
+
+    def pop(self) -> Optional[tuple[str, Optional[Hashable]]]:
+        """Remove the next task to run; returns ``(task_id, key)`` or None if empty."""
+        while self._retry:
+            entry = self._retry.popleft()
+            if entry.alive:
+                return self._take(entry).task_id, None
+        while self._priorities:
+            priority = -self._priorities[0]
+            level = self._levels[priority]
+            if level.size == 0:
+                heapq.heappop(self._priorities)
+                del self._levels[priority]
+                continue
+            entry = self._take(level.pop())
+            return entry.task_id, entry.key
+        return None
+
+    def pop_matching(self, key: Hashable, limit: int) -> list[str]:
+        """Remove up to ``limit`` tasks queued with ``key``, oldest first."""
+        taken = []
+        while len(taken) < limit and self._by_key.get(key):
+            entry = self._by_key[key][0]
+            if entry.alive:
+                taken.append(self._take(entry).task_id)
+            else:
+                self._by_key[key].popleft()
+        return taken
+
+    def remove(self, task_id: str) -> bool:
+        """Remove a queued task; returns False if it is not queued."""
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return False
+        self._take(entry)
+        return True
+
+    def expire(self, now: float) -> list[str]:
+        """Remove and return the tasks whose deadline is before ``now``."""
+        expired = []
+        while self._deadlines and self._deadlines[0][0] < now:
+            _, _, entry = heapq.heappop(self._deadlines)
+            if entry.alive:
+                expired.append(self._take(entry).task_id)
+        return expired
+
+    def counts_by_client(self) -> dict[str, int]:
+        """Number of queued tasks per client."""
+        counts: dict[str, int] = {}
+        for entry in self._entries.values():
+            counts[entry.client] = counts.get(entry.client, 0) + 1
+        return counts
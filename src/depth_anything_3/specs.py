@@ -14,10 +14,285 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Optional
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Optional
 import numpy as np
 import torch
+from addict import Dict as AddictDict
+
+_D2H_STREAMS: dict[torch.device, torch.cuda.Stream] = {}
+
+
+def _get_d2h_stream(device: torch.device) -> torch.cuda.Stream:
+    """One side stream per device for device-to-host copies."""
+    if device not in _D2H_STREAMS:
+        _D2H_STREAMS[device] = torch.cuda.Stream(device=device)
+    return _D2H_STREAMS[device]
+
+
+class DeferredArray:
+    """
+    A device tensor that is converted to a host numpy array on first access.
+
+    Slicing returns another ``DeferredArray`` backed by a view of the same storage, so
+    ``pred[10:20]`` never copies. ``prefetch()`` starts an asynchronous copy into a pinned
+    host buffer on a side CUDA stream; ``materialize()`` waits for it and returns the
+    numpy array. An optional element-wise ``transform`` (e.g. thresholding) is applied to
+    the host array.
+    """
+
+    def __init__(
+        self,
+        tensor: torch.Tensor,
+        transform: Callable[[np.ndarray], np.ndarray] | None = None,
+        _host: torch.Tensor | None = None,
+        _event: torch.cuda.Event | None = None,
+    ):
+        self.tensor = tensor
+        self.transform = transform
+        self._host = _host
+        self._event = _event
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return tuple(self.tensor.shape)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the host copy made by ``materialize()``."""
+        return self.tensor.numel() * self.tensor.element_size()
+
+    def __len__(self) -> int:
+        return self.tensor.shape[0]
+
+    def __getitem__(self, index) -> DeferredArray:
+        host = self._host[index] if self._host is not None else None
+        return DeferredArray(self.tensor[index], self.transform, host, self._event)
+
+    def __array__(self, dtype=None):
+        array = self.materialize()
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+    def prefetch(self) -> DeferredArray:
+        """Start the device-to-host copy without blocking."""
+        if self._host is not None:
+            return self
+        tensor = self.tensor.detach()
+        if tensor.device.type != "cuda":
+            self._host = tensor.cpu()
+            return self
+        stream = _get_d2h_stream(tensor.device)
+        stream.wait_stream(torch.cuda.current_stream(tensor.device))
+        with torch.cuda.stream(stream):
+            host = torch.empty(tensor.shape, dtype=tensor.dtype, pin_memory=True)
+            host.copy_(tensor, non_blocking=True)
+            event = torch.cuda.Event()
+            event.record(stream)
+        # keep the device storage alive until the copy stream is done with it
+        tensor.record_stream(stream)
+        self._host, self._event = host, event
+        return self
+
+    def materialize(self) -> np.ndarray:
+        """Return the host numpy array, waiting for a pending copy if needed."""
+        self.prefetch()
+        if self._event is not None:
+            self._event.synchronize()
+        array = self._host.numpy()
+        if self.transform is not None:
+            array = self.transform(array)
+        return array
+
+
+class CompactArray:
+    """
+    Quantized storage for a prediction array, dequantized on every access.
+
+    Modes:
+        - ``"fp16"``: float16 copy (depth, conf)
+        - ``"log_uint16"``: per-frame log-quantized uint16 with stored range; code 0 keeps
+          non-positive / non-finite values as 0 (depth)
+        - ``"bitpack"``: bool mask packed 8 pixels per byte along the last axis (sky)
+        - ``"int8"``: symmetric per-channel int8 with float32 scales over the last axis (aux)
+
+    Indexing along the first (frame) axis slices the quantized data, so per-frame access
+    only dequantizes the selected frames.
+    """
+
+    MODES = ("fp16", "log_uint16", "bitpack", "int8")
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        mode: str,
+        lo: np.ndarray | None = None,
+        hi: np.ndarray | None = None,
+        scale: np.ndarray | None = None,
+        width: int | None = None,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported compact mode: {mode}")
+        self.data = data
+        self.mode = mode
+        self.lo = lo
+        self.hi = hi
+        self.scale = scale
+        self.width = width
+
+    @classmethod
+    def encode(cls, array: np.ndarray, mode: str) -> CompactArray:
+        array = np.asarray(array)
+        if mode == "fp16":
+            return cls(array.astype(np.float16), mode)
+        if mode == "log_uint16":
+            valid = np.isfinite(array) & (array > 0)
+            log = np.log(np.where(valid, array, 1.0), dtype=np.float32)
+            axes = tuple(range(1, array.ndim))
+            lo = np.where(valid, log, np.inf).min(axis=axes, keepdims=True)
+            hi = np.where(valid, log, -np.inf).max(axis=axes, keepdims=True)
+            lo = np.where(np.isfinite(lo), lo, 0.0).astype(np.float32)
+            hi = np.where(np.isfinite(hi), hi, 0.0).astype(np.float32)
+            span = np.maximum(hi - lo, 1e-12)
+            code = np.rint((log - lo) / span * 65534.0) + 1.0
+            data = np.where(valid, code, 0.0).astype(np.uint16)
+            return cls(data, mode, lo=lo, hi=hi)
+        if mode == "bitpack":
+            return cls(np.packbits(array.astype(bool), axis=-1), mode, width=array.shape[-1])
+        if mode == "int8":
+            axes = tuple(range(array.ndim - 1))
+            scale = np.abs(array).max(axis=axes).astype(np.float32) / 127.0
+            scale[scale == 0] = 1.0
+            data = np.clip(np.rint(array / scale), -127, 127).astype(np.int8)
+            return cls(data, mode, scale=scale)
+        raise ValueError(f"Unsupported compact mode: {mode}")
+
+    def decode(self) -> np.ndarray:
+        if self.mode == "fp16":
+            return self.data.astype(np.float32)
+        if self.mode == "log_uint16":
+            span = np.maximum(self.hi - self.lo, 1e-12)
+            log = self.lo + (self.data.astype(np.float32) - 1.0) / 65534.0 * span
+            return np.where(self.data > 0, np.exp(log), 0.0).astype(np.float32)
+        if self.mode == "bitpack":
+            return np.unpackbits(self.data, axis=-1, count=self.width).astype(bool)
+        return self.data.astype(np.float32) * self.scale
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        if self.mode == "bitpack":
+            return self.data.shape[:-1] + (self.width,)
+        return self.data.shape
+
+    @property
+    def nbytes(self) -> int:
+        extra = sum(a.nbytes for a in (self.lo, self.hi, self.scale) if a is not None)
+        return self.data.nbytes + extra
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def __getitem__(self, index) -> CompactArray:
+        lo = self.lo[index] if self.lo is not None else None
+        hi = self.hi[index] if self.hi is not None else None
+        return CompactArray(self.data[index], self.mode, lo, hi, self.scale, self.width)
+
+    def __array__(self, dtype=None):
+        array = self.decode()
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+
+class AuxFeatureHandle:
+    """
+    An ``aux`` feature array stored on disk by ``AuxFeatureSink`` (``utils/io/aux_store.py``).
+
+    Only the file path and metadata are held in memory. Frames are read from a memory-mapped
+    ``.npy`` file and dequantized on access, so indexing along the first (frame) axis
+    returns a float32 numpy array of the selected frames and touches only their bytes.
+    ``mode`` is ``None`` (float32 on disk), ``"fp16"`` or ``"int8"`` (with per-channel
+    ``scale``, as in ``CompactArray``). A handle returned while its file is still being
+    written waits for the write on first access.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        shape: tuple[int, ...],
+        mode: str | None = None,
+        scale: np.ndarray | None = None,
+        pending=None,  # concurrent.futures.Future of the background write
+    ):
+        self.path = path
+        self.shape = tuple(shape)
+        self.mode = mode
+        self.scale = scale
+        self._pending = pending
+        self._data = None
+
+    def wait(self) -> AuxFeatureHandle:
+        """Block until the background write of this array has finished."""
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+        return self
+
+    def _memmap(self) -> np.ndarray:
+        if self._data is None:
+            self.wait()
+            self._data = np.load(self.path, mmap_mode="r")
+        return self._data
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the dequantized array (what ``materialize()`` allocates)."""
+        return int(np.prod(self.shape)) * 4
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, index) -> np.ndarray:
+        data = self._memmap()[index]
+        if self.mode is None:
+            return np.array(data, dtype=np.float32)
+        return CompactArray(data, self.mode, scale=self.scale).decode()
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __array__(self, dtype=None):
+        array = self.materialize()
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+    def materialize(self) -> np.ndarray:
+        return self[:]
+
+
+class DeferredDict(AddictDict):
+    """
+    Addict dict whose ``DeferredArray`` values are materialized on first access and whose
+    ``CompactArray`` values are dequantized on every access.
+    """
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if isinstance(value, DeferredArray):
+            value = value.materialize()
+            dict.__setitem__(self, key, value)
+        elif isinstance(value, CompactArray):
+            value = value.decode()
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
 
 
 @dataclass
@@ -33,6 +308,17 @@ class Gaussians:
 
 @dataclass
 class Prediction:
+    """
+    Per-scene model outputs.
+
+    Array fields may hold ``DeferredArray`` placeholders (see ``OutputProcessor(lazy=True)``),
+    which are transparently converted to numpy on first attribute access, or ``CompactArray``
+    storage (see ``compact()``), which is dequantized on every access. Indexing with an
+    int or slice (``pred[10:20]``) returns a new ``Prediction`` whose per-frame fields are
+    views of this one; scene-level fields (``gaussians``, ``is_metric``, ``scale_factor``)
+    are shared.
+    """
+
     depth: np.ndarray  # N, H, W
     is_metric: int
     sky: np.ndarray | None = None  # N, H, W
@@ -43,3 +329,113 @@ class Prediction:
     gaussians: Gaussians | None = None  # 3D gaussians
     aux: dict[str, Any] = None  #
     scale_factor: Optional[float] = None  # metric scale
+    valid_mask: np.ndarray | None = None  # N, H, W - non-padded pixels (batch_shape_mode="pad")
+
+    _FRAME_FIELDS = (
+        "depth",
+        "sky",
+        "conf",
+        "extrinsics",
+        "intrinsics",
+        "processed_images",
+        "valid_mask",
+    )
+
+    def __getattribute__(self, name: str):
+        value = object.__getattribute__(self, name)
+        if isinstance(value, DeferredArray):
+            value = value.materialize()
+            object.__setattr__(self, name, value)
+        elif isinstance(value, CompactArray):
+            value = value.decode()
+        return value
+
+    def __len__(self) -> int:
+        return len(object.__getattribute__(self, "depth"))
+
+    def __getitem__(self, index: int | slice) -> Prediction:
+        if isinstance(index, int):
+            index = slice(index, index + 1 if index != -1 else None)
+        values = {f.name: object.__getattribute__(self, f.name) for f in fields(self)}
+        for name in self._FRAME_FIELDS:
+            if values[name] is not None:
+                values[name] = values[name][index]
+        aux = values["aux"]
+        if aux is not None:
+            sliced = type(aux)()
+            frame_arrays = (np.ndarray, DeferredArray, CompactArray, AuxFeatureHandle)
+            for k, v in dict.items(aux):
+                dict.__setitem__(sliced, k, v[index] if isinstance(v, frame_arrays) else v)
+            values["aux"] = sliced
+        return Prediction(**values)
+
+    def prefetch(self, names: tuple[str, ...] | None = None) -> Prediction:
+        """
+        Start asynchronous device-to-host copies of deferred fields.
+
+        Args:
+            names: Field names to prefetch. Defaults to all per-frame fields; ``aux``
+                features are only copied when listed explicitly (e.g. ``("aux",)``).
+        """
+        names = self._FRAME_FIELDS if names is None else names
+        for name in names:
+            value = object.__getattribute__(self, name)
+            if isinstance(value, DeferredArray):
+                value.prefetch()
+            elif name == "aux" and value is not None:
+                for v in dict.values(value):
+                    if isinstance(v, DeferredArray):
+                        v.prefetch()
+        return self
+
+    def compact(
+        self,
+        depth: str | None = "fp16",
+        conf: str | None = "fp16",
+        sky: str | None = "bitpack",
+        aux: str | None = "int8",
+    ) -> Prediction:
+        """
+        Switch large per-frame fields to quantized ``CompactArray`` storage in place.
+
+        Accessors keep returning float32 / bool numpy arrays, but in-place edits of a
+        compacted field are not persisted. Pass ``None`` to leave a field untouched.
+
+        Args:
+            depth: "fp16" or "log_uint16"
+            conf: "fp16"
+            sky: "bitpack"
+            aux: "int8" or "fp16" for every array in ``aux``
+        """
+        for name, mode in (("depth", depth), ("conf", conf), ("sky", sky)):
+            if mode is None or object.__getattribute__(self, name) is None:
+                continue
+            if not isinstance(object.__getattribute__(self, name), CompactArray):
+                object.__setattr__(self, name, CompactArray.encode(getattr(self, name), mode))
+        if aux is not None and self.aux:
+            compact_aux = DeferredDict()
+            for k in list(self.aux.keys()):
+                v = self.aux[k]
+                if isinstance(v, np.ndarray) and np.issubdtype(v.dtype, np.floating):
+                    v = CompactArray.encode(v, aux)
+                dict.__setitem__(compact_aux, k, v)
+            self.aux = compact_aux
+        return self
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Approximate host memory held by the array fields (excluding ``gaussians``), counting
+        deferred fields and on-disk aux features at the size they materialize to.
+        """
+        stored = (np.ndarray, CompactArray, DeferredArray, AuxFeatureHandle)
+        total = 0
+        for name in self._FRAME_FIELDS:
+            value = object.__getattribute__(self, name)
+            if isinstance(value, stored):
+                total += value.nbytes
+        aux = object.__getattribute__(self, "aux")
+        for v in dict.values(aux) if aux is not None else ():
+            if isinstance(v, stored):
+                total += v.nbytes
+        return total
@@ -0,0 +1,236 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Batched camera-trajectory generation for novel-view rendering.
+
+The helpers in ``camera_trj_helpers`` work on one pose pair or one path at a time. The
+functions here build whole trajectories for all scenes and segments as single tensor
+operations: segment interpolation is one call over every (scene, segment) pair, path
+smoothing is one ``conv1d`` over all pose channels, and intrinsics are interpolated
+alongside. Finished trajectories are kept in a small LRU keyed by the input poses and
+trajectory parameters, so several exports of one prediction reuse them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Literal, Optional
+import torch
+import torch.nn.functional as F
+
+from depth_anything_3.utils.camera_trj_helpers import (
+    generate_wobble_transformation,
+    interpolate_extrinsics,
+    interpolate_intrinsics,
+)
+from depth_anything_3.utils.geometry import as_homogeneous
+
+# cv2.getGaussianKernel uses fixed kernels for these sizes when sigma <= 0
+_SMALL_GAUSSIAN_KERNELS = {
+    1: [1.0],
+    3: [0.25, 0.5, 0.25],
+    5: [0.0625, 0.25, 0.375, 0.25, 0.0625],
+    7: [0.03125, 0.109375, 0.21875, 0.28125, 0.21875, 0.109375, 0.03125],
+    9: [4 / 256, 13 / 256, 30 / 256, 51 / 256, 60 / 256, 51 / 256, 30 / 256, 13 / 256, 4 / 256],
+}
+
+TRAJECTORY_CACHE_SIZE = 16
+_trajectory_cache: OrderedDict = OrderedDict()
+_trajectory_cache_lock = threading.Lock()  # gs_video exports run on several threads
+
+
+def gaussian_kernel_1d(
+    k_size: int, dtype: torch.dtype = torch.float32, device: Optional[torch.device] = None
+) -> torch.Tensor:
+    """Same weights as ``cv2.getGaussianKernel(k_size, sigma=-1)``."""
+    if k_size in _SMALL_GAUSSIAN_KERNELS:
+        return torch.tensor(_SMALL_GAUSSIAN_KERNELS[k_size], dtype=dtype, device=device)
+    sigma = 0.3 * ((k_size - 1) * 0.5 - 1) + 0.8
+    x = torch.arange(k_size, dtype=torch.float64) - (k_size - 1) / 2
+    kernel = torch.exp(-(x**2) / (2 * sigma**2))
+    return (kernel / kernel.sum()).to(dtype=dtype, device=device)
+
+
+def _safe_kernel_size(k_size: int, num_frames: int) -> int:
+    """Positive odd kernel no longer than the path, as in ``render_stabilization_path``."""
+    k_size = max(k_size, 1)
+    if k_size % 2 == 0:
+        k_size += 1
+    max_odd = num_frames if num_frames % 2 == 1 else num_frames - 1
+    k_size = min(k_size, max(max_odd, 1))
+    if num_frames >= 3 and k_size < 3:
+        k_size = 3
+    return k_size
+
+
+@torch.no_grad()
+def smooth_trajectory(
+    cam2world: torch.Tensor,  # "batch view 4 4" | "batch view 3 4"
+    k_size: int = 45,
+) -> torch.Tensor:  # "batch view 4 4"
+    """
+    Batched ``render_stabilization_path``: Gaussian-filter the first two rotation columns
+    and the camera centres of every path with one reflect-padded ``conv1d``, then
+    re-orthonormalize the rotations.
+    """
+    b, v = cam2world.shape[:2]
+    if v <= 1:
+        return as_homogeneous(cam2world)
+    k_size = _safe_kernel_size(k_size, v)
+    kernel = gaussian_kernel_1d(k_size, cam2world.dtype, cam2world.device).view(1, 1, -1)
+
+    signal = cam2world[:, :, :3][..., [0, 1, 3]]  # b v 3(xyz) 3(r1 r2 t)
+    signal = signal.permute(0, 2, 3, 1).reshape(b * 9, 1, v)
+    pad = k_size // 2
+    filtered = F.conv1d(F.pad(signal, (pad, pad), mode="reflect"), kernel)
+    r1, r2, t = filtered.reshape(b, 3, 3, v).permute(0, 3, 2, 1).unbind(dim=2)  # b v 3
+
+    r1 = r1 / r1.norm(dim=-1, keepdim=True)
+    r2 = r2 / r2.norm(dim=-1, keepdim=True)
+    r3 = torch.linalg.cross(r1, r2)
+    return as_homogeneous(torch.stack([r1, r2, r3, t], dim=-1))
+
+
+@torch.no_grad()
+def slerp_extrinsics(
+    initial: torch.Tensor,  # "*#batch 4 4"
+    final: torch.Tensor,  # "*#batch 4 4"
+    t: torch.Tensor,  # " time_step"
+) -> torch.Tensor:  # "*batch time_step 4 4"
+    """Geodesic (log/exp) rotation interpolation with linear camera centres."""
+    initial, final = torch.broadcast_tensors(initial.double(), final.double())
+    rel = initial[..., :3, :3].transpose(-1, -2) @ final[..., :3, :3]
+    # axis-angle of the relative rotation (log map)
+    cos = ((rel.diagonal(dim1=-2, dim2=-1).sum(-1) - 1) / 2).clamp(-1, 1)
+    angle = torch.acos(cos)
+    skew = rel - rel.transpose(-1, -2)
+    axis = torch.stack([skew[..., 2, 1], skew[..., 0, 2], skew[..., 1, 0]], dim=-1)
+    axis = axis / axis.norm(dim=-1, keepdim=True).clamp_min(1e-12)
+    # exp map at every time step (Rodrigues)
+    tt = t.double().view((1,) * (angle.ndim) + (-1,))
+    theta = (angle[..., None] * tt)[..., None, None]  # *batch T 1 1
+    K = torch.zeros(axis.shape[:-1] + (3, 3), dtype=axis.dtype, device=axis.device)
+    K[..., 0, 1], K[..., 0, 2], K[..., 1, 2] = -axis[..., 2], axis[..., 1], -axis[..., 0]
+    K = (K - K.transpose(-1, -2))[..., None, :, :]
+    eye = torch.eye(3, dtype=axis.dtype, device=axis.device)
+    rot_t = eye + theta.sin() * K + (1 - theta.cos()) * (K @ K)
+
+    out = torch.eye(4, dtype=torch.float64, device=initial.device)
+    out = out.expand(rot_t.shape[:-2] + (4, 4)).clone()
+    out[..., :3, :3] = initial[..., None, :3, :3] @ rot_t
+    origin_i, origin_f = initial[..., None, :3, 3], final[..., None, :3, 3]
+    out[..., :3, 3] = origin_i + (origin_f - origin_i) * tt[..., None]
+    return out.float()
+
+
+def _join_segments(frames: torch.Tensor) -> torch.Tensor:
+    """(batch, segment, time, ...) -> (batch, path, ...), sharing each segment boundary."""
+    b, s, t = frames.shape[:3]
+    return torch.cat(
+        [frames[:, 0, :1], frames[:, :, 1:].reshape(b, s * (t - 1), *frames.shape[3:])], 1
+    )
+
+
+@torch.no_grad()
+def interpolate_trajectory(
+    cam2world: torch.Tensor,  # "batch view 4 4"
+    intr_normed: torch.Tensor,  # "batch view 3 3"
+    t: torch.Tensor,  # " time_step", from 0 to 1
+    stride: int = 1,
+    method: Literal["pivot", "slerp"] = "pivot",
+) -> tuple[torch.Tensor, torch.Tensor]:  # "batch path 4 4", "batch path 3 3"
+    """
+    Interpolate between views ``i`` and ``i + stride`` for all scenes and segments in one
+    call. ``pivot`` is ``camera_trj_helpers.interpolate_extrinsics`` (rotation about the
+    look vectors' focus point); ``slerp`` interpolates rotations geodesically. Segment
+    boundaries appear once in the joined path.
+    """
+    starts = torch.arange(0, cam2world.shape[1] - stride, stride, device=cam2world.device)
+    initial, final = cam2world[:, starts], cam2world[:, starts + stride]
+    interp_fn = interpolate_extrinsics if method == "pivot" else slerp_extrinsics
+    c2w = interp_fn(initial, final, t)  # b s t 4 4
+    intr = interpolate_intrinsics(intr_normed[:, starts], intr_normed[:, starts + stride], t)
+    return c2w, intr
+
+
+@torch.no_grad()
+def interpolated_path(
+    cam2world: torch.Tensor,  # "batch view 4 4"
+    intr_normed: torch.Tensor,  # "batch view 3 3"
+    t: torch.Tensor,  # " time_step"
+    method: Literal["pivot", "slerp"] = "pivot",
+) -> tuple[torch.Tensor, torch.Tensor]:  # "batch path 4 4", "batch path 3 3"
+    """Path through all views, ``len(t)`` frames per segment (boundaries shared)."""
+    c2w, intr = interpolate_trajectory(cam2world, intr_normed, t, method=method)
+    return _join_segments(c2w), _join_segments(intr)
+
+
+@torch.no_grad()
+def wobble_inter_path(
+    cam2world: torch.Tensor,  # "batch view 4 4"
+    intr_normed: torch.Tensor,  # "batch view 3 3"
+    inter_len: int,
+    n_skip: int = 3,
+) -> tuple[torch.Tensor, torch.Tensor]:  # "batch path 4 4", "batch path 3 3"
+    """Batched ``render_wobble_inter_path``."""
+    t = torch.linspace(0, 1, n_skip * inter_len, dtype=torch.float32, device=cam2world.device)
+    c2w, intr = interpolate_trajectory(cam2world, intr_normed, t, stride=n_skip)
+
+    starts = torch.arange(0, cam2world.shape[1] - n_skip, n_skip, device=cam2world.device)
+    origins = cam2world[..., :3, 3]
+    deltas = (origins[:, starts] - origins[:, starts + n_skip]).norm(dim=-1)  # b s
+    # running average of neighbouring segment lengths, as in render_wobble_inter_path
+    for seg in range(1, deltas.shape[1]):
+        deltas[:, seg] = (deltas[:, seg - 1] + deltas[:, seg]) / 2
+    tf = generate_wobble_transformation(
+        radius=deltas * 0.5, t=t, num_rotations=1, scale_radius_with_t=False
+    )
+    return _join_segments(c2w @ tf), _join_segments(intr)
+
+
+def trajectory_cache_key(*tensors: torch.Tensor, **params) -> tuple:
+    """Key of a trajectory: digest of the input tensors plus the trajectory parameters."""
+    digest = hashlib.sha1()
+    for tensor in tensors:
+        array = tensor.detach().cpu().contiguous().numpy()
+        digest.update(str((array.dtype, array.shape)).encode())
+        digest.update(array.tobytes())
+    devices = tuple(str(tensor.device) for tensor in tensors)
+    return (digest.hexdigest(), devices, tuple(sorted(params.items())))
+
+
+def get_cached_trajectory(key: tuple) -> Optional[tuple[torch.Tensor, ...]]:
+    with _trajectory_cache_lock:
+        trajectory = _trajectory_cache.get(key)
+        if trajectory is None:
+            return None
+        _trajectory_cache.move_to_end(key)
+    return tuple(tensor.clone() for tensor in trajectory)
+
+
+def put_cached_trajectory(key: tuple, trajectory: tuple[torch.Tensor, ...]) -> None:
+    trajectory = tuple(tensor.detach().clone() for tensor in trajectory)
+    with _trajectory_cache_lock:
+        _trajectory_cache[key] = trajectory
+        _trajectory_cache.move_to_end(key)
+        while len(_trajectory_cache) > TRAJECTORY_CACHE_SIZE:
+            _trajectory_cache.popitem(last=False)
+
+
+def clear_trajectory_cache() -> None:
+    with _trajectory_cache_lock:
+        _trajectory_cache.clear()
@@ -0,0 +1,643 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Array-backed COLMAP sparse model I/O.
+
+Cameras, images and 3D points are held as struct-of-arrays (``ColmapCameras``,
+``ColmapImages``, ``ColmapPoints3D``); variable-length per-image observations and per-point
+tracks are flattened with offset arrays. The binary layout matches COLMAP's
+``cameras.bin`` / ``images.bin`` / ``points3D.bin`` (and ``utils/read_write_model``), but
+records are packed and parsed with numpy structured dtypes in bulk instead of one
+``struct.pack`` / ``struct.unpack`` per field, which matters for multi-million point models.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+from dataclasses import dataclass
+import numpy as np
+
+from depth_anything_3.utils.read_write_model import CAMERA_MODEL_IDS, CAMERA_MODEL_NAMES
+
+IMAGE_HEADER_DTYPE = np.dtype(
+    [("id", "<i4"), ("qvec", "<f8", 4), ("tvec", "<f8", 3), ("camera_id", "<i4")]
+)
+POINT2D_DTYPE = np.dtype([("xy", "<f8", 2), ("point3D_id", "<i8")])
+POINT3D_HEADER_DTYPE = np.dtype(
+    [("id", "<u8"), ("xyz", "<f8", 3), ("rgb", "u1", 3), ("error", "<f8"), ("track_len", "<u8")]
+)
+TRACK_ELEM_DTYPE = np.dtype([("image_id", "<i4"), ("point2D_idx", "<i4")])
+POINT3D_RUN_PROBE = 64  # records checked by the first probe of a run
+POINT3D_WALK_BLOCK = 4096  # records walked one by one after a short run
+
+
+@dataclass
+class ColmapCameras:
+    """
+    Cameras as arrays.
+
+    Attributes:
+        ids: (C,) camera ids
+        models: (C,) COLMAP model ids (see ``read_write_model.CAMERA_MODELS``)
+        widths, heights: (C,) image sizes
+        params: (C, P) parameters; rows of models with fewer than P params are
+            left-aligned and padded
+    """
+
+    ids: np.ndarray
+    models: np.ndarray
+    widths: np.ndarray
+    heights: np.ndarray
+    params: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def num_params(self, i: int) -> int:
+        return CAMERA_MODEL_IDS[int(self.models[i])].num_params
+
+
+@dataclass
+class ColmapImages:
+    """
+    Registered images as arrays.
+
+    Observations of image ``i`` are ``xys[offsets[i]:offsets[i + 1]]`` with matching
+    ``point3D_ids`` (-1 for unmatched keypoints).
+
+    Attributes:
+        ids: (I,) image ids
+        qvecs: (I, 4) world-to-camera rotations as (w, x, y, z) quaternions
+        tvecs: (I, 3) world-to-camera translations
+        camera_ids: (I,) camera ids
+        names: image file names
+        xys: (M, 2) keypoint positions, or None when observations were not loaded
+        point3D_ids: (M,) observed 3D point ids, or None
+        offsets: (I + 1,) observation offsets, or None
+    """
+
+    ids: np.ndarray
+    qvecs: np.ndarray
+    tvecs: np.ndarray
+    camera_ids: np.ndarray
+    names: list[str]
+    xys: np.ndarray | None = None
+    point3D_ids: np.ndarray | None = None
+    offsets: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass
+class ColmapPoints3D:
+    """
+    3D points as arrays.
+
+    The track of point ``j`` is ``track_image_ids[offsets[j]:offsets[j + 1]]`` with matching
+    ``track_point2D_idxs``.
+
+    Attributes:
+        ids: (P,) point ids
+        xyz: (P, 3) positions
+        rgb: (P, 3) uint8 colours
+        errors: (P,) reprojection errors
+        track_image_ids: (T,) image ids of all track elements
+        track_point2D_idxs: (T,) keypoint indices of all track elements
+        offsets: (P + 1,) track offsets
+    """
+
+    ids: np.ndarray
+    xyz: np.ndarray
+    rgb: np.ndarray
+    errors: np.ndarray
+    track_image_ids: np.ndarray
+    track_point2D_idxs: np.ndarray
+    offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _offsets(counts: np.ndarray) -> np.ndarray:
+    return np.concatenate([[0], np.cumsum(counts, dtype=np.int64)])
+
+
+# ===========================
+# Binary writers
+# ===========================
+
+
+def write_cameras_binary(cameras: ColmapCameras, path: str) -> None:
+    with open(path, "wb") as fid:
+        np.array([len(cameras)], dtype="<u8").tofile(fid)
+        for i in range(len(cameras)):
+            num_params = cameras.num_params(i)
+            record = np.zeros(
+                1,
+                dtype=[
+                    ("id", "<i4"),
+                    ("model", "<i4"),
+                    ("width", "<u8"),
+                    ("height", "<u8"),
+                    ("params", "<f8", num_params),
+                ],
+            )
+            record["id"] = cameras.ids[i]
+            record["model"] = cameras.models[i]
+            record["width"] = cameras.widths[i]
+            record["height"] = cameras.heights[i]
+            record["params"] = cameras.params[i, :num_params]
+            record.tofile(fid)
+
+
+def write_images_binary(images: ColmapImages, path: str) -> None:
+    header = np.zeros(len(images), dtype=IMAGE_HEADER_DTYPE)
+    header["id"] = images.ids
+    header["qvec"] = images.qvecs
+    header["tvec"] = images.tvecs
+    header["camera_id"] = images.camera_ids
+
+    num_obs = int(images.offsets[-1]) if images.offsets is not None else 0
+    points2D = np.zeros(num_obs, dtype=POINT2D_DTYPE)
+    if num_obs:
+        points2D["xy"] = images.xys
+        points2D["point3D_id"] = images.point3D_ids
+
+    with open(path, "wb") as fid:
+        np.array([len(images)], dtype="<u8").tofile(fid)
+        for i in range(len(images)):
+            s, e = (images.offsets[i], images.offsets[i + 1]) if num_obs else (0, 0)
+            header[i : i + 1].tofile(fid)
+            fid.write(images.names[i].encode("utf-8") + b"\x00")
+            np.array([e - s], dtype="<u8").tofile(fid)
+            points2D[s:e].tofile(fid)
+
+
+def write_points3D_binary(points3D: ColmapPoints3D, path: str) -> None:
+    """
+    Points are grouped by track length so that every group is a single fixed-size
+    structured array; COLMAP identifies points by id, so the file order is irrelevant.
+    """
+    track_lens = np.diff(points3D.offsets)
+    with open(path, "wb") as fid:
+        np.array([len(points3D)], dtype="<u8").tofile(fid)
+        for length in np.unique(track_lens):
+            sel = np.flatnonzero(track_lens == length)
+            records = np.zeros(
+                len(sel),
+                dtype=POINT3D_HEADER_DTYPE.descr + [("track", TRACK_ELEM_DTYPE, (int(length),))],
+            )
+            records["id"] = points3D.ids[sel]
+            records["xyz"] = points3D.xyz[sel]
+            records["rgb"] = points3D.rgb[sel]
+            records["error"] = points3D.errors[sel]
+            records["track_len"] = length
+            if length:
+                elems = points3D.offsets[sel][:, None] + np.arange(length)
+                records["track"]["image_id"] = points3D.track_image_ids[elems]
+                records["track"]["point2D_idx"] = points3D.track_point2D_idxs[elems]
+            records.tofile(fid)
+
+
+# ===========================
+# Text writers
+# ===========================
+
+
+def _format_rows(fmt: str, *columns: np.ndarray) -> list[str]:
+    """Format aligned columns row by row with a single ``%`` per row."""
+    return [fmt % row for row in zip(*(c.tolist() for c in columns))]
+
+
+def write_cameras_text(cameras: ColmapCameras, path: str) -> None:
+    with open(path, "w") as fid:
+        fid.write(
+            "# Camera list with one line of data per camera:\n"
+            "#   CAMERA_ID, MODEL, WIDTH, HEIGHT, PARAMS[]\n"
+            f"# Number of cameras: {len(cameras)}\n"
+        )
+        for i in range(len(cameras)):
+            model = CAMERA_MODEL_IDS[int(cameras.models[i])].model_name
+            params = cameras.params[i, : cameras.num_params(i)].tolist()
+            fields = [int(cameras.ids[i]), model, int(cameras.widths[i]), int(cameras.heights[i])]
+            fid.write(" ".join(map(str, fields + params)) + "\n")
+
+
+def write_images_text(images: ColmapImages, path: str) -> None:
+    num_obs = int(images.offsets[-1]) if images.offsets is not None else 0
+    with open(path, "w") as fid:
+        fid.write(
+            "# Image list with two lines of data per image:\n"
+            "#   IMAGE_ID, QW, QX, QY, QZ, TX, TY, TZ, CAMERA_ID, NAME\n"
+            "#   POINTS2D[] as (X, Y, POINT3D_ID)\n"
+            f"# Number of images: {len(images)}, mean observations per image: "
+            f"{num_obs / max(len(images), 1)}\n"
+        )
+        headers = _format_rows(
+            "%d %r %r %r %r %r %r %r %d",
+            images.ids,
+            *images.qvecs.T,
+            *images.tvecs.T,
+            images.camera_ids,
+        )
+        obs = (
+            _format_rows("%r %r %d", images.xys[:, 0], images.xys[:, 1], images.point3D_ids)
+            if num_obs
+            else []
+        )
+        for i in range(len(images)):
+            s, e = (images.offsets[i], images.offsets[i + 1]) if num_obs else (0, 0)
+            fid.write(f"{headers[i]} {images.names[i]}\n")
+            fid.write(" ".join(obs[s:e]) + "\n")
+
+
+def write_points3D_text(points3D: ColmapPoints3D, path: str) -> None:
+    with open(path, "w") as fid:
+        fid.write(
+            "# 3D point list with one line of data per point:\n"
+            "#   POINT3D_ID, X, Y, Z, R, G, B, ERROR, TRACK[] as (IMAGE_ID, POINT2D_IDX)\n"
+            f"# Number of points: {len(points3D)}, mean track length: "
+            f"{points3D.offsets[-1] / max(len(points3D), 1)}\n"
+        )
+        headers = _format_rows(
+            "%d %r %r %r %d %d %d %r",
+            points3D.ids,
+            *points3D.xyz.T,
+            *points3D.rgb.T,
+            points3D.errors,
+        )
+        elems = _format_rows("%d %d", points3D.track_image_ids, points3D.track_point2D_idxs)
+        for j, head in enumerate(headers):
+            track = elems[points3D.offsets[j] : points3D.offsets[j + 1]]
+            fid.write(head + " " + " ".join(track) + "\n")
+
+
+def write_colmap_model(
+    path: str,
+    cameras: ColmapCameras,
+    images: ColmapImages,
+    points3D: ColmapPoints3D,
+    ext: str = ".bin",
+) -> None:
+    """
+    Write a COLMAP sparse model readable by COLMAP and ``read_write_model.read_model``.
+
+    Args:
+        path: Output directory (created if needed).
+        ext: ".bin" for the binary format, ".txt" for the text fallback.
+    """
+    os.makedirs(path, exist_ok=True)
+    if ext == ".txt":
+        write_cameras_text(cameras, os.path.join(path, "cameras.txt"))
+        write_images_text(images, os.path.join(path, "images.txt"))
+        write_points3D_text(points3D, os.path.join(path, "points3D.txt"))
+    elif ext == ".bin":
+        write_cameras_binary(cameras, os.path.join(path, "cameras.bin"))
+        write_images_binary(images, os.path.join(path, "images.bin"))
+        write_points3D_binary(points3D, os.path.join(path, "points3D.bin"))
+    else:
+        raise ValueError(f"Unsupported COLMAP model extension: {ext}")
+
+
+# ===========================
+# Readers
+# ===========================
+
+
+def _gather_records(
+    buf: np.ndarray, starts: np.ndarray, dtype: np.dtype, chunk_size: int = 1 << 16
+) -> np.ndarray:
+    """Copy fixed-size records at arbitrary byte offsets of ``buf`` into one array."""
+    out = np.empty(len(starts), dtype=dtype)
+    out_bytes = out.view(np.uint8).reshape(len(starts), dtype.itemsize)
+    cols = np.arange(dtype.itemsize)
+    for s in range(0, len(starts), chunk_size):
+        out_bytes[s : s + chunk_size] = buf[starts[s : s + chunk_size, None] + cols]
+    return out
+
+
+def read_cameras_binary(path: str) -> ColmapCameras:
+    with open(path, "rb") as fid:
+        data = fid.read()
+    (num_cameras,) = struct.unpack_from("<Q", data, 0)
+    head_dtype = np.dtype([("id", "<i4"), ("model", "<i4"), ("width", "<u8"), ("height", "<u8")])
+    heads, params, pos = [], [], 8
+    for _ in range(num_cameras):
+        head = np.frombuffer(data, dtype=head_dtype, count=1, offset=pos)[0]
+        pos += head_dtype.itemsize
+        num_params = CAMERA_MODEL_IDS[int(head["model"])].num_params
+        params.append(np.frombuffer(data, dtype="<f8", count=num_params, offset=pos))
+        pos += 8 * num_params
+        heads.append(head)
+    heads = np.array(heads, dtype=head_dtype)
+    padded = np.zeros((num_cameras, max(map(len, params), default=0)))
+    for i, p in enumerate(params):
+        padded[i, : len(p)] = p
+    return ColmapCameras(
+        ids=heads["id"].astype(np.int32),
+        models=heads["model"].astype(np.int32),
+        widths=heads["width"].astype(np.int64),
+        heights=heads["height"].astype(np.int64),
+        params=padded,
+    )
+
+
+def read_images_binary(path: str, load_points2D: bool = True) -> ColmapImages:
+    """
+    Read ``images.bin``. Headers and names are parsed per image (a few thousand at most);
+    observations are sliced out of the file buffer without per-keypoint unpacking and
+    skipped entirely with ``load_points2D=False``.
+    """
+    with open(path, "rb") as fid:
+        data = fid.read()
+    (num_images,) = struct.unpack_from("<Q", data, 0)
+    headers = np.empty(num_images, dtype=IMAGE_HEADER_DTYPE)
+    names, obs_starts = [], []
+    counts = np.zeros(num_images, dtype=np.int64)
+    pos = 8
+    for i in range(num_images):
+        headers[i] = np.frombuffer(data, dtype=IMAGE_HEADER_DTYPE, count=1, offset=pos)[0]
+        pos += IMAGE_HEADER_DTYPE.itemsize
+        end = data.index(b"\x00", pos)
+        names.append(data[pos:end].decode("utf-8"))
+        (counts[i],) = struct.unpack_from("<Q", data, end + 1)
+        obs_starts.append(end + 9)
+        pos = end + 9 + POINT2D_DTYPE.itemsize * int(counts[i])
+
+    images = ColmapImages(
+        ids=headers["id"].copy(),
+        qvecs=headers["qvec"].copy(),
+        tvecs=headers["tvec"].copy(),
+        camera_ids=headers["camera_id"].copy(),
+        names=names,
+    )
+    if load_points2D:
+        points2D = np.concatenate(
+            [
+                np.frombuffer(data, dtype=POINT2D_DTYPE, count=int(n), offset=s)
+                for s, n in zip(obs_starts, counts)
+            ]
+            or [np.empty(0, dtype=POINT2D_DTYPE)]
+        )
+        images.xys = points2D["xy"].copy()
+        images.point3D_ids = points2D["point3D_id"].copy()
+        images.offsets = _offsets(counts)
+    return images
+
+
+def _points3D_blocks(data: bytes, num_points: int) -> list[tuple[int, int, int] | np.ndarray]:
+    """
+    Split the ``points3D.bin`` records into blocks, in file order. A record's start depends
+    on all previous track lengths, so records are located run by run: assuming the next
+    records share the current track length, their lengths are read through one strided
+    view and the run is accepted up to the first mismatch. Files grouped by track length
+    (as written by ``write_points3D_binary``) take one probe per distinct length; short
+    runs, common in files written by COLMAP, are walked record by record.
+
+    Returns:
+        ``(start, track_len, count)`` runs of equal-length records and arrays of walked
+        record offsets.
+    """
+    header_size = POINT3D_HEADER_DTYPE.itemsize
+    elem_size = TRACK_ELEM_DTYPE.itemsize
+    len_offset = header_size - 8
+    unpack_len = struct.Struct("<Q").unpack_from
+
+    blocks, pos, remaining = [], 8, num_points
+    while remaining:
+        length = unpack_len(data, pos + len_offset)[0]
+        record_size = header_size + elem_size * length
+        cap = min(remaining, (len(data) - pos) // record_size)
+        lens = np.ndarray(
+            (cap,), dtype="<u8", buffer=data, offset=pos + len_offset, strides=(record_size,)
+        )
+        count, probe = 1, POINT3D_RUN_PROBE
+        while count < cap:
+            mismatch = np.flatnonzero(lens[count : count + probe] != length)
+            if len(mismatch):
+                count += int(mismatch[0])
+                break
+            count, probe = min(count + probe, cap), probe * 2
+        blocks.append((pos, length, count))
+        pos += record_size * count
+        remaining -= count
+
+        if count < POINT3D_RUN_PROBE and remaining:
+            # short runs: walk the next records directly
+            starts = []
+            for _ in range(min(remaining, POINT3D_WALK_BLOCK)):
+                starts.append(pos)
+                pos += header_size + elem_size * unpack_len(data, pos + len_offset)[0]
+            blocks.append(np.array(starts, dtype=np.int64))
+            remaining -= len(starts)
+    return blocks
+
+
+def read_points3D_binary(path: str) -> ColmapPoints3D:
+    """
+    Read ``points3D.bin``. Each run of equal-length records (see ``_points3D_blocks``) is
+    read as one structured array, mirroring ``write_points3D_binary``; walked records are
+    gathered from the file buffer with vectorized indexing.
+    """
+    with open(path, "rb") as fid:
+        data = fid.read()
+    buf = np.frombuffer(data, dtype=np.uint8)
+    (num_points,) = struct.unpack_from("<Q", data, 0)
+
+    header_size = POINT3D_HEADER_DTYPE.itemsize
+    elem_size = TRACK_ELEM_DTYPE.itemsize
+    headers, tracks = [], []
+    for block in _points3D_blocks(data, num_points):
+        if isinstance(block, tuple):
+            start, length, count = block
+            dtype = np.dtype(
+                POINT3D_HEADER_DTYPE.descr + [("track", TRACK_ELEM_DTYPE, (int(length),))]
+            )
+            records = np.frombuffer(data, dtype=dtype, count=count, offset=start)
+            headers.append(records[list(POINT3D_HEADER_DTYPE.names)].astype(POINT3D_HEADER_DTYPE))
+            tracks.append(records["track"].reshape(-1))
+            continue
+        starts = block
+        block_headers = _gather_records(buf, starts, POINT3D_HEADER_DTYPE)
+        track_lens = block_headers["track_len"].astype(np.int64)
+        offsets = _offsets(track_lens)
+        # byte offset of every track element: record start + header + 8 * rank within track
+        elem_starts = np.repeat(starts + header_size - offsets[:-1] * elem_size, track_lens)
+        elem_starts += np.arange(offsets[-1], dtype=np.int64) * elem_size
+        headers.append(block_headers)
+        tracks.append(_gather_records(buf, elem_starts, TRACK_ELEM_DTYPE))
+
+    headers = np.concatenate(headers) if headers else np.empty(0, dtype=POINT3D_HEADER_DTYPE)
+    tracks = np.concatenate(tracks) if tracks else np.empty(0, dtype=TRACK_ELEM_DTYPE)
+    return ColmapPoints3D(
+        ids=headers["id"].astype(np.int64),
+        xyz=headers["xyz"].copy(),
+        rgb=headers["rgb"].copy(),
+        errors=headers["error"].copy(),
+        track_image_ids=tracks["image_id"].copy(),
+        track_point2D_idxs=tracks["point2D_idx"].copy(),
+        offsets=_offsets(headers["track_len"].astype(np.int64)),
+    )
+
+
+def _data_lines(path: str) -> list[str]:
+    with open(path) as fid:
+        return [line for line in fid.read().splitlines() if line.strip() and line[0] != "#"]
+
+
+def read_cameras_text(path: str) -> ColmapCameras:
+    rows = [line.split() for line in _data_lines(path)]
+    params = np.zeros((len(rows), max((len(r) - 4 for r in rows), default=0)))
+    for i, r in enumerate(rows):
+        params[i, : len(r) - 4] = np.array(r[4:], dtype=np.float64)
+    return ColmapCameras(
+        ids=np.array([int(r[0]) for r in rows], dtype=np.int32),
+        models=np.array([camera_model_id(r[1]) for r in rows], dtype=np.int32),
+        widths=np.array([int(r[2]) for r in rows], dtype=np.int64),
+        heights=np.array([int(r[3]) for r in rows], dtype=np.int64),
+        params=params,
+    )
+
+
+def read_images_text(path: str, load_points2D: bool = True) -> ColmapImages:
+    with open(path) as fid:
+        lines = [line for line in fid.read().splitlines() if not line.startswith("#")]
+    # two lines per image; the observation line may be empty
+    heads = [line.split(maxsplit=9) for line in lines[0::2] if line.strip()]
+    fields = np.array([h[1:8] for h in heads], dtype=np.float64).reshape(-1, 7)
+    images = ColmapImages(
+        ids=np.array([int(h[0]) for h in heads], dtype=np.int32),
+        qvecs=fields[:, :4],
+        tvecs=fields[:, 4:],
+        camera_ids=np.array([int(h[8]) for h in heads], dtype=np.int32),
+        names=[h[9] for h in heads],
+    )
+    if load_points2D:
+        obs = [np.array(line.split(), dtype=np.float64) for line in lines[1::2][: len(heads)]]
+        counts = np.array([len(o) // 3 for o in obs], dtype=np.int64)
+        flat = np.concatenate(obs + [np.empty(0)]).reshape(-1, 3)
+        images.xys = flat[:, :2].copy()
+        images.point3D_ids = flat[:, 2].astype(np.int64)
+        images.offsets = _offsets(counts)
+    return images
+
+
+def read_points3D_text(path: str) -> ColmapPoints3D:
+    rows = [np.array(line.split(), dtype=np.float64) for line in _data_lines(path)]
+    heads = np.array([r[:8] for r in rows]).reshape(-1, 8)
+    tracks = np.concatenate([r[8:] for r in rows] + [np.empty(0)]).reshape(-1, 2)
+    return ColmapPoints3D(
+        ids=heads[:, 0].astype(np.int64),
+        xyz=heads[:, 1:4].copy(),
+        rgb=heads[:, 4:7].astype(np.uint8),
+        errors=heads[:, 7].copy(),
+        track_image_ids=tracks[:, 0].astype(np.int32),
+        track_point2D_idxs=tracks[:, 1].astype(np.int32),
+        offsets=_offsets(np.array([(len(r) - 8) // 2 for r in rows], dtype=np.int64)),
+    )
+
+
+def detect_model_ext(path: str) -> str | None:
+    """Return ".bin" or ".txt" if ``path`` holds a COLMAP model in that format."""
+    for ext in (".bin", ".txt"):
+        if all(
+            os.path.isfile(os.path.join(path, name + ext))
+            for name in ("cameras", "images", "points3D")
+        ):
+            return ext
+    return None
+
+
+def read_colmap_model(
+    path: str, ext: str = "", load_points2D: bool = True, load_points3D: bool = True
+) -> tuple[ColmapCameras, ColmapImages, ColmapPoints3D | None]:
+    """
+    Read a COLMAP sparse model into array-backed containers.
+
+    Args:
+        path: Model directory holding cameras/images/points3D.
+        ext: ".bin" or ".txt"; detected from the directory contents if empty.
+        load_points2D: Load per-image observations. Poses alone do not need them.
+        load_points3D: Load ``points3D``; None is returned in its place otherwise.
+    """
+    if ext == "":
+        ext = detect_model_ext(path)
+        if ext is None:
+            raise FileNotFoundError(f"No COLMAP model (.bin or .txt) found in {path}")
+    if ext == ".txt":
+        read_cameras, read_images, read_points3D = (
+            read_cameras_text,
+            read_images_text,
+            read_points3D_text,
+        )
+    elif ext == ".bin":
+        read_cameras, read_images, read_points3D = (
+            read_cameras_binary,
+            read_images_binary,
+            read_points3D_binary,
+        )
+    else:
+        raise ValueError(f"Unsupported COLMAP model extension: {ext}")
+    cameras = read_cameras(os.path.join(path, "cameras" + ext))
+    images = read_images(os.path.join(path, "images" + ext), load_points2D=load_points2D)
+    points3D = read_points3D(os.path.join(path, "points3D" + ext)) if load_points3D else None
+    return cameras, images, points3D
+
+
+def camera_model_id(name: str) -> int:
+    return CAMERA_MODEL_NAMES[name].model_id
+
+
+def rotmats_to_qvecs(R: np.ndarray) -> np.ndarray:
+    """
+    Convert (N, 3, 3) rotation matrices to (N, 4) COLMAP (w, x, y, z) quaternions with
+    non-negative w (batched ``read_write_model.rotmat2qvec``).
+    """
+    R = np.asarray(R, dtype=np.float64)
+    Rxx, Ryx, Rzx = R[:, 0, 0], R[:, 0, 1], R[:, 0, 2]
+    Rxy, Ryy, Rzy = R[:, 1, 0], R[:, 1, 1], R[:, 1, 2]
+    Rxz, Ryz, Rzz = R[:, 2, 0], R[:, 2, 1], R[:, 2, 2]
+    zeros = np.zeros_like(Rxx)
+    K = (
+        np.stack(
+            [
+                np.stack([Rxx - Ryy - Rzz, zeros, zeros, zeros], -1),
+                np.stack([Ryx + Rxy, Ryy - Rxx - Rzz, zeros, zeros], -1),
+                np.stack([Rzx + Rxz, Rzy + Ryz, Rzz - Rxx - Ryy, zeros], -1),
+                np.stack([Ryz - Rzy, Rzx - Rxz, Rxy - Ryx, Rxx + Ryy + Rzz], -1),
+            ],
+            axis=-2,
+        )
+        / 3.0
+    )
+    eigvals, eigvecs = np.linalg.eigh(K)
+    qvecs = eigvecs[np.arange(len(R)), :, np.argmax(eigvals, axis=-1)][:, [3, 0, 1, 2]]
+    qvecs[qvecs[:, 0] < 0] *= -1
+    return qvecs
+
+
+def qvecs_to_rotmats(qvecs: np.ndarray) -> np.ndarray:
+    """Convert (N, 4) COLMAP (w, x, y, z) quaternions to (N, 3, 3) rotation matrices."""
+    w, x, y, z = np.asarray(qvecs, dtype=np.float64).T
+    return np.stack(
+        [
+            np.stack([1 - 2 * y**2 - 2 * z**2, 2 * x * y - 2 * w * z, 2 * z * x + 2 * w * y], -1),
+            np.stack([2 * x * y + 2 * w * z, 1 - 2 * x**2 - 2 * z**2, 2 * y * z - 2 * w * x], -1),
+            np.stack([2 * z * x - 2 * w * y, 2 * y * z + 2 * w * x, 1 - 2 * x**2 - 2 * y**2], -1),
+        ],
+        axis=-2,
+    )
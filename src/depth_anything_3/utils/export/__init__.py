@@ -12,14 +12,48 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import annotations
+
+import time
+from concurrent.futures import Future
+
 from depth_anything_3.specs import Prediction
 from depth_anything_3.utils.export.gs import export_to_gs_ply, export_to_gs_video
+from depth_anything_3.utils.parallel_utils import get_export_executor, parallel_execution
 
+from . import colmap, glb, ply
 from .colmap import export_to_colmap
+from .da3store import export_to_da3store
 from .depth_vis import export_to_depth_vis
 from .feat_vis import export_to_feat_vis
 from .glb import export_to_glb
 from .npz import export_to_mini_npz, export_to_npz
+from .ply import export_to_ply
+from .pointcloud import build_point_cloud
+
+# Formats consuming the shared point cloud, with the loosest confidence each one needs
+POINT_CLOUD_CONF_THRESH = {
+    "glb": glb.point_cloud_conf_thresh,
+    "colmap": colmap.point_cloud_conf_thresh,
+    "ply": ply.point_cloud_conf_thresh,
+}
+
+
+def _with_shared_point_cloud(prediction: Prediction, export_formats: list[str], kwargs: dict):
+    """Back-project once for all point-based formats and pass the cloud to each of them."""
+    consumers = [f for f in export_formats if f in POINT_CLOUD_CONF_THRESH]
+    if len(consumers) < 2:
+        return kwargs
+    start_time = time.time()
+    threshs = [POINT_CLOUD_CONF_THRESH[f](prediction, **kwargs.get(f, {})) for f in consumers]
+    conf_thresh = None if any(t is None for t in threshs) else min(threshs)
+    point_cloud = build_point_cloud(prediction, conf_thresh)
+    get_export_executor().record_timing("build_point_cloud", time.time() - start_time)
+
+    kwargs = dict(kwargs)
+    for f in consumers:
+        kwargs[f] = {**kwargs.get(f, {}), "point_cloud": point_cloud}
+    return kwargs
 
 
 def export(
@@ -27,32 +61,64 @@ def export(
     export_format: str,
     export_dir: str,
     **kwargs,
-):
+) -> list[Future]:
+    """
+    Export ``prediction`` to one or more "-"-separated formats.
+
+    Synchronous exporters run in place; exporters backed by the shared export executor
+    (npz, mini_npz, feat_vis) are scheduled in the background. With several formats, the
+    point-based ones (glb, colmap, ply) share a single back-projected point cloud and all
+    formats run concurrently.
+
+    Returns:
+        Futures of the background exports (empty when every format ran synchronously).
+        Use ``get_export_executor().wait()`` to block until they are done.
+    """
     if "-" in export_format:
-        export_formats = export_format.split("-")
-        for export_format in export_formats:
-            export(prediction, export_format, export_dir, **kwargs)
-        return  # Prevent falling through to single-format handling
+        export_formats = list(dict.fromkeys(export_format.split("-")))
+        kwargs = _with_shared_point_cloud(prediction, export_formats, kwargs)
+        # parallel_execution carries the caller's context into its threads, so inside an
+        # export job the per-format async exporters run inline instead of waiting for
+        # executor capacity held by this job
+        futures = parallel_execution(
+            export_formats,
+            action=lambda f: export(prediction, f, export_dir, **kwargs),
+            num_processes=len(export_formats),
+            sequential=len(export_formats) == 1,
+        )
+        return sum(futures, [])  # Prevent falling through to single-format handling
 
+    fn_kwargs = kwargs.get(export_format, {})
     if export_format == "glb":
-        export_to_glb(prediction, export_dir, **kwargs.get(export_format, {}))
+        fn = export_to_glb
     elif export_format == "mini_npz":
-        export_to_mini_npz(prediction, export_dir)
+        fn, fn_kwargs = export_to_mini_npz, {}
     elif export_format == "npz":
-        export_to_npz(prediction, export_dir)
+        fn, fn_kwargs = export_to_npz, {}
+    elif export_format == "da3store":
+        fn = export_to_da3store
     elif export_format == "feat_vis":
-        export_to_feat_vis(prediction, export_dir, **kwargs.get(export_format, {}))
+        fn = export_to_feat_vis
     elif export_format == "depth_vis":
-        export_to_depth_vis(prediction, export_dir)
+        fn = export_to_depth_vis
     elif export_format == "gs_ply":
-        export_to_gs_ply(prediction, export_dir, **kwargs.get(export_format, {}))
+        fn = export_to_gs_ply
     elif export_format == "gs_video":
-        export_to_gs_video(prediction, export_dir, **kwargs.get(export_format, {}))
+        fn = export_to_gs_video
     elif export_format == "colmap":
-        export_to_colmap(prediction, export_dir, **kwargs.get(export_format, {}))
+        fn = export_to_colmap
+    elif export_format == "ply":
+        fn = export_to_ply
     else:
         raise ValueError(f"Unsupported export format: {export_format}")
 
+    start_time = time.time()
+    result = fn(prediction, export_dir, **fn_kwargs)
+    if isinstance(result, Future):
+        return [result]
+    get_export_executor().record_timing(fn.__name__, time.time() - start_time)
+    return []
+
 
 __all__ = [
     export,
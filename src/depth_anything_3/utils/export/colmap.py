@@ -12,17 +12,32 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import annotations
+
 import os
-import pycolmap
-import cv2 as cv
 import numpy as np
 
 from PIL import Image
 
 from depth_anything_3.specs import Prediction
+from depth_anything_3.utils.colmap_io import (
+    ColmapCameras,
+    ColmapImages,
+    ColmapPoints3D,
+    camera_model_id,
+    rotmats_to_qvecs,
+    write_colmap_model,
+)
 from depth_anything_3.utils.logger import logger
 
-from .glb import _depths_to_world_points_with_colors
+from .pointcloud import PointCloud, prepare_point_cloud
+
+
+def point_cloud_conf_thresh(
+    prediction: Prediction, conf_thresh_percentile: float = 40.0, **kwargs
+) -> float:
+    """Confidence threshold used by ``export_to_colmap``."""
+    return float(np.percentile(prediction.conf, conf_thresh_percentile))
 
 
 def export_to_colmap(
@@ -31,120 +46,93 @@ def export_to_colmap(
     image_paths: list[str],
     conf_thresh_percentile: float = 40.0,
     process_res_method: str = "upper_bound_resize",
+    downsample: str = "none",
+    num_max_points: int | None = None,
+    voxel_size: float | None = None,
+    point_cloud: PointCloud | None = None,
+    ext: str = ".bin",
 ) -> None:
-    # 1. Data preparation
-    conf_thresh = np.percentile(prediction.conf, conf_thresh_percentile)
-    points, colors = _depths_to_world_points_with_colors(
-        prediction.depth,
-        prediction.intrinsics,
-        prediction.extrinsics,  # w2c
-        prediction.processed_images,
-        prediction.conf,
+    """
+    Export cameras, poses and the point cloud as a COLMAP sparse model in ``export_dir``.
+
+    The model is assembled as arrays and written with ``write_colmap_model`` (binary by
+    default, ``ext=".txt"`` for the text format), without per-point pycolmap calls.
+    """
+    # 1. Data preparation: reuse the shared point cloud of a multi-format export if given.
+    # With downsample="voxel", each 3D point is observed at the pixel of its most
+    # confident contributing view.
+    conf_thresh = point_cloud_conf_thresh(prediction, conf_thresh_percentile)
+    point_cloud = prepare_point_cloud(
+        prediction,
         conf_thresh,
+        point_cloud,
+        downsample=downsample,
+        num_max_points=num_max_points,
+        voxel_size=voxel_size,
     )
+    points, colors = point_cloud.points, point_cloud.colors
     num_points = len(points)
     logger.info(f"Exporting to COLMAP with {num_points} points")
     num_frames = len(prediction.processed_images)
     h, w = prediction.processed_images.shape[1:3]
-    points_xyf = _create_xyf(num_frames, h, w)
-    points_xyf = points_xyf[prediction.conf >= conf_thresh]
-
-    # 2. Set Reconstruction
-    reconstruction = pycolmap.Reconstruction()
-
-    point3d_ids = []
-    for vidx in range(num_points):
-        point3d_id = reconstruction.add_point3D(points[vidx], pycolmap.Track(), colors[vidx])
-        point3d_ids.append(point3d_id)
-
-    for fidx in range(num_frames):
-        orig_w, orig_h = Image.open(image_paths[fidx]).size
-
-        intrinsic = prediction.intrinsics[fidx]
-        if process_res_method.endswith("resize"):
-            intrinsic[:1] *= orig_w / w
-            intrinsic[1:2] *= orig_h / h
-        elif process_res_method == "crop":
-            raise NotImplementedError("COLMAP export for crop method is not implemented")
-        else:
-            raise ValueError(f"Unknown process_res_method: {process_res_method}")
-
-        pycolmap_intri = np.array(
-            [intrinsic[0, 0], intrinsic[1, 1], intrinsic[0, 2], intrinsic[1, 2]]
-        )
-
-        extrinsic = prediction.extrinsics[fidx]
-        cam_from_world = pycolmap.Rigid3d(pycolmap.Rotation3d(extrinsic[:3, :3]), extrinsic[:3, 3])
-
-        # set and add camera
-        camera = pycolmap.Camera()
-        camera.camera_id = fidx + 1
-        camera.model = pycolmap.CameraModelId.PINHOLE
-        camera.width = orig_w
-        camera.height = orig_h
-        camera.params = pycolmap_intri
-        reconstruction.add_camera(camera)
-
-        # set and add rig (from camera)
-        rig = pycolmap.Rig()
-        rig.rig_id = camera.camera_id
-        rig.add_ref_sensor(camera.sensor_id)
-        reconstruction.add_rig(rig)
-
-        # set image
-        image = pycolmap.Image()
-        image.image_id = fidx + 1
-        image.camera_id = camera.camera_id
-
-        # set and add frame (from image)
-        frame = pycolmap.Frame()
-        frame.frame_id = image.image_id
-        frame.rig_id = camera.camera_id
-        frame.add_data_id(image.data_id)
-        frame.rig_from_world = cam_from_world
-        reconstruction.add_frame(frame)
-
-        # set point2d and update track
-        point2d_list = []
-        points_in_frame = points_xyf[:, 2].astype(np.int32) == fidx
-        for vidx in np.where(points_in_frame)[0]:
-            point2d = points_xyf[vidx][:2]
-            point2d[0] *= orig_w / w
-            point2d[1] *= orig_h / h
-            point3d_id = point3d_ids[vidx]
-            point2d_list.append(pycolmap.Point2D(point2d, point3d_id))
-            reconstruction.point3D(point3d_id).track.add_element(
-                image.image_id, len(point2d_list) - 1
-            )
-
-        # set and add image
-        image.frame_id = image.image_id
-        image.name = os.path.basename(image_paths[fidx])
-        image.points2D = pycolmap.Point2DList(point2d_list)
-        reconstruction.add_image(image)
-
-    # 3. Export
-    reconstruction.write(export_dir)
-
-
-def _create_xyf(num_frames, height, width):
-    """
-    Creates a grid of pixel coordinates and frame indices (fidx) for all frames.
-    """
-    # Create coordinate grids for a single frame
-    y_grid, x_grid = np.indices((height, width), dtype=np.int32)
-    x_grid = x_grid[np.newaxis, :, :]
-    y_grid = y_grid[np.newaxis, :, :]
-
-    # Broadcast to all frames
-    x_coords = np.broadcast_to(x_grid, (num_frames, height, width))
-    y_coords = np.broadcast_to(y_grid, (num_frames, height, width))
-
-    # Create frame indices and broadcast
-    f_idx = np.arange(num_frames, dtype=np.int32)[:, np.newaxis, np.newaxis]
-    f_coords = np.broadcast_to(f_idx, (num_frames, height, width))
+    if process_res_method == "crop":
+        raise NotImplementedError("COLMAP export for crop method is not implemented")
+    elif not process_res_method.endswith("resize"):
+        raise ValueError(f"Unknown process_res_method: {process_res_method}")
+
+    # 2. Cameras: one PINHOLE camera per frame, rescaled to the original image size
+    orig_sizes = np.array([Image.open(p).size for p in image_paths[:num_frames]])
+    scale = orig_sizes / np.array([w, h], dtype=np.float64)  # (N, 2) as (sx, sy)
+    intrinsics = np.asarray(prediction.intrinsics, dtype=np.float64)
+    frame_ids = np.arange(1, num_frames + 1, dtype=np.int32)
+    cameras = ColmapCameras(
+        ids=frame_ids,
+        models=np.full(num_frames, camera_model_id("PINHOLE"), dtype=np.int32),
+        widths=orig_sizes[:, 0],
+        heights=orig_sizes[:, 1],
+        params=np.stack(
+            [
+                intrinsics[:, 0, 0] * scale[:, 0],
+                intrinsics[:, 1, 1] * scale[:, 1],
+                intrinsics[:, 0, 2] * scale[:, 0],
+                intrinsics[:, 1, 2] * scale[:, 1],
+            ],
+            axis=1,
+        ),
+    )
 
-    # Stack coordinates and frame indices
-    points_xyf = np.stack((x_coords, y_coords, f_coords), axis=-1)
+    # 3. Observations: every 3D point is seen once, at its source pixel. Sorting points by
+    # frame lays out each image's points2D contiguously; the point2D index of a point is
+    # its rank within its frame.
+    frame_idx = point_cloud.frame_idx.astype(np.int64)
+    order = np.argsort(frame_idx, kind="stable")
+    counts = np.bincount(frame_idx, minlength=num_frames)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    point3D_ids = np.arange(1, num_points + 1, dtype=np.int64)
+    xys = point_cloud.pixels[order].astype(np.float64) * scale[frame_idx[order]]
+    point2D_idxs = np.empty(num_points, dtype=np.int32)
+    point2D_idxs[order] = np.arange(num_points) - offsets[frame_idx[order]]
+
+    extrinsics = np.asarray(prediction.extrinsics, dtype=np.float64)
+    images = ColmapImages(
+        ids=frame_ids,
+        qvecs=rotmats_to_qvecs(extrinsics[:, :3, :3]),
+        tvecs=extrinsics[:, :3, 3],
+        camera_ids=frame_ids,
+        names=[os.path.basename(p) for p in image_paths[:num_frames]],
+        xys=xys,
+        point3D_ids=point3D_ids[order],
+        offsets=offsets,
+    )
+    points3D = ColmapPoints3D(
+        ids=point3D_ids,
+        xyz=points.astype(np.float64),
+        rgb=colors.astype(np.uint8),
+        errors=np.zeros(num_points),
+        track_image_ids=frame_ids[frame_idx],
+        track_point2D_idxs=point2D_idxs,
+        offsets=np.arange(num_points + 1, dtype=np.int64),
+    )
 
-    return points_xyf
+    # 4. Export
+    write_colmap_model(export_dir, cameras, images, points3D, ext=ext)
@@ -0,0 +1,67 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from depth_anything_3.specs import Prediction
+from depth_anything_3.utils.io.da3store import write_da3store
+
+
+def export_to_da3store(
+    prediction: Prediction,
+    export_dir: str,
+    chunk_size: int = 16,
+    compression: str = "none",
+    num_workers: int = 8,
+    export_aux: bool = False,
+) -> str:
+    """Export the prediction as a chunked da3store directory (see ``utils.io.da3store``).
+
+    Args:
+        prediction: Model prediction to export.
+        export_dir: Root export directory; the store is written to ``exports/da3store``.
+        chunk_size: Frames per chunk file.
+        compression: "none" (memory-mappable), "zstd" or "lz4".
+        num_workers: Number of writer threads.
+        export_aux: Also store ``aux`` feature arrays (as ``aux/<name>``).
+
+    Returns:
+        Path to the store's ``index.json``.
+    """
+    output_dir = os.path.join(export_dir, "exports", "da3store")
+
+    arrays = {"depth": prediction.depth}
+    for name, value in (
+        ("image", prediction.processed_images),
+        ("conf", prediction.conf),
+        ("sky", prediction.sky),
+        ("extrinsics", prediction.extrinsics),
+        ("intrinsics", prediction.intrinsics),
+        ("valid_mask", prediction.valid_mask),
+    ):
+        if value is not None:
+            arrays[name] = value
+    if export_aux and prediction.aux:
+        for k, v in prediction.aux.items():
+            arrays[f"aux/{k}"] = v
+
+    meta = {"is_metric": int(prediction.is_metric), "scale_factor": prediction.scale_factor}
+    return write_da3store(
+        output_dir,
+        arrays,
+        meta=meta,
+        chunk_size=chunk_size,
+        compression=compression,
+        num_workers=num_workers,
+    )
@@ -12,30 +12,106 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import annotations
+
 import os
 import imageio
 import numpy as np
 
 from depth_anything_3.specs import Prediction
-from depth_anything_3.utils.visualize import visualize_depth
+from depth_anything_3.utils.io.video_writer import VideoWriter
+from depth_anything_3.utils.parallel_utils import parallel_execution
+from depth_anything_3.utils.visualize import inverse_depth_range, visualize_depth_lut
+
+
+def _scene_depth_range(
+    prediction: Prediction, percentile: float, num_samples: int, max_frames: int = 64
+) -> tuple[float, float]:
+    """Inverse-depth range shared by all frames, sampled from up to ``max_frames`` frames."""
+    frames = np.unique(np.linspace(0, len(prediction) - 1, max_frames).astype(int))
+    # one frame's shape; prediction.depth would materialize / dequantize the whole stack
+    h, w = prediction[0].depth.shape[-2:]
+    stride = max(1, int(np.ceil(np.sqrt(h * w * len(frames) / max(num_samples, 1)))))
+    samples = [prediction[int(i)].depth[0][::stride, ::stride].ravel() for i in frames]
+    return inverse_depth_range(np.concatenate(samples), percentile, num_samples=None)
 
 
 def export_to_depth_vis(
     prediction: Prediction,
     export_dir: str,
+    scene_range: bool = False,
+    percentile: float = 2,
+    cmap: str = "Spectral",
+    lut_size: int = 256,
+    num_samples: int = 100_000,
+    quality: int = 95,
+    num_workers: int = 8,
+    save_frames: bool = True,
+    video: bool = False,
+    fps: float = 15,
+    video_quality: str = "medium",
 ):
+    """
+    Write ``depth_vis/{idx:04d}.jpg`` images showing each input frame next to its depth.
+
+    Depth is coloured through a precomputed colormap LUT over an inverse-depth range
+    estimated from ``num_samples`` pixels, and frames are encoded in a thread pool.
+    Optionally the same frames are piped into a video, with or without the JPEGs.
+
+    Args:
+        scene_range: Use one range for the whole scene so colours are comparable across
+            frames, instead of a per-frame range.
+        percentile: Lower/upper inverse-depth percentile clipped by the colormap.
+        lut_size: Colormap LUT entries (256 matches Matplotlib's colormaps exactly).
+        quality: JPEG quality.
+        num_workers: Encoder threads.
+        save_frames: Write the per-frame JPEGs.
+        video: Also stream the frames into ``depth_vis.mp4`` (see ``VideoWriter``).
+        fps, video_quality: Frame rate and quality of the video.
+    """
     # Use prediction.processed_images, which is already processed image data
     if prediction.processed_images is None:
         raise ValueError("prediction.processed_images is required but not available")
 
     images_u8 = prediction.processed_images  # (N,H,W,3) uint8
+    depth_range = (
+        _scene_depth_range(prediction, percentile, num_samples)
+        if scene_range and len(prediction)
+        else None
+    )
 
-    os.makedirs(os.path.join(export_dir, "depth_vis"), exist_ok=True)
-    for idx in range(prediction.depth.shape[0]):
-        depth_vis = visualize_depth(prediction.depth[idx])
-        image_vis = images_u8[idx]
-        depth_vis = depth_vis.astype(np.uint8)
-        image_vis = image_vis.astype(np.uint8)
+    def render_frame(idx: int) -> np.ndarray:
+        # slice the prediction so compact storage only dequantizes this frame
+        depth = prediction[idx].depth[0]
+        frame_range = depth_range or inverse_depth_range(depth, percentile, num_samples)
+        depth_vis = visualize_depth_lut(depth, *frame_range, cmap=cmap, lut_size=lut_size)
+        image_vis = np.asarray(images_u8[idx], dtype=np.uint8)
         vis_image = np.concatenate([image_vis, depth_vis], axis=1)
-        save_path = os.path.join(export_dir, f"depth_vis/{idx:04d}.jpg")
-        imageio.imwrite(save_path, vis_image, quality=95)
+        if save_frames:
+            save_path = os.path.join(export_dir, f"depth_vis/{idx:04d}.jpg")
+            imageio.imwrite(save_path, vis_image, quality=quality)
+        return vis_image if video else None
+
+    os.makedirs(os.path.join(export_dir, "depth_vis"), exist_ok=True)
+    if not video:
+        parallel_execution(
+            list(range(len(prediction))),
+            action=render_frame,
+            num_processes=num_workers,
+            sequential=num_workers <= 1,
+        )
+        return
+
+    # Render a few frames per worker at a time and feed them to the encoder in order
+    chunk_size = 4 * max(num_workers, 1)
+    with VideoWriter(
+        os.path.join(export_dir, "depth_vis.mp4"), fps=fps, quality=video_quality
+    ) as writer:
+        for start in range(0, len(prediction), chunk_size):
+            frames = parallel_execution(
+                list(range(start, min(start + chunk_size, len(prediction)))),
+                action=render_frame,
+                num_processes=num_workers,
+                sequential=num_workers <= 1,
+            )
+            writer.write_frames(frames)
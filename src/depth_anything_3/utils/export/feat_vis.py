@@ -14,26 +14,35 @@
 
 import os
 import cv2
-import imageio
 import numpy as np
 from tqdm.auto import tqdm
 
+from depth_anything_3.utils.io.video_writer import VideoWriter
 from depth_anything_3.utils.parallel_utils import async_call
 from depth_anything_3.utils.pca_utils import PCARGBVisualizer
 
+# features larger than this are fitted chunk by chunk instead of in one device tensor
+STREAMING_FIT_BYTES = 512 << 20
+
 
 @async_call
 def export_to_feat_vis(
     prediction,
     export_dir,
     fps=15,
+    save_frames=False,
+    video_quality="medium",
 ):
     """Export feature visualization with PCA.
 
+    Frames are streamed into ``feat_vis/<layer>.mp4`` as they are produced.
+
     Args:
         prediction: Model prediction containing feature maps
         export_dir: Directory to export results
         fps: Frame rate for output video (default: 15)
+        save_frames: Also write every frame as ``feat_vis/<layer>/{idx:06d}.jpg``
+        video_quality: "low", "medium" or "high" (see ``VIDEO_QUALITY_MAP``)
     """
     out_dir = os.path.join(export_dir, "feat_vis")
     os.makedirs(out_dir, exist_ok=True)
@@ -42,24 +51,22 @@ def export_to_feat_vis(
     for k, v in prediction.aux.items():
         if not k.startswith("feat_layer_"):
             continue
-        os.makedirs(os.path.join(out_dir, k), exist_ok=True)
         viz = PCARGBVisualizer(basis_mode="fixed", percentile_mode="global", clip_percent=10.0)
-        viz.fit_reference(v)
+        if v.nbytes > STREAMING_FIT_BYTES:
+            viz.fit_reference_streaming(v)
+        else:
+            viz.fit_reference(v)
         feats_vis = viz.transform_video(v)
-        for idx in tqdm(range(len(feats_vis))):
-            img = images[idx]
-            feat_vis = (feats_vis[idx] * 255).astype(np.uint8)
-            feat_vis = cv2.resize(
-                feat_vis, (img.shape[1], img.shape[0]), interpolation=cv2.INTER_NEAREST
-            )
-            save_path = os.path.join(out_dir, f"{k}/{idx:06d}.jpg")
-            save = np.concatenate([img, feat_vis], axis=1)
-            imageio.imwrite(save_path, save, quality=95)
-        cmd = (
-            "ffmpeg -loglevel error -hide_banner -y "
-            f"-framerate {fps} -start_number 0 "
-            f"-i {out_dir}/{k}/%06d.jpg "
-            f"-c:v libx264 -pix_fmt yuv420p "
-            f"{out_dir}/{k}.mp4"
-        )
-        os.system(cmd)
+        with VideoWriter(
+            os.path.join(out_dir, f"{k}.mp4"),
+            fps=fps,
+            quality=video_quality,
+            frames_dir=os.path.join(out_dir, k) if save_frames else None,
+        ) as writer:
+            for idx in tqdm(range(len(feats_vis))):
+                img = images[idx]
+                feat_vis = (feats_vis[idx] * 255).astype(np.uint8)
+                feat_vis = cv2.resize(
+                    feat_vis, (img.shape[1], img.shape[0]), interpolation=cv2.INTER_NEAREST
+                )
+                writer.write(np.concatenate([img, feat_vis], axis=1))
@@ -22,6 +22,7 @@ from depth_anything_3.specs import Prediction
 from depth_anything_3.utils.logger import logger
 
 from .depth_vis import export_to_depth_vis
+from .pointcloud import PointCloud, _as_homogeneous44, _estimate_scene_scale, prepare_point_cloud
 
 
 def set_sky_depth(prediction: Prediction, sky_mask: np.ndarray, sky_depth_def: float = 98.0):
@@ -33,22 +34,73 @@ def set_sky_depth(prediction: Prediction, sky_mask: np.ndarray, sky_depth_def: f
 
 
 def get_conf_thresh(
-    prediction: Prediction,
+    conf: np.ndarray,
     sky_mask: np.ndarray,
     conf_thresh: float,
     conf_thresh_percentile: float = 10.0,
     ensure_thresh_percentile: float = 90.0,
 ):
     if sky_mask is not None and (~sky_mask).sum() > 10:
-        conf_pixels = prediction.conf[~sky_mask]
+        conf_pixels = conf[~sky_mask]
     else:
-        conf_pixels = prediction.conf
+        conf_pixels = conf
     lower = np.percentile(conf_pixels, conf_thresh_percentile)
     upper = np.percentile(conf_pixels, ensure_thresh_percentile)
     conf_thresh = min(max(conf_thresh, lower), upper)
     return conf_thresh
 
 
+def _glb_conf_and_thresh(
+    prediction: Prediction,
+    conf_thresh: float = 1.05,
+    filter_black_bg: bool = False,
+    filter_white_bg: bool = False,
+    conf_thresh_percentile: float = 40.0,
+    ensure_thresh_percentile: float = 90.0,
+) -> tuple[np.ndarray, float]:
+    """Confidence map (background pixels forced to 1.0) and adaptive GLB threshold."""
+    images_u8 = prediction.processed_images
+    conf = prediction.conf
+    if filter_black_bg or filter_white_bg:
+        conf = conf.copy()
+    if filter_black_bg:
+        conf[(images_u8 < 16).all(axis=-1)] = 1.0
+    if filter_white_bg:
+        conf[(images_u8 >= 240).all(axis=-1)] = 1.0
+    conf_thr = get_conf_thresh(
+        conf,
+        getattr(prediction, "sky_mask", None),
+        conf_thresh,
+        conf_thresh_percentile,
+        ensure_thresh_percentile,
+    )
+    return conf, conf_thr
+
+
+def point_cloud_conf_thresh(
+    prediction: Prediction,
+    conf_thresh: float = 1.05,
+    filter_black_bg: bool = False,
+    filter_white_bg: bool = False,
+    conf_thresh_percentile: float = 40.0,
+    ensure_thresh_percentile: float = 90.0,
+    **kwargs,
+) -> float:
+    """Loosest confidence a shared point cloud needs to serve ``export_to_glb``."""
+    _, conf_thr = _glb_conf_and_thresh(
+        prediction,
+        conf_thresh,
+        filter_black_bg,
+        filter_white_bg,
+        conf_thresh_percentile,
+        ensure_thresh_percentile,
+    )
+    if filter_black_bg or filter_white_bg:
+        # background pixels are scored 1.0 regardless of their real confidence
+        conf_thr = min(conf_thr, 1.0)
+    return conf_thr
+
+
 def export_to_glb(
     prediction: Prediction,
     export_dir: str,
@@ -62,6 +114,9 @@ def export_to_glb(
     show_cameras: bool = True,
     camera_size: float = 0.03,
     export_depth_vis: bool = True,
+    downsample: str = "random",
+    voxel_size: float | None = None,
+    point_cloud: PointCloud | None = None,
 ) -> str:
     """Generate a 3D point cloud and camera wireframes and export them as a ``.glb`` file.
 
@@ -84,6 +139,13 @@ def export_to_glb(
         show_cameras: Whether to render camera wireframes in the exported scene.
         camera_size: Relative camera wireframe scale as a fraction of the scene diagonal.
         export_depth_vis: Whether to export raster depth visualisations alongside the glTF.
+        downsample: "random" keeps a uniform subset of at most ``num_max_points``; "voxel"
+            merges overlapping views on a voxel grid (confidence-weighted position and
+            colour), streaming frame by frame.
+        voxel_size: Voxel edge for ``downsample="voxel"``; derived from ``num_max_points``
+            and the scene scale if None.
+        point_cloud: Shared back-projected cloud (see ``build_point_cloud``) built with a
+            confidence threshold no stricter than this export's; built here if None.
 
     Returns:
         Path to the exported ``scene.glb`` file.
@@ -110,34 +172,45 @@ def export_to_glb(
     if prediction.processed_images is None:
         raise ValueError("prediction.processed_images is required but not available")
 
-    images_u8 = prediction.processed_images  # (N,H,W,3) uint8
-
     # 2) Sky processing (if sky_mask is provided)
     if getattr(prediction, "sky_mask", None) is not None:
         set_sky_depth(prediction, prediction.sky_mask, sky_depth_def)
 
     # 3) Confidence threshold (if no conf, then no filtering)
-    if filter_black_bg:
-        prediction.conf[(prediction.processed_images < 16).all(axis=-1)] = 1.0
-    if filter_white_bg:
-        prediction.conf[(prediction.processed_images >= 240).all(axis=-1)] = 1.0
-    conf_thr = get_conf_thresh(
+    # Read depth/conf once: compact predictions dequantize on every attribute access
+    depth = prediction.depth
+    conf, conf_thr = _glb_conf_and_thresh(
         prediction,
-        getattr(prediction, "sky_mask", None),
         conf_thresh,
+        filter_black_bg,
+        filter_white_bg,
         conf_thresh_percentile,
         ensure_thresh_percentile,
     )
 
-    # 4) Back-project to world coordinates and get colors (world frame)
-    points, colors = _depths_to_world_points_with_colors(
-        prediction.depth,
-        prediction.intrinsics,
-        prediction.extrinsics,  # w2c
-        images_u8,
-        prediction.conf,
+    # 4) Back-project to world coordinates and get colors (world frame), reusing the
+    # shared point cloud of a multi-format export when available
+    if downsample not in ("random", "voxel"):
+        raise ValueError(f"Unknown GLB downsampling method: {downsample}")
+    if point_cloud is not None:
+        bg = np.zeros(len(point_cloud), dtype=bool)
+        if filter_black_bg:
+            bg |= (point_cloud.colors < 16).all(axis=-1)
+        if filter_white_bg:
+            bg |= (point_cloud.colors >= 240).all(axis=-1)
+        point_cloud = point_cloud.select(np.where(bg, 1.0, point_cloud.conf) >= conf_thr)
+        point_cloud.conf_thresh = conf_thr
+    # random capping happens after alignment in _filter_and_downsample
+    point_cloud = prepare_point_cloud(
+        prediction,
         conf_thr,
+        point_cloud,
+        conf=conf,
+        downsample="voxel" if downsample == "voxel" else "none",
+        num_max_points=num_max_points,
+        voxel_size=voxel_size,
     )
+    points, colors = point_cloud.points, point_cloud.colors
 
     # 5) Based on first camera orientation + glTF axis system, center by point cloud,
     # construct alignment transform, and apply to point cloud
@@ -164,12 +237,12 @@ def export_to_glb(
     # 8) Draw cameras (wireframe pyramids), using the same transform A
     if show_cameras and prediction.intrinsics is not None and prediction.extrinsics is not None:
         scene_scale = _estimate_scene_scale(points, fallback=1.0)
-        H, W = prediction.depth.shape[1:]
+        H, W = depth.shape[1:]
         _add_cameras_to_scene(
             scene=scene,
             K=prediction.intrinsics,
             ext_w2c=prediction.extrinsics,
-            image_sizes=[(H, W)] * prediction.depth.shape[0],
+            image_sizes=[(H, W)] * depth.shape[0],
             scale=scene_scale * camera_size,
         )
 
@@ -189,69 +262,6 @@ def export_to_glb(
 # =========================
 
 
-def _as_homogeneous44(ext: np.ndarray) -> np.ndarray:
-    """
-    Accept (4,4) or (3,4) extrinsic parameters, return (4,4) homogeneous matrix.
-    """
-    if ext.shape == (4, 4):
-        return ext
-    if ext.shape == (3, 4):
-        H = np.eye(4, dtype=ext.dtype)
-        H[:3, :4] = ext
-        return H
-    raise ValueError(f"extrinsic must be (4,4) or (3,4), got {ext.shape}")
-
-
-def _depths_to_world_points_with_colors(
-    depth: np.ndarray,
-    K: np.ndarray,
-    ext_w2c: np.ndarray,
-    images_u8: np.ndarray,
-    conf: np.ndarray | None,
-    conf_thr: float,
-) -> tuple[np.ndarray, np.ndarray]:
-    """
-    For each frame, transform (u,v,1) through K^{-1} to get rays,
-    multiply by depth to camera frame, then use (w2c)^{-1} to transform to world frame.
-    Simultaneously extract colors.
-    """
-    N, H, W = depth.shape
-    us, vs = np.meshgrid(np.arange(W), np.arange(H))
-    ones = np.ones_like(us)
-    pix = np.stack([us, vs, ones], axis=-1).reshape(-1, 3)  # (H*W,3)
-
-    pts_all, col_all = [], []
-
-    for i in range(N):
-        d = depth[i]  # (H,W)
-        valid = np.isfinite(d) & (d > 0)
-        if conf is not None:
-            valid &= conf[i] >= conf_thr
-        if not np.any(valid):
-            continue
-
-        d_flat = d.reshape(-1)
-        vidx = np.flatnonzero(valid.reshape(-1))
-
-        K_inv = np.linalg.inv(K[i])  # (3,3)
-        c2w = np.linalg.inv(_as_homogeneous44(ext_w2c[i]))  # (4,4)
-
-        rays = K_inv @ pix[vidx].T  # (3,M)
-        Xc = rays * d_flat[vidx][None, :]  # (3,M)
-        Xc_h = np.vstack([Xc, np.ones((1, Xc.shape[1]))])
-        Xw = (c2w @ Xc_h)[:3].T.astype(np.float32)  # (M,3)
-
-        cols = images_u8[i].reshape(-1, 3)[vidx].astype(np.uint8)  # (M,3)
-
-        pts_all.append(Xw)
-        col_all.append(cols)
-
-    if len(pts_all) == 0:
-        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.uint8)
-
-    return np.concatenate(pts_all, 0), np.concatenate(col_all, 0)
-
-
 def _filter_and_downsample(points: np.ndarray, colors: np.ndarray, num_max: int):
     if points.shape[0] == 0:
         return points, colors
@@ -263,15 +273,6 @@ def _filter_and_downsample(points: np.ndarray, colors: np.ndarray, num_max: int)
     return points, colors
 
 
-def _estimate_scene_scale(points: np.ndarray, fallback: float = 1.0) -> float:
-    if points.shape[0] < 2:
-        return fallback
-    lo = np.percentile(points, 5, axis=0)
-    hi = np.percentile(points, 95, axis=0)
-    diag = np.linalg.norm(hi - lo)
-    return float(diag if np.isfinite(diag) and diag > 0 else fallback)
-
-
 def _compute_alignment_transform_first_cam_glTF_center_by_points(
     ext_w2c0: np.ndarray,
     points_world: np.ndarray,
@@ -12,22 +12,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import contextvars
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Literal, Optional
 import moviepy.editor as mpy
+import numpy as np
 import torch
 
-from depth_anything_3.model.utils.gs_renderer import run_renderer_in_chunk_w_trj_mode
+from depth_anything_3.model.utils.gs_renderer import (
+    get_render_trajectory,
+    render_trajectory_in_chunks,
+    run_renderer_in_chunk_w_trj_mode,
+)
 from depth_anything_3.specs import Prediction
+from depth_anything_3.utils.gs_reduction import pixels_per_unit, reduce_gaussians
 from depth_anything_3.utils.gsply_helpers import save_gaussian_ply
+from depth_anything_3.utils.io.video_writer import VIDEO_QUALITY_MAP, VideoWriter
 from depth_anything_3.utils.layout_helpers import hcat, vcat
-from depth_anything_3.utils.visualize import vis_depth_map_tensor
-
-VIDEO_QUALITY_MAP = {
-    "low": {"crf": "28", "preset": "veryfast"},
-    "medium": {"crf": "23", "preset": "medium"},
-    "high": {"crf": "18", "preset": "slow"},
-}
+from depth_anything_3.utils.visualize import depth_map_log_range, vis_depth_map_tensor
 
 
 def export_to_gs_ply(
@@ -36,12 +39,15 @@ def export_to_gs_ply(
     gs_views_interval: Optional[
         int
     ] = 1,  # export GS every N views, useful for extremely dense inputs
+    compressed: bool = False,  # quantized gs_ply/0000.compressed.ply for web viewers
+    gs_reduction: Optional[dict] = None,  # kwargs of reduce_gaussians; None keeps all Gaussians
 ):
     gs_world = prediction.gaussians
     pred_depth = torch.from_numpy(prediction.depth).unsqueeze(-1).to(gs_world.means)  # v h w 1
     idx = 0
     os.makedirs(os.path.join(export_dir, "gs_ply"), exist_ok=True)
-    save_path = os.path.join(export_dir, f"gs_ply/{idx:04d}.ply")
+    suffix = ".compressed.ply" if compressed else ".ply"
+    save_path = os.path.join(export_dir, f"gs_ply/{idx:04d}{suffix}")
     if gs_views_interval is None:  # select around 12 views in total
         gs_views_interval = max(pred_depth.shape[0] // 12, 1)
     save_gaussian_ply(
@@ -55,6 +61,9 @@ def export_to_gs_ply(
         prune_by_depth_percent=0.9,
         prune_border_gs=True,
         match_3dgs_mcmc_dev=False,
+        compressed=compressed,
+        reduction=gs_reduction,
+        ctx_intrinsics=torch.from_numpy(prediction.intrinsics).to(gs_world.means),
     )
 
 
@@ -80,8 +89,34 @@ def export_to_gs_video(
     enable_tqdm: Optional[bool] = True,
     output_name: Optional[str] = None,
     video_quality: Literal["low", "medium", "high"] = "high",
+    streaming: bool = True,
+    gs_reduction: Optional[dict] = None,
+    render_backend: Literal["auto", "gsplat", "cpu"] = "auto",
 ) -> None:
+    """
+    Render the Gaussians along a camera path and save one video per scene in ``gs_video/``.
+
+    With ``streaming=True`` (default) each rendered chunk is converted and piped to the
+    encoder right away, while the next chunk renders, so memory stays constant in the
+    video length. The depth colour range is then fixed up front from a few evenly spaced
+    views of the path. ``streaming=False`` renders the whole path first and encodes it
+    with moviepy.
+
+    ``gs_reduction`` holds keyword arguments of ``reduce_gaussians``; when set, the
+    Gaussians are pruned and merged once before rendering, which speeds up every frame.
+    ``render_backend="auto"`` rasterizes with gsplat on CUDA and with the reference CPU
+    rasterizer otherwise.
+    """
     gs_world = prediction.gaussians
+    if gs_reduction is not None:
+        gs_world = reduce_gaussians(
+            gs_world,
+            px_per_unit=pixels_per_unit(
+                torch.from_numpy(prediction.depth).to(gs_world.means),
+                torch.from_numpy(prediction.intrinsics).to(gs_world.means),
+            ),
+            **gs_reduction,
+        )
     # if target poses are not provided, render the (smooth/interpolate) input poses
     if extrinsics is not None:
         tgt_extrs = extrinsics
@@ -106,6 +141,24 @@ def export_to_gs_video(
         trj_mode = "wander"
         # trj_mode = "dolly_zoom"
 
+    if streaming:
+        _stream_gs_video(
+            gs_world,
+            tgt_extrs,
+            tgt_intrs,
+            image_shape=(H, W),
+            chunk_size=chunk_size,
+            trj_mode=trj_mode,
+            color_mode=color_mode,
+            vis_depth=vis_depth,
+            enable_tqdm=enable_tqdm,
+            save_dir=os.path.join(export_dir, "gs_video"),
+            output_name=output_name,
+            video_quality=video_quality,
+            render_backend=render_backend,
+        )
+        return
+
     color, depth = run_renderer_in_chunk_w_trj_mode(
         gaussians=gs_world,
         extrinsics=tgt_extrs,
@@ -116,6 +169,7 @@ def export_to_gs_video(
         use_sh=True,
         color_mode=color_mode,
         enable_tqdm=enable_tqdm,
+        backend=render_backend,
     )
 
     # save as video
@@ -152,3 +206,100 @@ def export_to_gs_video(
             ffmpeg_params=ffmpeg_params,
         )
     return
+
+
+def _gs_video_frames(
+    color: torch.Tensor,  # "view 3 height width"
+    depth: torch.Tensor,  # "view height width"
+    vis_depth: Optional[Literal["hcat", "vcat"]],
+    near_far: Optional[tuple[torch.Tensor, torch.Tensor]] = None,
+) -> np.ndarray:  # "view height width 3", uint8
+    if vis_depth is not None:
+        depth_vis = vis_depth_map_tensor(depth, near_far=near_far)
+        cat_fn = hcat if vis_depth == "hcat" else vcat
+        color = torch.stack([cat_fn(c, d) for c, d in zip(color, depth_vis)])
+    return (color.clamp(0, 1) * 255).byte().permute(0, 2, 3, 1).cpu().numpy()
+
+
+def _stream_gs_video(
+    gaussians,
+    extrinsics: torch.Tensor,
+    intrinsics: torch.Tensor,
+    image_shape: tuple[int, int],
+    chunk_size: Optional[int],
+    trj_mode: str,
+    color_mode: str,
+    vis_depth: Optional[Literal["hcat", "vcat"]],
+    enable_tqdm: bool,
+    save_dir: str,
+    output_name: Optional[str],
+    video_quality: str,
+    fps: float = 24,
+    render_backend: str = "auto",
+) -> None:
+    """Render the camera path chunk by chunk, encoding chunk k while chunk k + 1 renders."""
+    render_kwargs = dict(use_sh=True, color_mode=color_mode, backend=render_backend)
+    tgt_extr, tgt_intr = get_render_trajectory(
+        extrinsics, intrinsics, image_shape, trj_mode=trj_mode
+    )
+    b, v = tgt_extr.shape[:2]
+
+    # Fix the depth colour range from a few views spread over the whole path
+    near_far = [None] * b
+    if vis_depth is not None:
+        probe = torch.linspace(0, v - 1, min(v, 8), device=tgt_extr.device).round().long()
+        _, probe_depth = next(
+            render_trajectory_in_chunks(
+                gaussians,
+                tgt_extr[:, probe],
+                tgt_intr[:, probe],
+                image_shape,
+                chunk_size=len(probe),
+                **render_kwargs,
+            )
+        )
+        near_far = [depth_map_log_range(d) for d in probe_depth]
+
+    os.makedirs(save_dir, exist_ok=True)
+    writers = []
+    for idx in range(b):
+        if output_name is None:
+            name = f"{idx:04d}_{trj_mode}"
+        else:
+            name = output_name if b == 1 else f"{output_name}_{idx:04d}"
+        save_path = os.path.join(save_dir, f"{name}.mp4")
+        writers.append(VideoWriter(save_path, fps=fps, quality=video_quality))
+
+    def encode(chunk_frames: list[np.ndarray]) -> None:
+        for writer, frames in zip(writers, chunk_frames):
+            writer.write_frames(frames)
+
+    # One chunk in flight: the encoder thread pipes chunk k while the GPU renders chunk k + 1
+    encoder = ThreadPoolExecutor(max_workers=1)
+    pending = None
+    try:
+        for color, depth in render_trajectory_in_chunks(
+            gaussians,
+            tgt_extr,
+            tgt_intr,
+            image_shape,
+            chunk_size=chunk_size,
+            enable_tqdm=enable_tqdm,
+            **render_kwargs,
+        ):
+            chunk_frames = [
+                _gs_video_frames(color[i], depth[i], vis_depth, near_far[i]) for i in range(b)
+            ]
+            if pending is not None:
+                pending.result()
+            pending = encoder.submit(contextvars.copy_context().run, encode, chunk_frames)
+        if pending is not None:
+            pending.result()
+        for writer in writers:
+            writer.close()
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
+    finally:
+        encoder.shutdown(wait=True)
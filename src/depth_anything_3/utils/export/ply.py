@@ -0,0 +1,92 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import os
+import numpy as np
+from plyfile import PlyData, PlyElement
+
+from depth_anything_3.specs import Prediction
+from depth_anything_3.utils.logger import logger
+
+from .pointcloud import PointCloud, prepare_point_cloud
+
+
+def point_cloud_conf_thresh(
+    prediction: Prediction, conf_thresh_percentile: float = 40.0, **kwargs
+) -> float | None:
+    """Confidence threshold used by ``export_to_ply``."""
+    if prediction.conf is None:
+        return None
+    return float(np.percentile(prediction.conf, conf_thresh_percentile))
+
+
+def export_to_ply(
+    prediction: Prediction,
+    export_dir: str,
+    conf_thresh_percentile: float = 40.0,
+    num_max_points: int = 1_000_000,
+    downsample: str = "random",
+    voxel_size: float | None = None,
+    point_cloud: PointCloud | None = None,
+) -> str:
+    """Export the coloured world-space point cloud as a binary ``points.ply``.
+
+    Args:
+        prediction: Model prediction containing depth, intrinsics, extrinsics and
+            pre-processed images.
+        export_dir: Output directory; the cloud is written to ``ply/points.ply``.
+        conf_thresh_percentile: Lower confidence percentile to drop.
+        num_max_points: Maximum number of points retained after downsampling.
+        downsample: "random" (uniform subset), "voxel" (merge overlapping views on a voxel
+            grid, streaming frame by frame) or "none".
+        voxel_size: Voxel edge for ``downsample="voxel"``; derived from ``num_max_points``
+            and the scene scale if None.
+        point_cloud: Shared back-projected cloud (see ``build_point_cloud``) built with a
+            confidence threshold no stricter than this export's; built here if None.
+
+    Returns:
+        Path to the exported ``points.ply`` file.
+    """
+    conf_thresh = point_cloud_conf_thresh(prediction, conf_thresh_percentile)
+    point_cloud = prepare_point_cloud(
+        prediction,
+        conf_thresh,
+        point_cloud,
+        downsample=downsample,
+        num_max_points=num_max_points,
+        voxel_size=voxel_size,
+    )
+    points, colors = point_cloud.points, point_cloud.colors
+    logger.info(f"Exporting to PLY with {len(points)} points")
+
+    vertex = np.empty(
+        len(points),
+        dtype=[
+            ("x", "f4"),
+            ("y", "f4"),
+            ("z", "f4"),
+            ("red", "u1"),
+            ("green", "u1"),
+            ("blue", "u1"),
+        ],
+    )
+    vertex["x"], vertex["y"], vertex["z"] = points[:, 0], points[:, 1], points[:, 2]
+    vertex["red"], vertex["green"], vertex["blue"] = colors[:, 0], colors[:, 1], colors[:, 2]
+
+    out_path = os.path.join(export_dir, "ply", "points.ply")
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    PlyData([PlyElement.describe(vertex, "vertex")]).write(out_path)
+    return out_path
@@ -0,0 +1,534 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Shared world-space point cloud for point-based exporters (glb, colmap, ply).
+
+``build_point_cloud`` back-projects a prediction once and keeps, per point, its colour,
+confidence and source pixel / frame. Exporters then select their own confidence threshold
+from the shared product instead of back-projecting the full depth stack again.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+import torch
+
+from depth_anything_3.specs import DeferredArray, Prediction
+
+
+@dataclass
+class PointCloud:
+    """
+    Back-projected points in world coordinates.
+
+    Attributes:
+        points: (M, 3) float32 world coordinates
+        colors: (M, 3) uint8 RGB colours
+        conf: (M,) float32 confidence, or None if the prediction has no confidence
+        pixels: (M, 2) int32 source pixel (x, y) in the processed image
+        frame_idx: (M,) int32 source frame index
+        conf_thresh: Confidence threshold the cloud was built with (None = unfiltered)
+    """
+
+    points: np.ndarray
+    colors: np.ndarray
+    conf: np.ndarray | None
+    pixels: np.ndarray
+    frame_idx: np.ndarray
+    conf_thresh: float | None = None
+
+    def __len__(self) -> int:
+        return self.points.shape[0]
+
+    def select(self, keep: np.ndarray) -> PointCloud:
+        """Return the subset of points where ``keep`` (bool mask or indices) holds."""
+        return PointCloud(
+            points=self.points[keep],
+            colors=self.colors[keep],
+            conf=self.conf[keep] if self.conf is not None else None,
+            pixels=self.pixels[keep],
+            frame_idx=self.frame_idx[keep],
+            conf_thresh=self.conf_thresh,
+        )
+
+    def filter_conf(self, conf_thresh: float | None) -> PointCloud:
+        """Drop points below ``conf_thresh``; no-op if the cloud is already that strict."""
+        if conf_thresh is None or self.conf is None:
+            return self
+        if self.conf_thresh is not None and conf_thresh <= self.conf_thresh:
+            return self
+        cloud = self.select(self.conf >= conf_thresh)
+        cloud.conf_thresh = conf_thresh
+        return cloud
+
+
+def _as_homogeneous44(ext: np.ndarray) -> np.ndarray:
+    """
+    Accept (4,4) or (3,4) extrinsic parameters, return (4,4) homogeneous matrix.
+    """
+    if ext.shape == (4, 4):
+        return ext
+    if ext.shape == (3, 4):
+        H = np.eye(4, dtype=ext.dtype)
+        H[:3, :4] = ext
+        return H
+    raise ValueError(f"extrinsic must be (4,4) or (3,4), got {ext.shape}")
+
+
+# one RGB uint8 triplet as a single item, so colour gathers move 3 bytes per index
+_RGB = np.dtype((np.void, 3))
+
+
+@lru_cache(maxsize=8)
+def _pixel_grid(height: int, width: int) -> np.ndarray:
+    """Homogeneous pixel coordinates (u, v, 1) as a read-only (3, H*W) float32 grid."""
+    us, vs = np.meshgrid(np.arange(width, dtype=np.float32), np.arange(height, dtype=np.float32))
+    grid = np.stack([us, vs, np.ones_like(us)], axis=0).reshape(3, -1)
+    grid.flags.writeable = False
+    return grid
+
+
+@lru_cache(maxsize=8)
+def _pixel_grid_torch(height: int, width: int, device: torch.device) -> torch.Tensor:
+    return torch.from_numpy(_pixel_grid(height, width).copy()).to(device)
+
+
+def _pixel_to_world(K: np.ndarray, ext_w2c: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-frame pixel-to-world ray matrices ``c2w[:3, :3] @ K^{-1}`` (N, 3, 3) and camera
+    centres ``c2w[:3, 3]`` (N, 3), inverted in float64 and returned as float32.
+    """
+    K = np.asarray(K, dtype=np.float64)
+    ext = np.asarray(ext_w2c, dtype=np.float64)
+    if ext.shape[-2:] == (3, 4):
+        bottom = np.broadcast_to(np.array([0.0, 0.0, 0.0, 1.0]), (ext.shape[0], 1, 4))
+        ext = np.concatenate([ext, bottom], axis=1)
+    c2w = np.linalg.inv(ext)
+    rays = c2w[:, :3, :3] @ np.linalg.inv(K)
+    return rays.astype(np.float32), c2w[:, :3, 3].astype(np.float32)
+
+
+def _device_tensor(prediction: Prediction, name: str) -> torch.Tensor | None:
+    """Device tensor behind a not-yet-copied lazy field, if any."""
+    value = object.__getattribute__(prediction, name)
+    if isinstance(value, DeferredArray) and value.tensor.device.type != "cpu":
+        return value.tensor
+    return None
+
+
+def build_point_cloud(
+    prediction: Prediction,
+    conf_thresh: float | None = None,
+    conf: np.ndarray | None = None,
+    device: str | torch.device | None = None,
+) -> PointCloud:
+    """
+    Back-project every valid pixel of ``prediction`` to world coordinates.
+
+    Each kept pixel (u, v) becomes ``depth * (c2w[:3, :3] @ K^{-1}) @ (u, v, 1) + c2w[:3, 3]``
+    in float32, with the pixel grid cached per resolution. Pixels with non-finite or
+    non-positive depth, confidence below ``conf_thresh`` or outside
+    ``prediction.valid_mask`` (padding) are skipped.
+
+    On CPU, points are counted first and written frame by frame into preallocated output
+    arrays. On a torch device, all frames are back-projected in one pass and only the kept
+    points are copied to host; this path is taken automatically when the depth of a lazy
+    prediction (``inference(lazy_outputs=True)``) is still on the model device.
+
+    Args:
+        prediction: Prediction with depth, intrinsics, extrinsics and processed images.
+        conf_thresh: Minimum confidence to keep (None keeps all valid pixels).
+        conf: Confidence to filter and store instead of ``prediction.conf``.
+        device: Force the torch path on this device ("cpu" forces the numpy path).
+    """
+    depth_t = _device_tensor(prediction, "depth")
+    if device is None and depth_t is not None:
+        device = depth_t.device
+    if device is not None and torch.device(device).type != "cpu":
+        return _build_point_cloud_torch(prediction, conf_thresh, conf, torch.device(device))
+    return _build_point_cloud_np(prediction, conf_thresh, conf)
+
+
+def _build_point_cloud_np(
+    prediction: Prediction, conf_thresh: float | None, conf: np.ndarray | None
+) -> PointCloud:
+    depth = np.asarray(prediction.depth, dtype=np.float32)
+    images_u8 = prediction.processed_images
+    valid_mask = prediction.valid_mask
+    if conf is None:
+        conf = prediction.conf
+    rays, centers = _pixel_to_world(prediction.intrinsics, prediction.extrinsics)
+
+    N, H, W = depth.shape
+    depth = depth.reshape(N, -1)
+    keep = np.isfinite(depth) & (depth > 0)
+    if conf is not None and conf_thresh is not None:
+        keep &= conf.reshape(N, -1) >= conf_thresh
+    if valid_mask is not None:
+        keep &= valid_mask.reshape(N, -1)
+    offsets = np.concatenate([[0], np.cumsum(keep.sum(axis=1))])
+
+    num_points = int(offsets[-1])
+    cloud = PointCloud(
+        points=np.empty((num_points, 3), dtype=np.float32),
+        colors=np.empty((num_points, 3), dtype=np.uint8),
+        conf=np.empty((num_points,), dtype=np.float32) if conf is not None else None,
+        pixels=np.empty((num_points, 2), dtype=np.int32),
+        frame_idx=np.empty((num_points,), dtype=np.int32),
+        conf_thresh=conf_thresh,
+    )
+    grid = _pixel_grid(H, W)
+    colors = cloud.colors.view(_RGB).reshape(-1)
+    images_rgb = np.ascontiguousarray(images_u8).reshape(N, -1, 3).view(_RGB).reshape(N, -1)
+    for i in range(N):
+        s, e = offsets[i], offsets[i + 1]
+        if s == e:
+            continue
+        vidx = np.flatnonzero(keep[i])
+        d, u, v = depth[i, vidx], grid[0, vidx], grid[1, vidx]
+        # (c2w_R @ K^-1) @ (u, v, 1) one output axis at a time: plain float32 axpys beat a
+        # gathered (M, 3) @ (3, 3) matmul
+        for k in range(3):
+            axis = u * rays[i, k, 0]
+            axis += v * rays[i, k, 1]
+            axis += rays[i, k, 2]
+            axis *= d
+            axis += centers[i, k]
+            cloud.points[s:e, k] = axis
+        colors[s:e] = images_rgb[i, vidx]
+        cloud.pixels[s:e, 0] = vidx % W
+        cloud.pixels[s:e, 1] = vidx // W
+        cloud.frame_idx[s:e] = i
+        if conf is not None:
+            cloud.conf[s:e] = conf[i].reshape(-1)[vidx]
+    return cloud
+
+
+@torch.no_grad()
+def _build_point_cloud_torch(
+    prediction: Prediction,
+    conf_thresh: float | None,
+    conf: np.ndarray | None,
+    device: torch.device,
+) -> PointCloud:
+    depth = _device_tensor(prediction, "depth")
+    if depth is None:
+        depth = torch.as_tensor(np.asarray(prediction.depth))
+    depth = depth.to(device=device, dtype=torch.float32)
+    if conf is None:
+        conf = _device_tensor(prediction, "conf")
+        if conf is None:
+            conf = prediction.conf
+    if conf is not None:
+        conf = torch.as_tensor(conf).to(device=device, dtype=torch.float32)
+    rays, centers = _pixel_to_world(prediction.intrinsics, prediction.extrinsics)
+    rays = torch.from_numpy(rays).to(device)
+    centers = torch.from_numpy(centers).to(device)
+
+    N, H, W = depth.shape
+    depth = depth.reshape(N, -1)
+    keep = torch.isfinite(depth) & (depth > 0)
+    if conf is not None and conf_thresh is not None:
+        keep &= conf.reshape(N, -1) >= conf_thresh
+    if prediction.valid_mask is not None:
+        keep &= torch.as_tensor(prediction.valid_mask).to(device).reshape(N, -1)
+
+    frame, pix = torch.nonzero(keep, as_tuple=True)
+    grid = _pixel_grid_torch(H, W, device)
+    points = torch.einsum("mij,jm->mi", rays[frame], grid[:, pix])
+    points = points * depth[frame, pix][:, None] + centers[frame]
+
+    frame_idx = frame.to(torch.int32).cpu().numpy()
+    pix = pix.to(torch.int32).cpu().numpy()
+    images_u8 = prediction.processed_images.reshape(N, -1, 3)
+    return PointCloud(
+        points=points.cpu().numpy(),
+        colors=images_u8[frame_idx, pix],
+        conf=conf.reshape(N, -1)[frame, pix].cpu().numpy() if conf is not None else None,
+        pixels=np.stack([pix % W, pix // W], axis=1),
+        frame_idx=frame_idx,
+        conf_thresh=conf_thresh,
+    )
+
+
+def _estimate_scene_scale(points: np.ndarray, fallback: float = 1.0) -> float:
+    if points.shape[0] < 2:
+        return fallback
+    lo = np.percentile(points, 5, axis=0)
+    hi = np.percentile(points, 95, axis=0)
+    diag = np.linalg.norm(hi - lo)
+    return float(diag if np.isfinite(diag) and diag > 0 else fallback)
+
+
+def _voxel_size_for_budget(points: np.ndarray, num_max_points: int) -> float:
+    """Voxel edge at which a surface spanning the scene diagonal fills ~``num_max_points``."""
+    if points.shape[0] > 100_000:
+        points = points[np.random.randint(0, points.shape[0], 100_000)]
+    return _estimate_scene_scale(points) / np.sqrt(max(num_max_points, 1))
+
+
+class VoxelGrid:
+    """
+    Streaming spatial-hash voxel accumulator for point clouds.
+
+    Points added in any number of batches (e.g. frame by frame) are merged per voxel into
+    the confidence-weighted mean position and colour, so overlapping views collapse into
+    one point per voxel. The highest-confidence point of a voxel supplies its source pixel
+    and frame. Batches are reduced on arrival and merged into the grid whenever the buffer
+    outgrows it, so memory is bounded by the number of occupied voxels.
+
+    Usage:
+        grid = VoxelGrid(voxel_size=0.01)
+        for cloud in per_frame_clouds:
+            grid.add(cloud)
+        merged = grid.point_cloud()
+    """
+
+    _BITS = 21  # bits per axis in the packed int64 voxel key
+    _SUMS = 8  # w*x, w*y, w*z, w*r, w*g, w*b, w, count
+
+    def __init__(self, voxel_size: float, merge_min: int = 1_000_000):
+        if not voxel_size > 0:
+            raise ValueError(f"voxel_size must be positive, got {voxel_size}")
+        self.voxel_size = float(voxel_size)
+        self.merge_min = merge_min
+        self._records = self._reduce(
+            np.zeros(0, dtype=np.int64),
+            np.zeros((self._SUMS, 0), dtype=np.float64),
+            np.zeros(0, dtype=np.float32),
+            np.zeros((0, 2), dtype=np.int32),
+            np.zeros(0, dtype=np.int32),
+        )
+        self._pending = []
+        self._num_pending = 0
+
+    def __len__(self) -> int:
+        self._merge()
+        return len(self._records[0])
+
+    def _keys(self, points: np.ndarray) -> np.ndarray:
+        half = 1 << (self._BITS - 1)
+        ijk = np.floor(points / self.voxel_size).astype(np.int64) + half
+        np.clip(ijk, 0, (1 << self._BITS) - 1, out=ijk)
+        return (ijk[:, 0] << (2 * self._BITS)) | (ijk[:, 1] << self._BITS) | ijk[:, 2]
+
+    @staticmethod
+    def _reduce(keys, sums, best, pixels, frame_idx):
+        """
+        Sum records sharing a key; keep the pixel / frame of the best-weighted one.
+
+        ``sums`` is stored row-major as (SUMS, M) so every ``bincount`` reads a contiguous
+        row.
+        """
+        uniq, inv = np.unique(keys, return_inverse=True)
+        inv = inv.reshape(-1)
+        out = np.empty((sums.shape[0], len(uniq)), dtype=np.float64)
+        for c in range(sums.shape[0]):
+            out[c] = np.bincount(inv, weights=sums[c], minlength=len(uniq))
+        # one float64 argsort instead of a lexsort: group index plus a fraction in [0.5, 1)
+        # that shrinks as the weight grows, so each group's best record sorts first
+        rank = inv + (1.0 - best / (2.0 * best.max() + 1e-12)) if len(inv) else inv
+        order = np.argsort(rank)
+        starts = np.concatenate([[0], np.cumsum(np.bincount(inv, minlength=len(uniq)))[:-1]])
+        first = order[starts.astype(np.int64)] if len(uniq) else order
+        return uniq, out, best[first], pixels[first], frame_idx[first]
+
+    def add(self, cloud: PointCloud) -> None:
+        """Accumulate a batch of points (weighted by their confidence, if any)."""
+        finite = np.isfinite(cloud.points).all(axis=1)
+        if not finite.all():
+            cloud = cloud.select(finite)
+        if len(cloud) == 0:
+            return
+        w = cloud.conf if cloud.conf is not None else np.ones(len(cloud), dtype=np.float32)
+        w = np.maximum(w.astype(np.float64), 1e-6)
+        sums = np.empty((self._SUMS, len(cloud)), dtype=np.float64)
+        sums[0:3] = cloud.points.T
+        sums[3:6] = cloud.colors.T
+        sums[0:6] *= w
+        sums[6] = w
+        sums[7] = 1.0
+        records = self._reduce(
+            self._keys(cloud.points), sums, w.astype(np.float32), cloud.pixels, cloud.frame_idx
+        )
+        self._pending.append(records)
+        self._num_pending += len(records[0])
+        if self._num_pending >= max(self.merge_min, len(self._records[0])):
+            self._merge()
+
+    def _merge(self) -> None:
+        if not self._pending:
+            return
+        parts = list(zip(self._records, *self._pending))
+        self._records = self._reduce(
+            *(np.concatenate(p, axis=1 if i == 1 else 0) for i, p in enumerate(parts))
+        )
+        self._pending, self._num_pending = [], 0
+
+    def coarsen(self, factor: float) -> None:
+        """Grow the voxel size by ``factor`` and re-merge the existing voxels."""
+        self._merge()
+        keys, sums, best, pixels, frame_idx = self._records
+        self.voxel_size *= factor
+        points = (sums[0:3] / sums[6]).T
+        self._records = self._reduce(self._keys(points), sums, best, pixels, frame_idx)
+
+    def point_cloud(self) -> PointCloud:
+        """Merged cloud: one point per occupied voxel, ``conf`` is the mean confidence."""
+        self._merge()
+        _, sums, _, pixels, frame_idx = self._records
+        w = sums[6]
+        return PointCloud(
+            points=(sums[0:3] / w).T.astype(np.float32),
+            colors=np.clip(np.round(sums[3:6] / w), 0, 255).T.astype(np.uint8),
+            conf=(sums[6] / sums[7]).astype(np.float32),
+            pixels=pixels,
+            frame_idx=frame_idx,
+        )
+
+
+def _finish_voxel_grid(grid: VoxelGrid, num_max_points: int | None, conf_thresh) -> PointCloud:
+    # the surface heuristic behind the initial voxel size can undershoot; coarsen until the
+    # budget holds instead of dropping voxels at random
+    for _ in range(8):
+        if num_max_points is None or len(grid) <= num_max_points:
+            break
+        grid.coarsen(max(np.sqrt(len(grid) / num_max_points), 1.1))
+    cloud = grid.point_cloud()
+    cloud.conf_thresh = conf_thresh
+    return cloud
+
+
+def voxel_downsample(
+    cloud: PointCloud,
+    voxel_size: float | None = None,
+    num_max_points: int | None = None,
+    chunk_size: int = 2_000_000,
+) -> PointCloud:
+    """
+    Merge ``cloud`` on a voxel grid (see ``VoxelGrid``).
+
+    Args:
+        cloud: Input cloud; ``conf`` is used as the merge weight.
+        voxel_size: Voxel edge length; derived from ``num_max_points`` and the scene scale
+            if None.
+        num_max_points: Point budget; the grid is coarsened until it is met.
+        chunk_size: Points accumulated per batch.
+    """
+    if voxel_size is None:
+        if num_max_points is None:
+            raise ValueError("voxel_downsample needs voxel_size or num_max_points")
+        voxel_size = _voxel_size_for_budget(cloud.points, num_max_points)
+    grid = VoxelGrid(voxel_size)
+    for s in range(0, len(cloud), chunk_size):
+        grid.add(cloud.select(slice(s, s + chunk_size)))
+    return _finish_voxel_grid(grid, num_max_points, cloud.conf_thresh)
+
+
+def voxel_downsample_prediction(
+    prediction: Prediction,
+    conf_thresh: float | None = None,
+    conf: np.ndarray | None = None,
+    voxel_size: float | None = None,
+    num_max_points: int | None = None,
+    frames_per_chunk: int = 8,
+) -> PointCloud:
+    """
+    Back-project and voxel-merge ``prediction`` a few frames at a time.
+
+    Only ``frames_per_chunk`` frames are back-projected at once, so peak memory is bounded
+    by the occupied voxels rather than by the number of views. Without ``voxel_size``, the
+    scene scale is estimated from a strided subset of frames.
+
+    Args:
+        prediction: Prediction with depth, intrinsics, extrinsics and processed images.
+        conf_thresh: Minimum confidence to keep (None keeps all valid pixels).
+        conf: Confidence to filter and weight by instead of ``prediction.conf``.
+        voxel_size: Voxel edge length (derived from ``num_max_points`` if None).
+        num_max_points: Point budget; the grid is coarsened until it is met.
+        frames_per_chunk: Frames back-projected per batch.
+    """
+    if conf is None:
+        conf = prediction.conf
+    num_frames = len(prediction)
+    if voxel_size is None:
+        if num_max_points is None:
+            raise ValueError("voxel_downsample_prediction needs voxel_size or num_max_points")
+        step = max(1, num_frames // 8)
+        sample = build_point_cloud(
+            prediction[::step], conf_thresh, conf=conf[::step] if conf is not None else None
+        )
+        voxel_size = _voxel_size_for_budget(sample.points, num_max_points)
+
+    grid = VoxelGrid(voxel_size)
+    for s in range(0, num_frames, frames_per_chunk):
+        e = min(s + frames_per_chunk, num_frames)
+        cloud = build_point_cloud(
+            prediction[s:e], conf_thresh, conf=conf[s:e] if conf is not None else None
+        )
+        cloud.frame_idx += s
+        grid.add(cloud)
+    return _finish_voxel_grid(grid, num_max_points, conf_thresh)
+
+
+def downsample_point_cloud(
+    cloud: PointCloud,
+    num_max_points: int | None,
+    method: str = "random",
+    voxel_size: float | None = None,
+) -> PointCloud:
+    """
+    Cap ``cloud`` to ``num_max_points``.
+
+    Args:
+        method: "random" (uniform subsampling), "voxel" (``voxel_downsample``) or "none".
+    """
+    if method == "voxel":
+        return voxel_downsample(cloud, voxel_size, num_max_points)
+    if method == "random":
+        if num_max_points is not None and len(cloud) > num_max_points:
+            return cloud.select(np.random.choice(len(cloud), num_max_points, replace=False))
+        return cloud
+    if method == "none":
+        return cloud
+    raise ValueError(f"Unknown point cloud downsampling method: {method}")
+
+
+def prepare_point_cloud(
+    prediction: Prediction,
+    conf_thresh: float | None,
+    point_cloud: PointCloud | None = None,
+    conf: np.ndarray | None = None,
+    downsample: str = "random",
+    num_max_points: int | None = None,
+    voxel_size: float | None = None,
+) -> PointCloud:
+    """
+    Confidence-filtered, downsampled cloud for an exporter.
+
+    Reuses the shared ``point_cloud`` of a multi-format export when given; otherwise
+    back-projects ``prediction``, streaming frame by frame when ``downsample="voxel"``.
+    """
+    if point_cloud is None and downsample == "voxel":
+        return voxel_downsample_prediction(
+            prediction, conf_thresh, conf, voxel_size, num_max_points
+        )
+    if point_cloud is None:
+        point_cloud = build_point_cloud(prediction, conf_thresh, conf=conf)
+    else:
+        point_cloud = point_cloud.filter_conf(conf_thresh)
+    return downsample_point_cloud(point_cloud, num_max_points, downsample, voxel_size)
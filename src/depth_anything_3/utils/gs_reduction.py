@@ -0,0 +1,193 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Gaussian reduction: prune and merge the pixel-aligned Gaussians of all views.
+
+``GaussianAdapter`` emits one Gaussian per pixel per view, so surfaces seen by several
+views are covered several times. ``reduce_gaussians`` drops nearly transparent Gaussians
+and ones outside a screen-size range, then merges Gaussians that fall into the same
+cell of a spatial hash into one moment-matched Gaussian. Fewer Gaussians mean smaller
+PLYs and faster rendering. It is used by the ``gs_ply`` and ``gs_video`` exports.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Union
+import torch
+
+from depth_anything_3.specs import Gaussians
+from depth_anything_3.utils.geometry import mat_to_quat, quat_to_mat
+from depth_anything_3.utils.logger import logger
+
+_KEY_BITS = 21
+
+
+def pixels_per_unit(
+    depth: torch.Tensor,  # "view height width"
+    intrinsics: torch.Tensor,  # unnormed, "view 3 3"
+) -> torch.Tensor:  # "(view height width)"
+    """Screen pixels per world unit at each pixel's depth, for pixel-aligned Gaussians."""
+    focal = 0.5 * (intrinsics[:, 0, 0] + intrinsics[:, 1, 1])
+    return (focal[:, None, None] / depth.clamp_min(1e-6)).reshape(-1)
+
+
+def _alpha(opacities: torch.Tensor) -> torch.Tensor:
+    """Opacity in [0, 1] per Gaussian (DC coefficient for opacity SH)."""
+    return opacities if opacities.ndim == 1 else opacities[:, 0, 0]
+
+
+def _covariances(scales: torch.Tensor, rotations: torch.Tensor) -> torch.Tensor:
+    rot = quat_to_mat(rotations.roll(-1, dims=-1))  # wxyz -> xyzw
+    return (rot * scales[:, None, :].square()) @ rot.transpose(-1, -2)
+
+
+def _merge_in_voxels(
+    means: torch.Tensor,
+    scales: torch.Tensor,
+    rotations: torch.Tensor,
+    harmonics: torch.Tensor,
+    opacities: torch.Tensor,
+    voxel_size: float,
+) -> tuple[torch.Tensor, ...]:
+    """
+    Merge Gaussians sharing a voxel, weighted by opacity. The merged Gaussian keeps the
+    weighted mean, the weighted covariance of the mixture (own covariances plus mean
+    spread), weighted SH, and the union opacity ``1 - prod(1 - a_i)``. Gaussians alone in
+    their voxel are kept unchanged.
+    """
+    cells = torch.floor(means / voxel_size).long()
+    cells = (cells - cells.min(dim=0).values).clamp_max((1 << _KEY_BITS) - 1)
+    keys = (cells[:, 0] << (2 * _KEY_BITS)) | (cells[:, 1] << _KEY_BITS) | cells[:, 2]
+    _, inverse, counts = torch.unique(keys, return_inverse=True, return_counts=True)
+    shared = counts[inverse] > 1
+    if not shared.any():
+        return means, scales, rotations, harmonics, opacities
+
+    single = ~shared
+    idx = shared.nonzero().squeeze(-1)
+    _, group = torch.unique(inverse[idx], return_inverse=True)
+    num_groups = int(group.max()) + 1
+
+    def weighted_sum(values: torch.Tensor) -> torch.Tensor:
+        out = values.new_zeros((num_groups,) + values.shape[1:])
+        return out.index_add_(0, group, values)
+
+    alpha = _alpha(opacities[idx]).float()
+    w = alpha.clamp_min(1e-6)
+    w_sum = weighted_sum(w)
+
+    def weighted_mean(values: torch.Tensor) -> torch.Tensor:
+        wv = w.view((-1,) + (1,) * (values.ndim - 1)) * values.float()
+        return weighted_sum(wv) / w_sum.view((-1,) + (1,) * (values.ndim - 1))
+
+    mu = weighted_mean(means[idx])
+    # centre before forming second moments to avoid cancellation at large world coordinates
+    d = means[idx].float() - mu[group]
+    cov = weighted_mean(_covariances(scales[idx].float(), rotations[idx].float()))
+    cov = cov + weighted_mean(d[:, :, None] * d[:, None, :])
+    cov = 0.5 * (cov + cov.transpose(-1, -2))
+    evals, evecs = torch.linalg.eigh(cov)
+    # proper rotation: flip the last axis of reflections
+    evecs[..., 2] *= torch.sign(torch.linalg.det(evecs))[:, None]
+    merged_scales = evals.clamp_min(1e-12).sqrt()
+    merged_rotations = mat_to_quat(evecs).roll(1, dims=-1)  # xyzw -> wxyz
+
+    if opacities.ndim == 1:
+        log_transmittance = weighted_sum(torch.log1p(-alpha.clamp(max=1 - 1e-6)))
+        merged_opacities = 1 - log_transmittance.exp()
+    else:
+        merged_opacities = weighted_mean(opacities[idx])
+
+    def cat(kept: torch.Tensor, merged: torch.Tensor) -> torch.Tensor:
+        return torch.cat([kept[single], merged.to(kept.dtype)])
+
+    return (
+        cat(means, mu),
+        cat(scales, merged_scales),
+        cat(rotations, merged_rotations),
+        cat(harmonics, weighted_mean(harmonics[idx])),
+        cat(opacities, merged_opacities),
+    )
+
+
+def auto_merge_voxel_size(scales: torch.Tensor, factor: float = 2.0) -> float:
+    """Voxel edge of about one Gaussian footprint: ``factor`` x median geometric-mean scale."""
+    sample = scales
+    if len(scales) > 100_000:
+        # fixed seed so the voxel size (and the reduced scene) is reproducible across runs
+        gen = torch.Generator().manual_seed(0)
+        sample = scales[torch.randperm(len(scales), generator=gen)[:100_000].to(scales.device)]
+    return float(factor * sample.float().log().mean(-1).exp().median())
+
+
+@torch.no_grad()
+def reduce_gaussians(
+    gaussians: Gaussians,
+    min_opacity: float = 0.005,
+    min_screen_px: Optional[float] = None,
+    max_screen_px: Optional[float] = None,
+    px_per_unit: Optional[torch.Tensor] = None,  # "gaussian", see ``pixels_per_unit``
+    merge_voxel_size: Union[float, str, None] = "auto",
+) -> Gaussians:
+    """
+    Prune and merge Gaussians (batch size 1).
+
+    Args:
+        min_opacity: Drop Gaussians with a lower opacity.
+        min_screen_px, max_screen_px: Drop Gaussians whose largest radius in their source
+            view is outside this range, in pixels (requires ``px_per_unit``).
+        px_per_unit: Pixels per world unit at each Gaussian's source depth.
+        merge_voxel_size: Edge of the merge hash cells in world units; "auto" derives it
+            from the Gaussian scales (``auto_merge_voxel_size``), None disables merging.
+
+    Returns:
+        Reduced ``Gaussians`` with batch size 1.
+    """
+    assert gaussians.means.shape[0] == 1, "reduce_gaussians supports batch_size=1"
+    means = gaussians.means[0]
+    scales = gaussians.scales[0]
+    rotations = gaussians.rotations[0]
+    harmonics = gaussians.harmonics[0]
+    opacities = gaussians.opacities[0]
+    num_in = len(means)
+
+    keep = _alpha(opacities) >= min_opacity
+    if min_screen_px is not None or max_screen_px is not None:
+        if px_per_unit is None or len(px_per_unit) != num_in:
+            logger.warn("Screen-size pruning skipped: px_per_unit does not match the Gaussians")
+        else:
+            radius_px = scales.max(dim=-1).values * px_per_unit.to(scales)
+            if min_screen_px is not None:
+                keep &= radius_px >= min_screen_px
+            if max_screen_px is not None:
+                keep &= radius_px <= max_screen_px
+    means, scales, rotations = means[keep], scales[keep], rotations[keep]
+    harmonics, opacities = harmonics[keep], opacities[keep]
+    num_pruned = len(means)
+
+    if merge_voxel_size == "auto" and len(means):
+        merge_voxel_size = auto_merge_voxel_size(scales)
+    if merge_voxel_size is not None and merge_voxel_size != "auto" and len(means):
+        means, scales, rotations, harmonics, opacities = _merge_in_voxels(
+            means, scales, rotations, harmonics, opacities, merge_voxel_size
+        )
+    logger.info(f"Reduced Gaussians {num_in} -> {num_pruned} (pruned) -> {len(means)} (merged)")
+    return Gaussians(
+        means=means[None],
+        scales=scales[None],
+        rotations=rotations[None],
+        harmonics=harmonics[None],
+        opacities=opacities[None],
+    )
@@ -0,0 +1,269 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Quantized Gaussian splat export in the "compressed PLY" layout (``*.compressed.ply``)
+read by SuperSplat, the PlayCanvas engine and other web viewers.
+
+Gaussians are sorted along a Morton curve and grouped into chunks of 256. Each chunk
+stores float bounds; each Gaussian stores four uint32 words:
+
+    packed_position  11/10/11-bit xyz normalized to the chunk bounds
+    packed_rotation  2-bit index of the largest quaternion component + 3 x 10-bit others
+    packed_scale     11/10/11-bit log-scales normalized to the chunk bounds
+    packed_color     8-bit SH DC colour (normalized to the chunk bounds) + 8-bit opacity
+
+Optional higher SH bands (up to degree 3) are stored as one uint8 per coefficient. A
+DC-only Gaussian takes 16 bytes instead of 56 in a float32 PLY.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Union
+import numpy as np
+from torch import Tensor
+
+SH_C0 = 0.28209479177387814
+CHUNK_SIZE = 256
+MAX_SH_REST = 15  # per colour channel, i.e. SH degree 3
+BITS_11_10_11 = (11, 10, 11)
+
+# chunk bounds in header order
+CHUNK_PROPERTIES = (
+    [f"min_{a}" for a in "xyz"]
+    + [f"max_{a}" for a in "xyz"]
+    + [f"min_scale_{a}" for a in "xyz"]
+    + [f"max_scale_{a}" for a in "xyz"]
+    + [f"min_{c}" for c in "rgb"]
+    + [f"max_{c}" for c in "rgb"]
+)
+VERTEX_PROPERTIES = ["packed_position", "packed_rotation", "packed_scale", "packed_color"]
+PLY_TYPES = {"float": "<f4", "uint": "<u4", "uchar": "u1"}
+
+# indices of the three quaternion components stored next to the dropped largest one
+_OTHER_COMPONENTS = np.array([[1, 2, 3], [0, 2, 3], [0, 1, 3], [0, 1, 2]])
+
+
+def _numpy(x: Union[Tensor, np.ndarray]) -> np.ndarray:
+    if isinstance(x, Tensor):
+        x = x.detach().float().cpu().numpy()
+    return np.asarray(x, dtype=np.float32)
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    """Insert two zero bits between each of the low 10 bits of ``v``."""
+    v = v.astype(np.uint32)
+    v = (v | (v << 16)) & 0x030000FF
+    v = (v | (v << 8)) & 0x0300F00F
+    v = (v | (v << 4)) & 0x030C30C3
+    v = (v | (v << 2)) & 0x09249249
+    return v
+
+
+def morton_order(means: np.ndarray) -> np.ndarray:
+    """Permutation sorting points along a 30-bit Morton (Z-order) curve."""
+    lo, hi = means.min(axis=0), means.max(axis=0)
+    q = ((means - lo) / np.maximum(hi - lo, 1e-12) * 1023).astype(np.uint32)
+    code = _spread_bits(q[:, 0]) | (_spread_bits(q[:, 1]) << 1) | (_spread_bits(q[:, 2]) << 2)
+    return np.argsort(code, kind="stable")
+
+
+def _chunk_bounds(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    starts = np.arange(0, len(values), CHUNK_SIZE)
+    return np.minimum.reduceat(values, starts, axis=0), np.maximum.reduceat(values, starts, axis=0)
+
+
+def _quantize(values: np.ndarray, lo: np.ndarray, hi: np.ndarray, bits) -> np.ndarray:
+    """Quantize ``values`` (N, k) to ``bits`` (per column) against per-chunk bounds (C, k)."""
+    lo = np.repeat(lo, CHUNK_SIZE, axis=0)[: len(values)]
+    extent = np.repeat(hi, CHUNK_SIZE, axis=0)[: len(values)] - lo
+    t = np.divide(values - lo, extent, out=np.zeros_like(values), where=extent > 0)
+    levels = (1 << np.asarray(bits, dtype=np.uint32)) - 1
+    return np.rint(np.clip(t, 0, 1) * levels).astype(np.uint32)
+
+
+def _pack_11_10_11(q: np.ndarray) -> np.ndarray:
+    return (q[:, 0] << 21) | (q[:, 1] << 11) | q[:, 2]
+
+
+def _unpack_11_10_11(p: np.ndarray) -> np.ndarray:
+    return np.stack(
+        [(p >> 21) / 2047.0, ((p >> 11) & 1023) / 1023.0, (p & 2047) / 2047.0], axis=1
+    ).astype(np.float32)
+
+
+def pack_rotations(rotations: np.ndarray) -> np.ndarray:
+    """Smallest-three packing of (N, 4) quaternions (``rot_0..rot_3`` order) into uint32."""
+    q = rotations / np.maximum(np.linalg.norm(rotations, axis=1, keepdims=True), 1e-12)
+    largest = np.abs(q).argmax(axis=1)
+    # q and -q are the same rotation: make the dropped component positive
+    sign = np.where(np.take_along_axis(q, largest[:, None], axis=1) < 0, -1.0, 1.0)
+    others = np.take_along_axis(q * sign, _OTHER_COMPONENTS[largest], axis=1)
+    # the three smaller components lie in [-1/sqrt(2), 1/sqrt(2)]
+    u = np.rint(np.clip(others / np.sqrt(2) + 0.5, 0, 1) * 1023).astype(np.uint32)
+    return (largest.astype(np.uint32) << 30) | (u[:, 0] << 20) | (u[:, 1] << 10) | u[:, 2]
+
+
+def unpack_rotations(packed: np.ndarray) -> np.ndarray:
+    largest = (packed >> 30).astype(np.intp)
+    others = np.stack([(packed >> 20) & 1023, (packed >> 10) & 1023, packed & 1023], axis=1)
+    others = (others / 1023.0 - 0.5) * np.sqrt(2)
+    q = np.empty((len(packed), 4), dtype=np.float32)
+    np.put_along_axis(q, _OTHER_COMPONENTS[largest], others, axis=1)
+    m = np.sqrt(np.maximum(1 - (others**2).sum(axis=1), 0))
+    np.put_along_axis(q, largest[:, None], m[:, None], axis=1)
+    return q
+
+
+def export_compressed_ply(
+    means: Union[Tensor, np.ndarray],  # "gaussian 3"
+    scales: Union[Tensor, np.ndarray],  # "gaussian 3"
+    rotations: Union[Tensor, np.ndarray],  # "gaussian 4"
+    harmonics: Union[Tensor, np.ndarray],  # "gaussian 3 d_sh"
+    opacities: Union[Tensor, np.ndarray],  # "gaussian", logits
+    path: Union[str, Path],
+    save_sh_dc_only: bool = True,
+    sort: bool = True,
+) -> None:
+    """
+    Write Gaussians as a quantized ``.compressed.ply``.
+
+    Inputs follow ``gsply_helpers.export_ply`` (linear scales, opacity logits). Without
+    ``save_sh_dc_only`` the SH bands up to degree 3 are kept, quantized to 8 bits.
+    ``sort`` orders Gaussians along a Morton curve so chunk bounds are tight; viewers
+    do not depend on the order.
+    """
+    means, scales, rotations = _numpy(means), _numpy(scales), _numpy(rotations)
+    harmonics, opacities = _numpy(harmonics), _numpy(opacities).reshape(-1)
+    if sort and len(means):
+        order = morton_order(means)
+        means, scales, rotations = means[order], scales[order], rotations[order]
+        harmonics, opacities = harmonics[order], opacities[order]
+
+    n = len(means)
+    log_scales = np.clip(np.log(np.maximum(scales, 1e-30)), -20, 20)
+    colors = 0.5 + SH_C0 * harmonics[..., 0]
+    if n:
+        pos_lo, pos_hi = _chunk_bounds(means)
+        scale_lo, scale_hi = _chunk_bounds(log_scales)
+        color_lo, color_hi = _chunk_bounds(colors)
+    else:
+        pos_lo = pos_hi = scale_lo = scale_hi = color_lo = color_hi = np.zeros((0, 3))
+    chunks = np.concatenate(
+        [pos_lo, pos_hi, scale_lo, scale_hi, color_lo, color_hi], axis=1
+    ).astype("<f4")
+
+    rgb = _quantize(colors, color_lo, color_hi, 8)
+    alpha = np.rint(np.clip(1 / (1 + np.exp(-opacities)), 0, 1) * 255).astype(np.uint32)
+    vertices = np.stack(
+        [
+            _pack_11_10_11(_quantize(means, pos_lo, pos_hi, BITS_11_10_11)),
+            pack_rotations(rotations),
+            _pack_11_10_11(_quantize(log_scales, scale_lo, scale_hi, BITS_11_10_11)),
+            (rgb[:, 0] << 24) | (rgb[:, 1] << 16) | (rgb[:, 2] << 8) | alpha,
+        ],
+        axis=1,
+    ).astype("<u4")
+
+    header = [
+        "ply",
+        "format binary_little_endian 1.0",
+        "comment Generated by Depth Anything 3",
+        f"element chunk {len(chunks)}",
+        *[f"property float {name}" for name in CHUNK_PROPERTIES],
+        f"element vertex {n}",
+        *[f"property uint {name}" for name in VERTEX_PROPERTIES],
+    ]
+    sh_rest = None
+    num_rest = min(harmonics.shape[-1] - 1, MAX_SH_REST)
+    if not save_sh_dc_only and num_rest > 0:
+        # channel-major like f_rest_* of the float PLY
+        sh_rest = harmonics[..., 1 : 1 + num_rest].reshape(n, -1)
+        sh_rest = np.clip(np.trunc((sh_rest / 8 + 0.5) * 256), 0, 255).astype(np.uint8)
+        header += [f"element sh {n}"]
+        header += [f"property uchar f_rest_{i}" for i in range(sh_rest.shape[1])]
+    header += ["end_header"]
+
+    path = Path(path)
+    path.parent.mkdir(exist_ok=True, parents=True)
+    with open(path, "wb") as f:
+        f.write(("\n".join(header) + "\n").encode("ascii"))
+        chunks.tofile(f)
+        vertices.tofile(f)
+        if sh_rest is not None:
+            sh_rest.tofile(f)
+
+
+def read_compressed_ply(path: Union[str, Path]) -> dict[str, np.ndarray]:
+    """
+    Read a ``.compressed.ply`` written by ``export_compressed_ply`` (or SuperSplat).
+
+    Returns:
+        Dict with "means" (N, 3), "scales" (N, 3, linear), "rotations" (N, 4),
+        "harmonics" (N, 3, d_sh) and "opacities" (N,, logits).
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    end = data.index(b"end_header\n") + len(b"end_header\n")
+    elements = []
+    for line in data[:end].decode("ascii").splitlines():
+        words = line.split()
+        if words[:1] == ["format"] and words[1] != "binary_little_endian":
+            raise ValueError(f"Unsupported PLY format: {words[1]}")
+        if words[:1] == ["element"]:
+            elements.append((words[1], int(words[2]), []))
+        elif words[:1] == ["property"]:
+            elements[-1][2].append((words[2], PLY_TYPES[words[1]]))
+
+    arrays, offset = {}, end
+    for name, count, properties in elements:
+        dtype = np.dtype(properties)
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        offset += dtype.itemsize * count
+
+    chunks, vertices = arrays["chunk"], arrays["vertex"]
+    n = len(vertices)
+    chunk_idx = np.arange(n) // CHUNK_SIZE
+
+    def bounds(prefix: str, axes: str) -> tuple[np.ndarray, np.ndarray]:
+        lo = np.stack([chunks[f"min_{prefix}{a}"] for a in axes], axis=1)[chunk_idx]
+        hi = np.stack([chunks[f"max_{prefix}{a}"] for a in axes], axis=1)[chunk_idx]
+        return lo, hi - lo
+
+    lo, extent = bounds("", "xyz")
+    means = lo + _unpack_11_10_11(vertices["packed_position"]) * extent
+    lo, extent = bounds("scale_", "xyz")
+    scales = np.exp(lo + _unpack_11_10_11(vertices["packed_scale"]) * extent)
+
+    color = vertices["packed_color"]
+    rgb = np.stack([(color >> 24) & 255, (color >> 16) & 255, (color >> 8) & 255], axis=1)
+    lo, extent = bounds("", "rgb")
+    f_dc = (lo + rgb / 255.0 * extent - 0.5) / SH_C0
+    alpha = np.clip((color & 255) / 255.0, 1e-6, 1 - 1e-6)
+
+    harmonics = f_dc[..., None]
+    if "sh" in arrays:
+        sh = arrays["sh"]
+        sh = np.stack([sh[name] for name in sh.dtype.names], axis=1).astype(np.float32)
+        sh = ((sh + 0.5) / 256 - 0.5) * 8
+        harmonics = np.concatenate([harmonics, sh.reshape(n, 3, -1)], axis=2)
+
+    return {
+        "means": means.astype(np.float32),
+        "scales": scales.astype(np.float32),
+        "rotations": unpack_rotations(vertices["packed_rotation"]),
+        "harmonics": harmonics.astype(np.float32),
+        "opacities": np.log(alpha / (1 - alpha)).astype(np.float32),
+    }
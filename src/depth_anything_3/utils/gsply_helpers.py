@@ -20,6 +20,8 @@ from plyfile import PlyData, PlyElement
 from torch import Tensor
 
 from depth_anything_3.specs import Gaussians
+from depth_anything_3.utils.gs_reduction import pixels_per_unit, reduce_gaussians
+from depth_anything_3.utils.gsply_compressed import export_compressed_ply
 
 
 def construct_list_of_attributes(num_rest: int) -> list[str]:
@@ -36,6 +38,15 @@ def construct_list_of_attributes(num_rest: int) -> list[str]:
     return attributes
 
 
+def shift_and_scale_scene(means: Tensor, scales: Tensor) -> tuple[Tensor, Tensor]:
+    # Shift the scene so that the median Gaussian is at the origin.
+    means = means - means.median(dim=0).values
+
+    # Rescale the scene so that most Gaussians are within range [-1, 1].
+    scale_factor = means.abs().quantile(0.95, dim=0).max()
+    return means / scale_factor, scales / scale_factor
+
+
 def export_ply(
     means: Tensor,  # "gaussian 3"
     scales: Tensor,  # "gaussian 3"
@@ -48,13 +59,7 @@ def export_ply(
     match_3dgs_mcmc_dev: Optional[bool] = False,
 ):
     if shift_and_scale:
-        # Shift the scene so that the median Gaussian is at the origin.
-        means = means - means.median(dim=0).values
-
-        # Rescale the scene so that most Gaussians are within range [-1, 1].
-        scale_factor = means.abs().quantile(0.95, dim=0).max()
-        means = means / scale_factor
-        scales = scales / scale_factor
+        means, scales = shift_and_scale_scene(means, scales)
 
     rotations = rotations.detach().cpu().numpy()
 
@@ -81,7 +86,6 @@ def export_ply(
                 0 if save_sh_dc_only else f_rest.shape[1]
             )
         ]
-    elements = np.empty(means.shape[0], dtype=dtype_full)
     attributes = [
         means.detach().cpu().numpy(),
         torch.zeros_like(means).detach().cpu().numpy(),
@@ -96,8 +100,9 @@ def export_ply(
     elif save_sh_dc_only:
         attributes.pop(3)  # remove f_rest from attributes
 
-    attributes = np.concatenate(attributes, axis=1)
-    elements[:] = list(map(tuple, attributes))
+    attributes = np.concatenate(attributes, axis=1).astype(np.float32)
+    # all attributes are f4, so each row reinterprets as one structured element
+    elements = np.ascontiguousarray(attributes).view(np.dtype(dtype_full)).reshape(-1)
     path.parent.mkdir(exist_ok=True, parents=True)
     PlyData([PlyElement.describe(elements, "vertex")]).write(path)
 
@@ -117,7 +122,21 @@ def save_gaussian_ply(
     prune_by_depth_percent: Optional[float] = 1.0,
     prune_border_gs: Optional[bool] = True,
     match_3dgs_mcmc_dev: Optional[bool] = False,
+    compressed: bool = False,
+    reduction: Optional[dict] = None,
+    ctx_intrinsics: Optional[torch.Tensor] = None,  # unnormed, for screen-size pruning, "v 3 3"
 ):
+    """
+    Export the Gaussians of the (pruned) input views as a PLY.
+
+    ``reduction`` holds keyword arguments of ``gs_reduction.reduce_gaussians``; when set,
+    the selected Gaussians are pruned and merged before writing.
+
+    With ``compressed=True`` the quantized ``.compressed.ply`` layout of
+    ``gsply_compressed.export_compressed_ply`` is written instead of float32 attributes
+    (``match_3dgs_mcmc_dev`` does not apply; opacities should be logits, i.e. keep
+    ``inv_opacity=True``).
+    """
     b = gaussians.means.shape[0]
     assert b == 1, "must set batch_size=1 when exporting 3D gaussians"
     src_v, out_h, out_w, _ = ctx_depth.shape
@@ -127,7 +146,6 @@ def save_gaussian_ply(
     world_shs = gaussians.harmonics
     world_rotations = gaussians.rotations
     gs_scales = gaussians.scales
-    gs_opacities = inverse_sigmoid(gaussians.opacities) if inv_opacity else gaussians.opacities
 
     # Create a mask to filter the Gaussians.
 
@@ -160,12 +178,51 @@ def save_gaussian_ply(
         selected_element = selected_element[::gs_views_interval][mask[::gs_views_interval]]
         return selected_element
 
+    means, scales = trim_select_reshape(world_means), trim_select_reshape(gs_scales)
+    rotations, harmonics = trim_select_reshape(world_rotations), trim_select_reshape(world_shs)
+    opacities = trim_select_reshape(gaussians.opacities)
+    if reduction is not None:
+        px_per_unit = None
+        if ctx_intrinsics is not None:
+            px_per_unit = pixels_per_unit(ctx_depth[..., 0], ctx_intrinsics)
+            px_per_unit = trim_select_reshape(px_per_unit[None])
+        reduced = reduce_gaussians(
+            Gaussians(
+                means=means[None],
+                scales=scales[None],
+                rotations=rotations[None],
+                harmonics=harmonics[None],
+                opacities=opacities[None],
+            ),
+            px_per_unit=px_per_unit,
+            **reduction,
+        )
+        means, scales = reduced.means[0], reduced.scales[0]
+        rotations, harmonics = reduced.rotations[0], reduced.harmonics[0]
+        opacities = reduced.opacities[0]
+    if inv_opacity:
+        opacities = inverse_sigmoid(opacities)
+
+    if compressed:
+        if shift_and_scale:
+            means, scales = shift_and_scale_scene(means, scales)
+        export_compressed_ply(
+            means=means,
+            scales=scales,
+            rotations=rotations,
+            harmonics=harmonics,
+            opacities=opacities,
+            path=Path(save_path),
+            save_sh_dc_only=save_sh_dc_only,
+        )
+        return
+
     export_ply(
-        means=trim_select_reshape(world_means),
-        scales=trim_select_reshape(gs_scales),
-        rotations=trim_select_reshape(world_rotations),
-        harmonics=trim_select_reshape(world_shs),
-        opacities=trim_select_reshape(gs_opacities),
+        means=means,
+        scales=scales,
+        rotations=rotations,
+        harmonics=harmonics,
+        opacities=opacities,
         path=Path(save_path),
         shift_and_scale=shift_and_scale,
         save_sh_dc_only=save_sh_dc_only,
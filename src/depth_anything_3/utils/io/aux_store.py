@@ -0,0 +1,173 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+On-disk sink for ``export_feat_layers`` features.
+
+``AuxFeatureSink`` receives each requested layer's ``(B, S, h, w, C)`` feature tensor as
+the forward produces it, reduces it on the device (optional spatial average pooling,
+optional PCA to ``pca_dim`` channels, fp16 / int8 compression), copies the result to host
+and writes it to ``<name>.npy`` on a background thread. The model output then holds an
+``AuxFeatureHandle`` per layer instead of the array; frames are memory-mapped from disk
+on access. Layout:
+
+    store/
+      index.json
+      feat_layer_11.npy          frames h w C  (float32 | float16 | int8)
+      feat_layer_11.scale.npy    C, int8 only
+      feat_layer_11.pca.npz      mean, components, pca only
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from depth_anything_3.specs import AuxFeatureHandle
+
+FORMAT_NAME = "da3aux"
+FORMAT_VERSION = 1
+INDEX_NAME = "index.json"
+COMPRESSION_MODES = (None, "fp16", "int8")
+
+
+class AuxFeatureSink:
+    """
+    Stream auxiliary features to a directory of memory-mappable ``.npy`` files.
+
+    Args:
+        path: Output directory (created if needed).
+        compression: None (float32), "fp16" or "int8" (symmetric per-channel scales).
+        pool: Spatial average-pooling factor applied before storing (1 keeps all tokens).
+        pca_dim: Project features onto their top ``pca_dim`` principal components, fitted
+            per layer on up to ``pca_samples`` tokens. None keeps all channels.
+        pca_samples: Tokens sampled for the PCA fit.
+        num_workers: Writer threads.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        compression: str | None = "fp16",
+        pool: int = 1,
+        pca_dim: int | None = None,
+        pca_samples: int = 65536,
+        num_workers: int = 1,
+    ):
+        if compression not in COMPRESSION_MODES:
+            raise ValueError(f"Unsupported aux compression: {compression}")
+        self.path = path
+        self.compression = compression
+        self.pool = max(1, int(pool))
+        self.pca_dim = pca_dim
+        self.pca_samples = pca_samples
+        self._executor = ThreadPoolExecutor(max_workers=num_workers)
+        self._futures = []
+        self._index = {}
+        os.makedirs(path, exist_ok=True)
+
+    def __enter__(self) -> AuxFeatureSink:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _reduce(self, name: str, feat: torch.Tensor) -> tuple[torch.Tensor, dict]:
+        """Pool and project ``feat`` (frames, h, w, C) on its device."""
+        entry = {}
+        feat = feat.float()
+        if self.pool > 1:
+            feat = F.avg_pool2d(feat.permute(0, 3, 1, 2), self.pool, ceil_mode=True)
+            feat = feat.permute(0, 2, 3, 1)
+            entry["pool"] = self.pool
+        if self.pca_dim is not None and self.pca_dim < feat.shape[-1]:
+            X = feat.reshape(-1, feat.shape[-1])
+            gen = torch.Generator().manual_seed(0)
+            sample = X[torch.randperm(len(X), generator=gen)[: self.pca_samples].to(X.device)]
+            mean = sample.mean(0)
+            q = min(self.pca_dim + 8, *sample.shape)
+            _, _, V = torch.pca_lowrank(sample - mean, q=q, center=False)
+            components = V[:, : self.pca_dim]  # C pca_dim
+            feat = ((X - mean) @ components).reshape(*feat.shape[:-1], self.pca_dim)
+            entry["pca"] = f"{name}.pca.npz"
+            np.savez(
+                os.path.join(self.path, entry["pca"]),
+                mean=mean.cpu().numpy(),
+                components=components.cpu().numpy(),
+            )
+        return feat, entry
+
+    @torch.no_grad()
+    def write(self, name: str, feat: torch.Tensor) -> AuxFeatureHandle:
+        """
+        Store one layer's features and return its handle; the file write runs in the
+        background. Leading batch / view dims are flattened into the frame axis.
+        """
+        if name in self._index:
+            raise ValueError(f"Aux feature '{name}' was already written to {self.path}")
+        feat = feat.detach().reshape(-1, *feat.shape[-3:])
+        feat, entry = self._reduce(name, feat)
+
+        scale = None
+        if self.compression == "int8":
+            scale = feat.abs().amax(dim=(0, 1, 2)) / 127.0
+            scale[scale == 0] = 1.0
+            feat = (feat / scale).round().clamp(-127, 127).to(torch.int8)
+            scale = scale.cpu().numpy()
+            entry["scale"] = f"{name}.scale.npy"
+            np.save(os.path.join(self.path, entry["scale"]), scale)
+        elif self.compression == "fp16":
+            feat = feat.half()
+        data = feat.cpu().numpy()
+
+        entry.update(file=f"{name}.npy", shape=list(data.shape), compression=self.compression)
+        self._index[name] = entry
+        file_path = os.path.join(self.path, entry["file"])
+        future = self._executor.submit(np.save, file_path, data)
+        self._futures.append(future)
+        return AuxFeatureHandle(file_path, data.shape, self.compression, scale, future)
+
+    def flush(self) -> str:
+        """Wait for pending writes and write ``index.json``; returns its path."""
+        for future in self._futures:
+            future.result()
+        self._futures = []
+        index = {"format": FORMAT_NAME, "version": FORMAT_VERSION, "arrays": self._index}
+        index_path = os.path.join(self.path, INDEX_NAME)
+        with open(index_path, "w") as f:
+            json.dump(index, f, indent=2)
+        return index_path
+
+    def close(self) -> None:
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+
+def open_aux_store(path: str) -> dict[str, AuxFeatureHandle]:
+    """Open the handles of a directory written by ``AuxFeatureSink``."""
+    with open(os.path.join(path, INDEX_NAME)) as f:
+        index = json.load(f)
+    if index.get("format") != FORMAT_NAME:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} directory")
+    handles = {}
+    for name, entry in index["arrays"].items():
+        scale = np.load(os.path.join(path, entry["scale"])) if "scale" in entry else None
+        handles[name] = AuxFeatureHandle(
+            os.path.join(path, entry["file"]), entry["shape"], entry["compression"], scale
+        )
+    return handles
@@ -0,0 +1,338 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Chunked, memory-mappable prediction store ("da3store").
+
+A store is a directory holding one sub-directory per array, each split along the frame
+axis into chunks of ``chunk_size`` frames, plus an ``index.json`` describing dtypes,
+shapes and chunk files:
+
+    store/
+      index.json
+      depth/00000.npy  depth/00001.npy ...
+      conf/00000.npy ...
+
+With ``compression="none"`` chunks are plain ``.npy`` files opened with ``np.memmap``, so
+reading one frame touches only that frame's bytes. ``"zstd"`` and ``"lz4"`` store raw
+C-order chunk bytes compressed with the (optional) ``zstandard`` / ``lz4`` packages.
+Chunks are written in parallel and ``index.json`` is written last.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any
+import numpy as np
+
+from depth_anything_3.utils.parallel_utils import parallel_execution
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+FORMAT_NAME = "da3store"
+FORMAT_VERSION = 1
+INDEX_NAME = "index.json"
+COMPRESSION_SUFFIX = {"none": ".npy", "zstd": ".zst", "lz4": ".lz4"}
+
+
+def _check_compression(compression: str) -> None:
+    if compression not in COMPRESSION_SUFFIX:
+        raise ValueError(f"Unsupported da3store compression: {compression}")
+    if compression == "zstd" and zstandard is None:
+        raise ImportError("da3store compression 'zstd' requires: pip install zstandard")
+    if compression == "lz4" and lz4_frame is None:
+        raise ImportError("da3store compression 'lz4' requires: pip install lz4")
+
+
+def _write_chunk(path: str, chunk: np.ndarray, compression: str, level: int) -> int:
+    chunk = np.ascontiguousarray(chunk)
+    if compression == "none":
+        np.save(path, chunk)
+        return chunk.nbytes
+    if compression == "zstd":
+        payload = zstandard.ZstdCompressor(level=level).compress(chunk.tobytes())
+    else:
+        payload = lz4_frame.compress(chunk.tobytes(), compression_level=level)
+    with open(path, "wb") as f:
+        f.write(payload)
+    return chunk.nbytes
+
+
+def write_da3store(
+    path: str,
+    arrays: dict[str, np.ndarray],
+    meta: dict[str, Any] | None = None,
+    chunk_size: int = 16,
+    compression: str = "none",
+    level: int = 1,
+    num_workers: int = 8,
+) -> str:
+    """
+    Write frame-indexed arrays to a da3store directory.
+
+    Args:
+        path: Output directory (created if needed).
+        arrays: Arrays sharing the same leading frame dimension N.
+        meta: JSON-serializable scene-level metadata stored in the index.
+        chunk_size: Frames per chunk file.
+        compression: "none" (memory-mappable), "zstd" or "lz4".
+        level: Compression level for zstd / lz4.
+        num_workers: Number of writer threads.
+
+    Returns:
+        Path to the written ``index.json``.
+    """
+    _check_compression(compression)
+    lengths = {len(v) for v in arrays.values()}
+    if len(lengths) != 1:
+        raise ValueError(f"All da3store arrays must share the frame dimension, got {lengths}")
+    num_frames = lengths.pop()
+    chunk_size = max(1, int(chunk_size))
+    suffix = COMPRESSION_SUFFIX[compression]
+
+    index = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "num_frames": num_frames,
+        "chunk_size": chunk_size,
+        "compression": compression,
+        "meta": meta or {},
+        "arrays": {},
+    }
+    paths, chunks = [], []
+    for name, array in arrays.items():
+        os.makedirs(os.path.join(path, name), exist_ok=True)
+        files = []
+        for c, s in enumerate(range(0, num_frames, chunk_size)):
+            rel = f"{name}/{c:05d}{suffix}"
+            files.append(rel)
+            paths.append(os.path.join(path, rel))
+            chunks.append(array[s : s + chunk_size])
+        index["arrays"][name] = {
+            "dtype": np.dtype(array.dtype).str,
+            "shape": list(array.shape),
+            "chunks": files,
+        }
+
+    if chunks:
+        parallel_execution(
+            paths,
+            chunks,
+            compression,
+            level,
+            action=_write_chunk,
+            num_processes=num_workers,
+            sequential=num_workers <= 1,
+        )
+
+    index_path = os.path.join(path, INDEX_NAME)
+    with open(index_path, "w") as f:
+        json.dump(index, f, indent=2)
+    return index_path
+
+
+class Da3Store:
+    """
+    Reader for a da3store directory.
+
+    Single frames are read without loading the rest of the store: uncompressed chunks are
+    memory-mapped, compressed chunks are decompressed on demand and the most recently used
+    chunk of each array is kept.
+
+    Usage:
+        store = Da3Store("output/exports/da3store")
+        depth_7 = store.frame("depth", 7)
+        depth_all = store.read("depth")
+        prediction = store.to_prediction()
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, INDEX_NAME)) as f:
+            self.index = json.load(f)
+        if self.index.get("format") != FORMAT_NAME:
+            raise ValueError(f"{path} is not a {FORMAT_NAME} directory")
+        self.num_frames = self.index["num_frames"]
+        self.chunk_size = self.index["chunk_size"]
+        self.compression = self.index["compression"]
+        self.meta = self.index["meta"]
+        self._cache: dict[str, tuple[int, np.ndarray]] = {}
+        _check_compression(self.compression)
+
+    def __len__(self) -> int:
+        return self.num_frames
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index["arrays"]
+
+    def keys(self) -> list[str]:
+        return list(self.index["arrays"].keys())
+
+    def _chunk(self, name: str, c: int) -> np.ndarray:
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] == c:
+            return cached[1]
+        info = self.index["arrays"][name]
+        file = os.path.join(self.path, info["chunks"][c])
+        if self.compression == "none":
+            chunk = np.load(file, mmap_mode="r")
+        else:
+            with open(file, "rb") as f:
+                payload = f.read()
+            if self.compression == "zstd":
+                raw = zstandard.ZstdDecompressor().decompress(payload)
+            else:
+                raw = lz4_frame.decompress(payload)
+            s = c * self.chunk_size
+            n = min(self.chunk_size, self.num_frames - s)
+            chunk = np.frombuffer(raw, dtype=np.dtype(info["dtype"]))
+            chunk = chunk.reshape([n] + info["shape"][1:])
+        self._cache[name] = (c, chunk)
+        return chunk
+
+    def frame(self, name: str, idx: int) -> np.ndarray:
+        """Read one frame of ``name`` (read-only view for uncompressed stores)."""
+        if idx < 0:
+            idx += self.num_frames
+        if not 0 <= idx < self.num_frames:
+            raise IndexError(f"frame {idx} out of range for {self.num_frames} frames")
+        c, offset = divmod(idx, self.chunk_size)
+        return self._chunk(name, c)[offset]
+
+    def read(self, name: str, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Read frames ``[start, stop)`` of ``name`` into one array."""
+        stop = self.num_frames if stop is None else min(stop, self.num_frames)
+        info = self.index["arrays"][name]
+        out = np.empty([max(stop - start, 0)] + info["shape"][1:], dtype=info["dtype"])
+        pos = start
+        while pos < stop:
+            c, offset = divmod(pos, self.chunk_size)
+            chunk = self._chunk(name, c)
+            n = min(len(chunk) - offset, stop - pos)
+            out[pos - start : pos - start + n] = chunk[offset : offset + n]
+            pos += n
+        return out
+
+    def to_prediction(self):
+        """Load the whole store back into a ``Prediction``."""
+        from addict import Dict as AddictDict
+
+        from depth_anything_3.specs import Prediction
+
+        arrays = {name: self.read(name) for name in self.keys()}
+        aux = AddictDict()
+        for name in list(arrays.keys()):
+            if name.startswith("aux/"):
+                aux[name[len("aux/") :]] = arrays.pop(name)
+        return Prediction(
+            depth=arrays.get("depth"),
+            is_metric=self.meta.get("is_metric", 0),
+            sky=arrays.get("sky"),
+            conf=arrays.get("conf"),
+            extrinsics=arrays.get("extrinsics"),
+            intrinsics=arrays.get("intrinsics"),
+            processed_images=arrays.get("image"),
+            aux=aux,
+            scale_factor=self.meta.get("scale_factor"),
+            valid_mask=arrays.get("valid_mask"),
+        )
+
+
+# ===========================
+# Throughput benchmark vs. np.savez_compressed
+# ===========================
+if __name__ == "__main__":
+    import argparse
+    import shutil
+    import tempfile
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark da3store against npz exports.")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--height", type=int, default=378)
+    parser.add_argument("--width", type=int, default=504)
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    N, H, W = args.frames, args.height, args.width
+    arrays = {
+        "image": rng.integers(0, 255, (N, H, W, 3), dtype=np.uint8),
+        "depth": (rng.random((N, H, W), dtype=np.float32) * 10 + 0.1),
+        "conf": (rng.random((N, H, W), dtype=np.float32) * 5 + 1),
+        "extrinsics": np.tile(np.eye(4, dtype=np.float32)[:3], (N, 1, 1)),
+        "intrinsics": np.tile(np.eye(3, dtype=np.float32), (N, 1, 1)),
+    }
+    total_mb = sum(a.nbytes for a in arrays.values()) / 1024**2
+    tmp = tempfile.mkdtemp()
+    print(f"{N} frames at {H}x{W}: {total_mb:.1f} MB of arrays")
+
+    def report(tag, seconds, throughput=True):
+        line = f"  {tag:<34} {seconds * 1e3:9.1f} ms"
+        if throughput:
+            line += f"  {total_mb / max(seconds, 1e-9):9.1f} MB/s"
+        print(line)
+
+    try:
+        npz_path = os.path.join(tmp, "results.npz")
+        t0 = time.time()
+        np.savez_compressed(
+            npz_path,
+            **{
+                **arrays,
+                "depth": np.round(arrays["depth"], 6),
+                "conf": np.round(arrays["conf"], 2),
+            },
+        )
+        report("npz write", time.time() - t0)
+        t0 = time.time()
+        with np.load(npz_path) as loaded:
+            _ = loaded["depth"][N // 2]
+        report("npz single-frame read", time.time() - t0, throughput=False)
+
+        for compression in ("none", "zstd", "lz4"):
+            try:
+                _check_compression(compression)
+            except ImportError as e:
+                print(f"  skip {compression}: {e}")
+                continue
+            store_path = os.path.join(tmp, f"store_{compression}")
+            t0 = time.time()
+            write_da3store(
+                store_path,
+                arrays,
+                chunk_size=args.chunk_size,
+                compression=compression,
+                num_workers=args.workers,
+            )
+            report(f"da3store[{compression}] write", time.time() - t0)
+            t0 = time.time()
+            _ = np.array(Da3Store(store_path).frame("depth", N // 2))
+            report(f"da3store[{compression}] single-frame read", time.time() - t0, False)
+            t0 = time.time()
+            store = Da3Store(store_path)
+            _ = [store.read(k) for k in store.keys()]
+            report(f"da3store[{compression}] full read", time.time() - t0)
+    finally:
+        shutil.rmtree(tmp)
@@ -46,7 +46,9 @@ class InputProcessor:
            (may up/downscale a few px)
          - "*crop"   methods: each dimension is floored to nearest multiple via center crop
       4) Convert to tensor and apply ImageNet normalization
-      5) Stack into (1, N, 3, H, W)
+      5) Unify mixed sizes ("crop": center-crop to the smallest H, W;
+         "pad": center-pad to the largest H, W and report a valid-region mask)
+      6) Stack into (1, N, 3, H, W)
 
     Parallelization:
       - Each image is processed independently in a worker.
@@ -74,10 +76,19 @@ class InputProcessor:
         print_progress: bool = False,
         sequential: bool | None = None,
         desc: str | None = "Preprocess",
+        batch_shape_mode: str = "crop",
+        return_valid_mask: bool = False,
     ) -> tuple[torch.Tensor, torch.Tensor | None, torch.Tensor | None]:
         """
+        Args:
+            batch_shape_mode: How to unify views of different sizes. "crop" center-crops
+                every view to the smallest H, W; "pad" center-pads every view to the largest
+                H, W so no pixels are discarded.
+            return_valid_mask: Also return a (N, H, W) bool mask of the non-padded pixels
+                (None when no padding was applied).
+
         Returns:
-            (tensor, extrinsics_list, intrinsics_list)
+            (tensor, extrinsics_list, intrinsics_list[, valid_mask])
             tensor shape: (1, N, 3, H, W)
         """
         sequential = self._resolve_sequential(sequential, num_workers)
@@ -96,7 +107,17 @@ class InputProcessor:
         )
 
         proc_imgs, out_sizes, out_ixts, out_exts = self._unpack_results(results)
-        proc_imgs, out_sizes, out_ixts = self._unify_batch_shapes(proc_imgs, out_sizes, out_ixts)
+        if batch_shape_mode == "crop":
+            proc_imgs, out_sizes, out_ixts = self._unify_batch_shapes(
+                proc_imgs, out_sizes, out_ixts
+            )
+            valid_mask = None
+        elif batch_shape_mode == "pad":
+            proc_imgs, out_sizes, out_ixts, valid_mask = self._pad_batch_shapes(
+                proc_imgs, out_sizes, out_ixts
+            )
+        else:
+            raise ValueError(f"Unsupported batch_shape_mode: {batch_shape_mode}")
 
         batch_tensor = self._stack_batch(proc_imgs)
         out_exts = (
@@ -109,6 +130,8 @@ class InputProcessor:
             if out_ixts is not None and out_ixts[0] is not None
             else None
         )
+        if return_valid_mask:
+            return (batch_tensor, out_exts, out_ixts, valid_mask)
         return (batch_tensor, out_exts, out_ixts)
 
     # -----------------------------
@@ -210,6 +233,51 @@ class InputProcessor:
                 new_ixts.append(K_adj)
         return new_imgs, new_sizes, new_ixts
 
+    def _pad_batch_shapes(
+        self,
+        processed_images: list[torch.Tensor],
+        out_sizes: list[tuple[int, int]],
+        out_intrinsics: list[np.ndarray | None],
+    ) -> tuple[
+        list[torch.Tensor], list[tuple[int, int]], list[np.ndarray | None], torch.Tensor | None
+    ]:
+        """
+        Center-pad all tensors to the largest H, W; shift intrinsics' cx, cy accordingly.
+
+        Padding offsets are kept multiples of PATCH_SIZE so every patch is either fully valid
+        or fully padded, which lets the backbone mask padded patches out of attention.
+        Padded pixels are zero in normalized space (i.e. the ImageNet mean color).
+        """
+        if len(set(out_sizes)) <= 1:
+            return processed_images, out_sizes, out_intrinsics, None
+
+        max_h = max(h for h, _ in out_sizes)
+        max_w = max(w for _, w in out_sizes)
+        logger.info(
+            f"Images in batch have different sizes {out_sizes}; "
+            f"center-padding all to largest ({max_h},{max_w})"
+        )
+
+        patch = self.PATCH_SIZE
+        new_imgs, new_sizes, new_ixts = [], [], []
+        valid_mask = torch.zeros((len(processed_images), max_h, max_w), dtype=torch.bool)
+        for i, (img_t, (H, W), K) in enumerate(zip(processed_images, out_sizes, out_intrinsics)):
+            pad_top = ((max_h - H) // 2 // patch) * patch
+            pad_left = ((max_w - W) // 2 // patch) * patch
+            canvas = img_t.new_zeros((img_t.shape[0], max_h, max_w))
+            canvas[:, pad_top : pad_top + H, pad_left : pad_left + W] = img_t
+            valid_mask[i, pad_top : pad_top + H, pad_left : pad_left + W] = True
+            new_imgs.append(canvas)
+            new_sizes.append((max_h, max_w))
+            if K is None:
+                new_ixts.append(None)
+            else:
+                K_adj = K.copy()
+                K_adj[0, 2] += pad_left
+                K_adj[1, 2] += pad_top
+                new_ixts.append(K_adj)
+        return new_imgs, new_sizes, new_ixts, valid_mask
+
     def _stack_batch(self, processed_images: list[torch.Tensor]) -> torch.Tensor:
         return torch.stack(processed_images)
 
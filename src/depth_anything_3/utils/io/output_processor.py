@@ -25,7 +25,7 @@ import numpy as np
 import torch
 from addict import Dict as AddictDict
 
-from depth_anything_3.specs import Prediction
+from depth_anything_3.specs import DeferredArray, DeferredDict, Prediction
 
 
 class OutputProcessor:
@@ -34,12 +34,16 @@ class OutputProcessor:
 
     Handles tensor-to-numpy conversion, batch dimension removal,
     and creates structured Prediction objects with proper data types.
+
+    With ``lazy=True`` no device-to-host copy happens here: every array field holds a
+    ``DeferredArray`` over the (batch-squeezed) device tensor, which is copied to host on
+    first access or when ``Prediction.prefetch()`` is called.
     """
 
     def __init__(self) -> None:
         """Initialize the output processor."""
 
-    def __call__(self, model_output: dict[str, torch.Tensor]) -> Prediction:
+    def __call__(self, model_output: dict[str, torch.Tensor], lazy: bool = False) -> Prediction:
         """
         Convert model output to Prediction object.
 
@@ -47,18 +51,19 @@ class OutputProcessor:
             model_output: Model output dictionary containing depth, conf, extrinsics, intrinsics
                          Expected shapes: depth (B, N, 1, H, W), conf (B, N, 1, H, W),
                          extrinsics (B, N, 4, 4), intrinsics (B, N, 3, 3)
+            lazy: Keep array fields on device and defer the host copy until first access
 
         Returns:
             Prediction: Object containing depth estimation results with shapes:
                        depth (N, H, W), conf (N, H, W), extrinsics (N, 4, 4), intrinsics (N, 3, 3)
         """
         # Extract data from batch dimension (B=1, N=number of images)
-        depth = self._extract_depth(model_output)
-        conf = self._extract_conf(model_output)
-        extrinsics = self._extract_extrinsics(model_output)
-        intrinsics = self._extract_intrinsics(model_output)
-        sky = self._extract_sky(model_output)
-        aux = self._extract_aux(model_output)
+        depth = self._extract_depth(model_output, lazy)
+        conf = self._extract_conf(model_output, lazy)
+        extrinsics = self._extract_extrinsics(model_output, lazy)
+        intrinsics = self._extract_intrinsics(model_output, lazy)
+        sky = self._extract_sky(model_output, lazy)
+        aux = self._extract_aux(model_output, lazy)
         gaussians = model_output.get("gaussians", None)
         scale_factor = model_output.get("scale_factor", None)
 
@@ -74,7 +79,18 @@ class OutputProcessor:
             scale_factor=scale_factor,
         )
 
-    def _extract_depth(self, model_output: dict[str, torch.Tensor]) -> np.ndarray:
+    def _to_host(
+        self, tensor: torch.Tensor, lazy: bool, transform=None
+    ) -> np.ndarray | DeferredArray:
+        """Convert a device tensor to numpy now, or wrap it for deferred conversion."""
+        if lazy:
+            return DeferredArray(tensor, transform)
+        array = tensor.cpu().numpy()
+        return transform(array) if transform is not None else array
+
+    def _extract_depth(
+        self, model_output: dict[str, torch.Tensor], lazy: bool = False
+    ) -> np.ndarray | DeferredArray:
         """
         Extract depth tensor from model output and convert to numpy.
 
@@ -84,10 +100,12 @@ class OutputProcessor:
         Returns:
             Depth array with shape (N, H, W)
         """
-        depth = model_output["depth"].squeeze(0).squeeze(-1).cpu().numpy()  # (N, H, W)
+        depth = self._to_host(model_output["depth"].squeeze(0).squeeze(-1), lazy)  # (N, H, W)
         return depth
 
-    def _extract_conf(self, model_output: dict[str, torch.Tensor]) -> np.ndarray | None:
+    def _extract_conf(
+        self, model_output: dict[str, torch.Tensor], lazy: bool = False
+    ) -> np.ndarray | DeferredArray | None:
         """
         Extract confidence tensor from model output and convert to numpy.
 
@@ -99,10 +117,12 @@ class OutputProcessor:
         """
         conf = model_output.get("depth_conf", None)
         if conf is not None:
-            conf = conf.squeeze(0).cpu().numpy()  # (N, H, W)
+            conf = self._to_host(conf.squeeze(0), lazy)  # (N, H, W)
         return conf
 
-    def _extract_extrinsics(self, model_output: dict[str, torch.Tensor]) -> np.ndarray | None:
+    def _extract_extrinsics(
+        self, model_output: dict[str, torch.Tensor], lazy: bool = False
+    ) -> np.ndarray | DeferredArray | None:
         """
         Extract extrinsics tensor from model output and convert to numpy.
 
@@ -114,10 +134,12 @@ class OutputProcessor:
         """
         extrinsics = model_output.get("extrinsics", None)
         if extrinsics is not None:
-            extrinsics = extrinsics.squeeze(0).cpu().numpy()  # (N, 4, 4)
+            extrinsics = self._to_host(extrinsics.squeeze(0), lazy)  # (N, 4, 4)
         return extrinsics
 
-    def _extract_intrinsics(self, model_output: dict[str, torch.Tensor]) -> np.ndarray | None:
+    def _extract_intrinsics(
+        self, model_output: dict[str, torch.Tensor], lazy: bool = False
+    ) -> np.ndarray | DeferredArray | None:
         """
         Extract intrinsics tensor from model output and convert to numpy.
 
@@ -129,10 +151,12 @@ class OutputProcessor:
         """
         intrinsics = model_output.get("intrinsics", None)
         if intrinsics is not None:
-            intrinsics = intrinsics.squeeze(0).cpu().numpy()  # (N, 3, 3)
+            intrinsics = self._to_host(intrinsics.squeeze(0), lazy)  # (N, 3, 3)
         return intrinsics
 
-    def _extract_sky(self, model_output: dict[str, torch.Tensor]) -> np.ndarray | None:
+    def _extract_sky(
+        self, model_output: dict[str, torch.Tensor], lazy: bool = False
+    ) -> np.ndarray | DeferredArray | None:
         """
         Extract sky tensor from model output and convert to numpy.
 
@@ -144,10 +168,12 @@ class OutputProcessor:
         """
         sky = model_output.get("sky", None)
         if sky is not None:
-            sky = sky.squeeze(0).cpu().numpy() >= 0.5  # (N, H, W)
+            sky = self._to_host(sky.squeeze(0), lazy, _threshold_sky)  # (N, H, W)
         return sky
 
-    def _extract_aux(self, model_output: dict[str, torch.Tensor]) -> AddictDict:
+    def _extract_aux(
+        self, model_output: dict[str, torch.Tensor], lazy: bool = False
+    ) -> AddictDict:
         """
         Extract auxiliary data from model output and convert to numpy.
 
@@ -158,15 +184,19 @@ class OutputProcessor:
             Dictionary containing auxiliary data
         """
         aux = model_output.get("aux", None)
-        ret = AddictDict()
+        ret = DeferredDict() if lazy else AddictDict()
         if aux is not None:
             for k in aux.keys():
                 if isinstance(aux[k], torch.Tensor):
-                    ret[k] = aux[k].squeeze(0).cpu().numpy()
+                    ret[k] = self._to_host(aux[k].squeeze(0), lazy)
                 else:
                     ret[k] = aux[k]
         return ret
 
 
+def _threshold_sky(sky: np.ndarray) -> np.ndarray:
+    return sky >= 0.5
+
+
 # Backward compatibility alias
 OutputAdapter = OutputProcessor
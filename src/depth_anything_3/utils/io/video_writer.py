@@ -0,0 +1,216 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Streaming video writer.
+
+Frames are piped as raw RGB into an ffmpeg subprocess while they are produced, so a
+video no longer needs per-frame JPEGs on disk and a second ffmpeg pass over them. The
+ffmpeg executable is taken from ``PATH`` or, if missing, from the (optional)
+``imageio-ffmpeg`` package.
+
+Usage:
+    with VideoWriter("out.mp4", fps=15) as writer:
+        for frame in frames:  # (H, W, 3) uint8
+            writer.write(frame)
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import Iterable
+import imageio
+import numpy as np
+
+try:
+    import imageio_ffmpeg
+except ImportError:
+    imageio_ffmpeg = None
+
+# crf / preset per quality level (libx264)
+VIDEO_QUALITY_MAP = {
+    "low": {"crf": "28", "preset": "veryfast"},
+    "medium": {"crf": "23", "preset": "medium"},
+    "high": {"crf": "18", "preset": "slow"},
+}
+
+
+def find_ffmpeg() -> str:
+    """Path of the ffmpeg executable used by ``VideoWriter``."""
+    exe = shutil.which("ffmpeg")
+    if exe is None and imageio_ffmpeg is not None:
+        exe = imageio_ffmpeg.get_ffmpeg_exe()
+    if exe is None:
+        raise RuntimeError(
+            "Video export requires ffmpeg: install it on PATH or pip install imageio-ffmpeg"
+        )
+    return exe
+
+
+class VideoWriter:
+    """
+    Encode RGB frames into a video through an ffmpeg pipe.
+
+    The encoder starts on the first frame (which fixes the frame size) and encodes
+    concurrently with the caller. Odd frame sizes are padded to even ones as required by
+    ``yuv420p``. Encoder failures are raised from ``write`` / ``close`` with ffmpeg's
+    error output instead of being silently ignored.
+
+    Args:
+        path: Output video path.
+        fps: Frame rate.
+        quality: Key of ``VIDEO_QUALITY_MAP`` ("low", "medium", "high").
+        codec: ffmpeg video codec.
+        frames_dir: If set, every frame is also written there as ``{idx:06d}.jpg``.
+        jpeg_quality: Quality of the optional per-frame JPEGs.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fps: float = 15,
+        quality: str = "high",
+        codec: str = "libx264",
+        frames_dir: str | None = None,
+        jpeg_quality: int = 95,
+    ):
+        if quality not in VIDEO_QUALITY_MAP:
+            raise ValueError(f"Unsupported video quality: {quality}")
+        self.path = path
+        self.fps = fps
+        self.quality = quality
+        self.codec = codec
+        self.frames_dir = frames_dir
+        self.jpeg_quality = jpeg_quality
+        self.num_frames = 0
+        self._shape = None
+        self._proc = None
+        self._stderr = None
+        if frames_dir is not None:
+            os.makedirs(frames_dir, exist_ok=True)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _start(self, height: int, width: int) -> None:
+        cmd = [
+            find_ffmpeg(),
+            "-loglevel",
+            "error",
+            "-hide_banner",
+            "-y",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgb24",
+            "-s",
+            f"{width}x{height}",
+            "-r",
+            str(self.fps),
+            "-i",
+            "-",
+            "-vf",
+            "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            "-c:v",
+            self.codec,
+            "-crf",
+            VIDEO_QUALITY_MAP[self.quality]["crf"],
+            "-preset",
+            VIDEO_QUALITY_MAP[self.quality]["preset"],
+            "-pix_fmt",
+            "yuv420p",
+            self.path,
+        ]
+        # stderr goes to a file so a chatty encoder can never block on a full pipe
+        self._stderr = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr
+        )
+
+    def _error_output(self) -> str:
+        if self._stderr is None:
+            return ""
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors="replace").strip()
+
+    def _close_stderr(self) -> None:
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+
+    def write(self, frame: np.ndarray) -> None:
+        """Append one (H, W, 3) uint8 frame."""
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if frame.ndim != 3 or frame.shape[2] != 3:
+            raise ValueError(f"Expected an (H, W, 3) frame, got {frame.shape}")
+        if self._proc is None:
+            self._shape = frame.shape
+            self._start(*frame.shape[:2])
+        elif frame.shape != self._shape:
+            raise ValueError(f"Frame shape {frame.shape} differs from first frame {self._shape}")
+
+        if self.frames_dir is not None:
+            save_path = os.path.join(self.frames_dir, f"{self.num_frames:06d}.jpg")
+            imageio.imwrite(save_path, frame, quality=self.jpeg_quality)
+        try:
+            self._proc.stdin.write(memoryview(frame).cast("B"))
+        except BrokenPipeError:
+            self._proc.wait()
+            raise RuntimeError(f"ffmpeg exited while writing {self.path}: {self._error_output()}")
+        self.num_frames += 1
+
+    def write_frames(self, frames: Iterable[np.ndarray]) -> None:
+        for frame in frames:
+            self.write(frame)
+
+    def close(self) -> None:
+        """Finish encoding; raises if ffmpeg failed."""
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        try:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            if proc.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed to encode {self.path}: {self._error_output()}")
+        finally:
+            self._close_stderr()
+
+    def abort(self) -> None:
+        """Stop the encoder without finalizing the video."""
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+            self._proc = None
+        self._close_stderr()
+
+    def __enter__(self) -> VideoWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_video(path: str, frames: Iterable[np.ndarray], fps: float = 15, **kwargs) -> int:
+    """Encode ``frames`` into ``path`` with ``VideoWriter``; returns the number of frames."""
+    with VideoWriter(path, fps=fps, **kwargs) as writer:
+        writer.write_frames(frames)
+    return writer.num_frames
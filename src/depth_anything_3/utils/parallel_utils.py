@@ -12,15 +12,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import annotations
+
 import asyncio
+import contextvars
 import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
 from functools import wraps
 from multiprocessing.pool import ThreadPool
-from threading import Thread
 from typing import Callable, Dict, List
 import imageio
 from tqdm import tqdm
 
+from depth_anything_3.utils.logger import logger
+
 
 def async_call_func(func):
     @wraps(func)
@@ -37,9 +46,231 @@ slice_func = lambda chunk_index, chunk_dim, chunk_size: [slice(None)] * chunk_di
 ]
 
 
+# Executor running the current export job; copied into helper threads by parallel_execution
+_CURRENT_EXPORT_JOB: contextvars.ContextVar = contextvars.ContextVar(
+    "da3_current_export_job", default=None
+)
+
+
+def _estimate_nbytes(*objs) -> int:
+    """
+    Rough host-memory footprint of export arguments (arrays / Prediction.nbytes, which counts
+    deferred fields and on-disk aux features at their materialized size).
+    """
+    total = 0
+    for obj in objs:
+        nbytes = getattr(obj, "nbytes", None)
+        if isinstance(nbytes, (int, float)):
+            total += int(nbytes)
+    return total
+
+
+class ExportExecutor:
+    """
+    Bounded background executor for export jobs.
+
+    Jobs run on a shared thread pool and return ``concurrent.futures.Future`` objects.
+    ``submit`` blocks the caller (backpressure) while ``max_in_flight`` jobs are pending or
+    while the pending jobs would exceed ``max_inflight_bytes``; a single job larger than
+    the byte budget is still admitted once nothing else is in flight.
+
+    Jobs submitted from inside a running job run inline and bypass the limits, since the
+    outer job already holds capacity. Nesting is tracked with a context variable, so it
+    covers helper threads only if they run in a copy of the job's context;
+    ``parallel_execution`` does this, other helper threads must use
+    ``contextvars.copy_context().run``.
+
+    Usage:
+        executor = get_export_executor()
+        future = executor.submit(export_to_npz, prediction, "output", tag="npz")
+        executor.wait()          # or executor.flush()
+        print(executor.stats())  # per-tag timings
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_in_flight: int = 4,
+        max_inflight_bytes: int | None = None,
+    ):
+        self.max_workers = max(1, int(max_workers))
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.max_inflight_bytes = max_inflight_bytes
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="da3-export"
+        )
+        self._cond = threading.Condition()
+        self._futures: set[Future] = set()
+        self._errors: list[BaseException] = []
+        self._in_flight = 0
+        self._in_flight_bytes = 0
+        self._timings: dict[str, list[float]] = defaultdict(list)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def in_flight_bytes(self) -> int:
+        return self._in_flight_bytes
+
+    def _has_capacity(self, nbytes: int) -> bool:
+        if self._in_flight >= self.max_in_flight:
+            return False
+        if self.max_inflight_bytes is None or self._in_flight == 0:
+            return True
+        return self._in_flight_bytes + nbytes <= self.max_inflight_bytes
+
+    def submit(
+        self, fn: Callable, *args, nbytes: int | None = None, tag: str | None = None, **kwargs
+    ) -> Future:
+        """
+        Schedule ``fn(*args, **kwargs)`` and return its future.
+
+        Args:
+            fn: Export callable.
+            nbytes: Host memory held by the job; estimated from the arguments if None.
+            tag: Timing bucket reported by ``stats`` (defaults to ``fn.__name__``).
+        """
+        tag = tag or getattr(fn, "__name__", "export")
+        if _CURRENT_EXPORT_JOB.get() is self:
+            future = Future()
+            try:
+                future.set_result(self._run(fn, args, kwargs, tag))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+
+        nbytes = _estimate_nbytes(*args, *kwargs.values()) if nbytes is None else int(nbytes)
+        with self._cond:
+            waited = time.time()
+            while not self._has_capacity(nbytes):
+                self._cond.wait()
+            waited = time.time() - waited
+            self._in_flight += 1
+            self._in_flight_bytes += nbytes
+        if waited > 1e-3:
+            self.record_timing("backpressure", waited)
+
+        future = self._pool.submit(self._run_in_worker, fn, args, kwargs, tag)
+        with self._cond:
+            self._futures.add(future)
+        future.add_done_callback(lambda f: self._release(f, nbytes, tag))
+        return future
+
+    def _run(self, fn: Callable, args, kwargs, tag: str):
+        start = time.time()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.record_timing(tag, time.time() - start)
+
+    def _run_in_worker(self, fn: Callable, args, kwargs, tag: str):
+        token = _CURRENT_EXPORT_JOB.set(self)
+        try:
+            return self._run(fn, args, kwargs, tag)
+        finally:
+            _CURRENT_EXPORT_JOB.reset(token)
+
+    def _release(self, future: Future, nbytes: int, tag: str) -> None:
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            logger.error(f"Export job '{tag}' failed: {error!r}")
+        with self._cond:
+            self._in_flight -= 1
+            self._in_flight_bytes -= nbytes
+            self._futures.discard(future)
+            if error is not None:
+                self._errors.append(error)
+            self._cond.notify_all()
+
+    def record_timing(self, tag: str, seconds: float) -> None:
+        with self._cond:
+            self._timings[tag].append(seconds)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Per-tag timing summary: count, total, mean and max seconds."""
+        with self._cond:
+            timings = {k: list(v) for k, v in self._timings.items()}
+        return {
+            tag: {
+                "count": len(ts),
+                "total_s": sum(ts),
+                "mean_s": sum(ts) / len(ts),
+                "max_s": max(ts),
+            }
+            for tag, ts in timings.items()
+            if ts
+        }
+
+    def reset_stats(self) -> None:
+        with self._cond:
+            self._timings.clear()
+
+    def wait(self, timeout: float | None = None, raise_errors: bool = True) -> bool:
+        """
+        Block until all pending exports finish.
+
+        Returns:
+            True if nothing is pending anymore, False if ``timeout`` expired first.
+
+        Raises:
+            The first error raised by a finished job (when ``raise_errors``).
+        """
+        with self._cond:
+            pending = list(self._futures)
+        _, not_done = wait_futures(pending, timeout=timeout)
+        if raise_errors:
+            with self._cond:
+                errors, self._errors = self._errors, []
+            if errors:
+                raise errors[0]
+        return not not_done
+
+    flush = wait
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+_EXPORT_EXECUTOR: ExportExecutor | None = None
+_EXPORT_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_export_executor() -> ExportExecutor:
+    """Return the process-wide export executor, creating it on first use."""
+    global _EXPORT_EXECUTOR
+    with _EXPORT_EXECUTOR_LOCK:
+        if _EXPORT_EXECUTOR is None:
+            _EXPORT_EXECUTOR = ExportExecutor(
+                max_workers=int(os.environ.get("DA3_EXPORT_WORKERS", 2)),
+                max_in_flight=int(os.environ.get("DA3_EXPORT_MAX_IN_FLIGHT", 4)),
+                max_inflight_bytes=(
+                    int(os.environ["DA3_EXPORT_MAX_BYTES"])
+                    if "DA3_EXPORT_MAX_BYTES" in os.environ
+                    else None
+                ),
+            )
+        return _EXPORT_EXECUTOR
+
+
+def set_export_executor(executor: ExportExecutor) -> ExportExecutor:
+    """Replace the process-wide export executor, draining the previous one first."""
+    global _EXPORT_EXECUTOR
+    with _EXPORT_EXECUTOR_LOCK:
+        previous, _EXPORT_EXECUTOR = _EXPORT_EXECUTOR, executor
+    if previous is not None and previous is not executor:
+        previous.wait(raise_errors=False)
+        previous.shutdown()
+    return executor
+
+
 def async_call(fn):
+    """Run ``fn`` on the shared export executor and return its future."""
+
+    @wraps(fn)
     def wrapper(*args, **kwargs):
-        Thread(target=fn, args=args, kwargs=kwargs).start()
+        return get_export_executor().submit(fn, *args, **kwargs)
 
     return wrapper
 
@@ -111,7 +342,9 @@ def parallel_execution(
         length = get_length(args, kwargs)
         for i in range(length):
             action_args, action_kwargs = get_action_args(length, args, kwargs, i)
-            async_result = pool.apply_async(action, action_args, action_kwargs)
+            # run in a copy of the caller's context so nested export jobs are detected
+            context = contextvars.copy_context()
+            async_result = pool.apply_async(context.run, [action, *action_args], action_kwargs)
             asyncs.append(async_result)
 
         # Join threads and get return values
@@ -18,6 +18,7 @@ PCA utilities for feature visualization and dimensionality reduction (video-frie
 - Support one-time global PCA fitting and reuse (mean, V3) for stable colors
 - Support Procrustes alignment (solving principal component order/sign/rotation jumps)
 - Support global fixed or temporal EMA for percentiles (time dimension only, no spatial)
+- Support streaming fitting (chunked moments + sampled percentiles) for long videos
 """
 
 import numpy as np
@@ -203,6 +204,67 @@ class PCARGBVisualizer:
             self.lo_ref = lo.clone()
             self.hi_ref = hi.clone()
 
+    def _iter_chunks(self, frames, chunk_size: int):
+        """Yield (N,D) float32 device tensors of ``chunk_size`` frames at a time."""
+        for start in range(0, len(frames), chunk_size):
+            chunk = frames[start : start + chunk_size]
+            if isinstance(chunk, np.ndarray):
+                X = torch.from_numpy(np.ascontiguousarray(chunk).reshape(-1, chunk.shape[-1]))
+            else:
+                X = torch.cat([torch.from_numpy(x.reshape(-1, x.shape[-1])) for x in chunk])
+            X = X.to(self.device, dtype=torch.float32)
+            yield torch.nan_to_num(X, nan=0.0, posinf=1e6, neginf=-1e6)
+
+    @torch.no_grad()
+    def fit_reference_streaming(
+        self, frames, chunk_size: int = 8, max_samples: int = 1 << 18, seed: int = 0
+    ):
+        """
+        Memory-bounded ``fit_reference`` for long videos / wide features.
+        frames: ndarray (T,H,W,D) or list of (H,W,D)
+        - Pass 1: accumulate first/second moments chunk by chunk -> mean, top-3 eigvecs
+        - Pass 2: project each chunk, keep a uniform sample of <= max_samples PCs for the
+          percentiles
+        Peak device memory is one chunk plus a (D,D) float64 covariance.
+        """
+        if isinstance(frames, np.ndarray) and frames.ndim != 4:
+            raise ValueError("fit_reference_streaming expects (T,H,W,D) ndarray.")
+
+        # moments around the first chunk's mean to limit cancellation
+        shift, n, s1, s2 = None, 0, None, None
+        for X in self._iter_chunks(frames, chunk_size):
+            if shift is None:
+                shift = X.mean(0, keepdim=True)
+                s1 = torch.zeros(X.shape[1], dtype=torch.float64, device=X.device)
+                s2 = torch.zeros(X.shape[1], X.shape[1], dtype=torch.float64, device=X.device)
+            Xs = X - shift
+            n += X.shape[0]
+            s1 += Xs.sum(0).double()
+            s2 += (Xs.T @ Xs).double()
+        m = s1 / n
+        cov = s2 / n - m[:, None] * m[None, :]
+        _, evecs = torch.linalg.eigh(cov)
+        V3 = evecs[:, -3:].flip(-1).to(torch.float32)  # (D,3), descending variance
+        mean = shift + m.to(torch.float32)[None]
+
+        # uniform sample of the projected PCs, proportional to each chunk's size; pass 1
+        # counted the tokens, so frame stores are not read an extra time just for that
+        gen = torch.Generator().manual_seed(seed)
+        keep_ratio = min(1.0, max_samples / n)
+        samples = []
+        for X in self._iter_chunks(frames, chunk_size):
+            k = max(1, round(X.shape[0] * keep_ratio))
+            idx = torch.randperm(X.shape[0], generator=gen)[:k].to(X.device)
+            samples.append((X[idx] - mean) @ V3)
+        PCs = torch.cat(samples)
+        low = self.clip_percent / 100.0
+        qs = torch.tensor([low, 1.0 - low], device=PCs.device, dtype=PCs.dtype)
+        qvals = torch.quantile(PCs, q=qs, dim=0)
+
+        self.mean_ref = mean
+        self.V3_ref = V3
+        self.lo_ref, self.hi_ref = qvals[0].clone(), qvals[1].clone()
+
     @torch.no_grad()
     def _project_with_stable_colors(self, X: torch.Tensor) -> torch.Tensor:
         """
@@ -266,19 +328,24 @@ class PCARGBVisualizer:
         return PCs.to(torch.float32).cpu().numpy()
 
     @torch.no_grad()
-    def transform_video(self, frames) -> np.ndarray:
+    def transform_video(self, frames, chunk_size: int = 8) -> np.ndarray:
         """
         frames: (T,H,W,D) or list of (H,W,D)
         returns: (T,H,W,3)
+        With basis_mode='fixed' and percentile_mode='global' every frame is independent,
+        so ``chunk_size`` frames are projected per device call; otherwise frame by frame.
         """
-        outs = []
-        if isinstance(frames, np.ndarray):
-            if frames.ndim != 4:
-                raise ValueError("transform_video expects (T,H,W,D).")
-            T, H, W, D = frames.shape
-            for t in range(T):
-                outs.append(self.transform_frame(frames[t]))
-        else:
-            for f in frames:
-                outs.append(self.transform_frame(f))
-        return np.stack(outs, axis=0)
+        if isinstance(frames, np.ndarray) and frames.ndim != 4:
+            raise ValueError("transform_video expects (T,H,W,D).")
+        if self.basis_mode != "fixed" or self.percentile_mode != "global":
+            return np.stack([self.transform_frame(f) for f in frames], axis=0)
+
+        T = len(frames)
+        H, W = frames[0].shape[:2]
+        out = np.empty((T, H, W, 3), dtype=np.uint8 if self.return_uint8 else np.float32)
+        for start, X in zip(range(0, T, chunk_size), self._iter_chunks(frames, chunk_size)):
+            PCs = self._normalize_rgb(self._project_with_stable_colors(X))
+            if self.return_uint8:
+                PCs = (PCs * 255.0).round().clamp(0, 255).to(torch.uint8)
+            out[start : start + chunk_size] = PCs.reshape(-1, H, W, 3).cpu().numpy()
+        return out
@@ -19,6 +19,11 @@ from evo.core.trajectory import PosePath3D
 
 from depth_anything_3.utils.geometry import affine_inverse, affine_inverse_np
 
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
 
 def batch_apply_alignment_to_enc(
     rots: torch.Tensor, trans: torch.Tensor, scales: torch.Tensor, enc_list: List[torch.Tensor]
@@ -98,60 +103,100 @@ def _apply_sim3_to_poses(poses, r, t, s):
     return out
 
 
+def umeyama_sim3_batch(src: np.ndarray, dst: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Batched Umeyama Sim(3) fits ``dst ~ s * r @ src + t``, same estimator as
+    ``evo``'s ``umeyama_alignment(with_scale=True)``.
+
+    Args:
+        src: (H, n, 3) points per hypothesis (estimated camera centres).
+        dst: (H, n, 3) corresponding points (reference camera centres).
+
+    Returns:
+        r (H, 3, 3), t (H, 3), s (H,), valid (H,) - invalid fits have a degenerate
+        (rank < 2) covariance and are the ones evo would reject.
+    """
+    mean_src = src.mean(axis=1, keepdims=True)
+    mean_dst = dst.mean(axis=1, keepdims=True)
+    src_c, dst_c = src - mean_src, dst - mean_dst
+    sigma_src = (src_c**2).sum(axis=(1, 2)) / src.shape[1]
+    cov = np.einsum("hni,hnj->hij", dst_c, src_c) / src.shape[1]
+    u, d, vt = np.linalg.svd(cov)
+    sign = np.ones((len(src), 3))
+    sign[:, 2] = np.where(np.linalg.det(u) * np.linalg.det(vt) < 0, -1.0, 1.0)
+    r = (u * sign[:, None, :]) @ vt
+    valid = (d > np.finfo(d.dtype).eps).sum(axis=1) >= 2
+    s = (d * sign).sum(axis=1) / np.where(sigma_src > 0, sigma_src, 1.0)
+    t = mean_dst[:, 0] - s[:, None] * np.einsum("hij,hj->hi", r, mean_src[:, 0])
+    return r, t, s, valid
+
+
+def _nearest_distances(query: np.ndarray, points: np.ndarray, chunk: int = 2048) -> np.ndarray:
+    """Distance from every query point to its nearest neighbour in ``points``."""
+    if cKDTree is not None:
+        return cKDTree(points).query(query, k=1)[0]
+    sq_points = (points**2).sum(axis=1)
+    out = np.empty(len(query))
+    for s in range(0, len(query), chunk):
+        q = query[s : s + chunk]
+        sq = (q**2).sum(axis=1)[:, None] + sq_points[None] - 2 * q @ points.T
+        out[s : s + chunk] = np.sqrt(np.maximum(sq.min(axis=1), 0))
+    return out
+
+
 def _median_nn_thresh(pose_ref, pose_est_aligned):
     P_ref = pose_ref[:, :3, 3]
     P_est = pose_est_aligned[:, :3, 3]
-    dists = []
-    for p in P_est:
-        dd = np.linalg.norm(P_ref - p[None, :], axis=1)
-        dists.append(dd.min())
-    return float(np.median(dists)) if dists else 0.0
+    if len(P_est) == 0:
+        return 0.0
+    return float(np.median(_nearest_distances(P_est, P_ref)))
 
 
 def _ransac_align_sim3(
     pose_ref, pose_est, sub_n=None, inlier_thresh=None, max_iters=10, random_state=None
 ):
+    """
+    RANSAC over camera centres: all ``max_iters`` hypotheses are sampled at once, fitted
+    with one batched Umeyama solve and scored with one broadcast over all poses.
+    """
     rng = np.random.default_rng(random_state)
     N = pose_ref.shape[0]
-    idx_all = np.arange(N)
     if sub_n is None:
         sub_n = max(3, (N + 1) // 2)
     else:
         sub_n = max(3, min(sub_n, N))
+    P_ref_all = pose_ref[:, :3, 3]
+    P_est_all = pose_est[:, :3, 3]
 
     # Pre-alignment + default threshold
-    r0, t0, s0, pose_est0 = _umeyama_sim3_from_paths(pose_ref, pose_est)
+    r0, t0, s0, _ = umeyama_sim3_batch(P_est_all[None], P_ref_all[None])
+    best_model = (r0[0], t0[0], s0[0])
     if inlier_thresh is None:
-        inlier_thresh = _median_nn_thresh(pose_ref, pose_est0)
+        inlier_thresh = _median_nn_thresh(pose_ref, _apply_sim3_to_poses(pose_est, *best_model))
 
-    P_ref_all = pose_ref[:, :3, 3]
+    # sub_n distinct indices per hypothesis
+    samples = np.argpartition(rng.random((max_iters, N)), sub_n - 1, axis=1)[:, :sub_n]
+    r, t, s, valid = umeyama_sim3_batch(P_est_all[samples], P_ref_all[samples])
+    P_h = s[:, None, None] * np.einsum("hij,nj->hni", r, P_est_all) + t[:, None]
+    errs = np.linalg.norm(P_h - P_ref_all[None], axis=-1)  # Match by same index, (H, N)
+    inliers = (errs <= inlier_thresh) & valid[:, None]
+    k = np.where(valid, inliers.sum(axis=1), -1)
+    mean_err = np.where(k > 0, (errs * inliers).sum(axis=1) / np.maximum(k, 1), np.inf)
 
-    best_model = (r0, t0, s0)
     best_inliers = None
-    best_score = (-1, np.inf)  # (num_inliers, mean_err)
-
-    for _ in range(max_iters):
-        sample = rng.choice(idx_all, size=sub_n, replace=False)
-        try:
-            r, t, s, _ = _umeyama_sim3_from_paths(pose_ref[sample], pose_est[sample])
-        except Exception:
-            continue
-        pose_h = _apply_sim3_to_poses(pose_est, r, t, s)
-        P_h = pose_h[:, :3, 3]
-        errs = np.linalg.norm(P_h - P_ref_all, axis=1)  # Match by same index
-        inliers = errs <= inlier_thresh
-        k = int(inliers.sum())
-        mean_err = float(errs[inliers].mean()) if k > 0 else np.inf
-        if (k > best_score[0]) or (k == best_score[0] and mean_err < best_score[1]):
-            best_score = (k, mean_err)
-            best_model = (r, t, s)
-            best_inliers = inliers
+    if valid.any():
+        # most inliers, then lowest mean error; first hypothesis wins ties
+        best = np.lexsort((mean_err, -k))[0]
+        best_model = (r[best], t[best], s[best])
+        best_inliers = inliers[best]
 
     # Fit again with best inliers
     if best_inliers is not None and best_inliers.sum() >= 3:
-        r, t, s, _ = _umeyama_sim3_from_paths(pose_ref[best_inliers], pose_est[best_inliers])
-    else:
-        r, t, s = best_model
+        r, t, s, _ = umeyama_sim3_batch(
+            P_est_all[best_inliers][None], P_ref_all[best_inliers][None]
+        )
+        return r[0], t[0], s[0]
+    r, t, s = best_model
     return r, t, s
 
 
@@ -12,7 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
+from collections import OrderedDict
 from math import isqrt
+import numpy as np
 import torch
 from einops import einsum
 
@@ -86,3 +89,107 @@ def rotate_sh(
             result.append(sh_rotated)
 
     return torch.cat(result, dim=-1)
+
+
+# LRU of block-diagonal Wigner-D matrices keyed by (rounded rotation, degree, device, dtype)
+SH_ROTATION_CACHE_SIZE = 1024
+_sh_rotation_cache: OrderedDict = OrderedDict()
+_sh_rotation_cache_lock = threading.Lock()  # the cache is shared by export threads
+
+
+def clear_sh_rotation_cache() -> None:
+    with _sh_rotation_cache_lock:
+        _sh_rotation_cache.clear()
+
+
+def _wigner_block_diag(
+    rotations: torch.Tensor,  # "batch 3 3"
+    sh_degree: int,
+    dtype: torch.dtype,
+) -> torch.Tensor:  # "batch n n"
+    """Block-diagonal SH rotation over all degrees up to ``sh_degree`` (same as ``rotate_sh``)."""
+    n = (sh_degree + 1) ** 2
+    device = rotations.device
+    with torch.autocast(device_type=device.type, enabled=False):
+        rotations_float32 = rotations.to(torch.float32)
+
+        # switch axes: yzx -> xyz
+        P = torch.tensor([[0, 0, 1], [1, 0, 0], [0, 1, 0]]).unsqueeze(0).to(rotations_float32)
+        permuted_rotations = torch.linalg.inv(P) @ rotations_float32 @ P
+        permuted_rotations_so3 = project_to_so3_strict(permuted_rotations)
+
+        alpha, beta, gamma = matrix_to_angles(permuted_rotations_so3)
+        out = torch.zeros((len(rotations), n, n), dtype=dtype, device=device)
+        for degree in range(sh_degree + 1):
+            with torch.device(device):
+                block = wigner_D(degree, alpha, -beta, gamma)
+            sl = slice(degree**2, (degree + 1) ** 2)
+            out[:, sl, sl] = block.reshape(-1, 2 * degree + 1, 2 * degree + 1).type(dtype)
+    return out
+
+
+def sh_rotation_matrices(
+    rotations: torch.Tensor,  # "*batch 3 3"
+    sh_degree: int,
+    dtype: torch.dtype = torch.float32,
+    use_cache: bool = True,
+) -> torch.Tensor:  # "*batch n n"
+    """
+    Block-diagonal Wigner-D matrices rotating SH coefficients of degree <= ``sh_degree``.
+
+    Matrices are computed once per distinct rotation and kept in an LRU cache (rotations
+    rounded to 1e-6), so repeated cameras, e.g. a fixed rig or a re-rendered trajectory,
+    skip e3nn entirely. Cached matrices carry no gradient; pass ``use_cache=False`` when
+    backpropagating into ``rotations``.
+    """
+    batch_shape = rotations.shape[:-2]
+    flat = rotations.reshape(-1, 3, 3)
+    n = (sh_degree + 1) ** 2
+    if not use_cache:
+        return _wigner_block_diag(flat, sh_degree, dtype).reshape(batch_shape + (n, n))
+
+    rounded = np.round(flat.detach().cpu().double().numpy(), 6) + 0.0  # fold -0.0 into 0.0
+    keys = [(r.tobytes(), sh_degree, str(flat.device), dtype) for r in rounded]
+    found, missing = {}, {}
+    with _sh_rotation_cache_lock:
+        for idx, key in enumerate(keys):
+            if key in _sh_rotation_cache:
+                _sh_rotation_cache.move_to_end(key)
+                found[key] = _sh_rotation_cache[key]
+            elif key not in missing:
+                missing[key] = idx
+    if missing:
+        # computed outside the lock; other threads may insert the same keys meanwhile
+        computed = _wigner_block_diag(flat[list(missing.values())], sh_degree, dtype)
+        found.update(zip(missing, computed))
+        with _sh_rotation_cache_lock:
+            for key in missing:
+                _sh_rotation_cache[key] = found[key]
+            while len(_sh_rotation_cache) > SH_ROTATION_CACHE_SIZE:
+                _sh_rotation_cache.popitem(last=False)
+    return torch.stack([found[key] for key in keys]).reshape(batch_shape + (n, n))
+
+
+def rotate_sh_grouped(
+    sh_coefficients: torch.Tensor,  # "*batch *group n"
+    rotations: torch.Tensor,  # "*batch 3 3"
+    use_cache: bool = True,
+) -> torch.Tensor:  # "*batch *group n"
+    """
+    Rotate many SH coefficient sets that share one rotation per batch element, e.g. all
+    pixels of a view. One block-diagonal Wigner-D matrix per rotation (cached, see
+    ``sh_rotation_matrices``) is applied to the whole group with a single batched matmul,
+    instead of being broadcast per coefficient set as in ``rotate_sh``.
+    """
+    batch_shape = rotations.shape[:-2]
+    n = sh_coefficients.shape[-1]
+    sh_flat = sh_coefficients.reshape(batch_shape.numel(), -1, n)
+    use_cache = use_cache and not (torch.is_grad_enabled() and rotations.requires_grad)
+    sh_rotations = sh_rotation_matrices(
+        rotations.reshape(-1, 3, 3),
+        isqrt(n) - 1,
+        dtype=sh_coefficients.dtype,
+        use_cache=use_cache,
+    )
+    # (group, n) @ (n, n)^T per rotation
+    return torch.bmm(sh_flat, sh_rotations.transpose(-1, -2)).reshape(sh_coefficients.shape)
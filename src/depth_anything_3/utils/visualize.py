@@ -12,6 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Optional
 import matplotlib
 import numpy as np
 import torch
@@ -78,22 +82,150 @@ def visualize_depth(
         return img_colored_np
 
 
-# GS video rendering visulization function, since it operates in Tensor space...
+@lru_cache(maxsize=16)
+def colormap_lut(cmap: str = "Spectral", size: int = 256) -> np.ndarray:
+    """
+    Precomputed uint8 lookup table of a Matplotlib colormap.
 
+    Entry ``i`` equals ``visualize_depth``'s colour for normalized values in
+    ``[i / size, (i + 1) / size)``; with ``size=256`` (the resolution of Matplotlib's
+    built-in colormaps) this reproduces it exactly.
 
-def vis_depth_map_tensor(
-    result: torch.Tensor,  # "*batch height width"
-    color_map: str = "Spectral",
-) -> torch.Tensor:  # "*batch 3 height with"
+    Returns:
+        Read-only (size, 3) uint8 array
     """
-    Color-map the depth map.
+    lut = matplotlib.colormaps[cmap]((np.arange(size) + 0.5) / size)[:, :3]
+    lut = (lut * 255.0).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+
+@lru_cache(maxsize=16)
+def _packed_colormap_lut(cmap: str, size: int) -> np.ndarray:
+    """``colormap_lut`` as one uint32 per entry, so a lookup gathers 4 bytes at once."""
+    rgbx = np.zeros((size, 4), dtype=np.uint8)
+    rgbx[:, :3] = colormap_lut(cmap, size)
+    return rgbx.view(np.uint32)[:, 0]
+
+
+def _subsample(depth: np.ndarray, num_samples: int) -> np.ndarray:
+    """Strided subsample of the last two axes keeping about ``num_samples`` pixels."""
+    stride = max(1, int(np.ceil(np.sqrt(depth.size / max(num_samples, 1)))))
+    return np.asarray(depth[..., ::stride, ::stride])
+
+
+def inverse_depth_range(
+    depth: np.ndarray, percentile: float = 2, num_samples: int | None = 100_000
+) -> tuple[float, float]:
     """
+    Normalization range of ``visualize_depth``: the ``percentile`` and ``100 - percentile``
+    percentiles of the valid inverse depth, estimated from about ``num_samples`` pixels
+    (all pixels if None). ``depth`` may hold one frame or a stack sharing one range.
+    """
+    if num_samples is not None:
+        depth = _subsample(depth, num_samples)
+    depth = np.asarray(depth, dtype=np.float32)
+    valid = depth[depth > 0]
+    if valid.size <= 10:
+        depth_min = depth_max = 0.0
+    else:
+        depth_min, depth_max = np.percentile(1 / valid, [percentile, 100 - percentile])
+    if depth_min == depth_max:
+        depth_min, depth_max = depth_min - 1e-6, depth_max + 1e-6
+    return float(depth_min), float(depth_max)
+
+
+def visualize_depth_lut(
+    depth: np.ndarray,
+    depth_min: float,
+    depth_max: float,
+    cmap: str = "Spectral",
+    lut_size: int = 256,
+) -> np.ndarray:
+    """
+    Colour-map depth over a fixed inverse-depth range through ``colormap_lut``.
+
+    Same mapping as ``visualize_depth`` (near = low end of the colormap, far and invalid
+    depth = high end) but in float32 with a single table gather instead of a float64
+    colormap evaluation.
+
+    Args:
+        depth: (..., H, W) depth
+        depth_min, depth_max: Inverse-depth range, e.g. from ``inverse_depth_range``
+
+    Returns:
+        (..., H, W, 3) uint8 colours (a view into an RGBX buffer)
+    """
+    depth = np.asarray(depth, dtype=np.float32)
+    inv = np.zeros_like(depth)
+    np.divide(1, depth, out=inv, where=depth > 0)
+    # index = floor((1 - clip(t, 0, 1)) * size), clipped to the last entry
+    scale = np.float32(lut_size / (depth_max - depth_min))
+    inv -= np.float32(depth_min)
+    inv *= -scale
+    inv += np.float32(lut_size)
+    np.clip(inv, 0, lut_size - 1, out=inv)
+    rgbx = _packed_colormap_lut(cmap, lut_size)[inv.astype(np.intp)]
+    return rgbx.view(np.uint8).reshape(depth.shape + (4,))[..., :3]
+
+
+def visualize_depth_batch(
+    depth: np.ndarray,
+    percentile: float = 2,
+    scene_range: bool = False,
+    cmap: str = "Spectral",
+    lut_size: int = 256,
+    num_samples: int | None = 100_000,
+) -> np.ndarray:
+    """
+    Batched ``visualize_depth`` for (N, H, W) depth.
+
+    Args:
+        scene_range: Use one inverse-depth range for the whole batch (colours comparable
+            across frames) instead of one range per frame.
+        num_samples: Pixels sampled per range estimate; None uses every pixel.
+
+    Returns:
+        (N, H, W, 3) uint8 colours
+    """
+    out = np.empty(depth.shape + (3,), dtype=np.uint8)
+    if scene_range:
+        depth_range = inverse_depth_range(depth, percentile, num_samples)
+    for i in range(len(depth)):
+        if not scene_range:
+            depth_range = inverse_depth_range(depth[i], percentile, num_samples)
+        out[i] = visualize_depth_lut(depth[i], *depth_range, cmap=cmap, lut_size=lut_size)
+    return out
+
+
+# GS video rendering visulization function, since it operates in Tensor space...
+
+
+def depth_map_log_range(
+    result: torch.Tensor,  # "*batch height width"
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Log-depth (near, far) used by ``vis_depth_map_tensor``: the 1% / 99% quantiles."""
     far = result.reshape(-1)[:16_000_000].float().quantile(0.99).log().to(result)
     try:
         near = result[result > 0][:16_000_000].float().quantile(0.01).log().to(result)
     except (RuntimeError, ValueError) as e:
         logger.error(f"No valid depth values found. Reason: {e}")
         near = torch.zeros_like(far)
+    return near, far
+
+
+def vis_depth_map_tensor(
+    result: torch.Tensor,  # "*batch height width"
+    color_map: str = "Spectral",
+    near_far: Optional[tuple[torch.Tensor, torch.Tensor]] = None,
+) -> torch.Tensor:  # "*batch 3 height with"
+    """
+    Color-map the depth map.
+
+    ``near_far`` fixes the log-depth range (see ``depth_map_log_range``), e.g. to keep
+    colours consistent across separately visualized chunks of one video.
+    """
+    near, far = depth_map_log_range(result) if near_far is None else near_far
     result = result.log()
     result = (result - near) / (far - near)
     return apply_color_map_to_image(result, color_map)
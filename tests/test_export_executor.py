@@ -0,0 +1,77 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import numpy as np
+import pytest
+
+from depth_anything_3.specs import Prediction
+from depth_anything_3.utils.export import export
+from depth_anything_3.utils.parallel_utils import (
+    ExportExecutor,
+    async_call,
+    get_export_executor,
+    parallel_execution,
+    set_export_executor,
+)
+
+
+@pytest.fixture
+def executor(request):
+    """Install a tightly bounded export executor for one test."""
+    previous = get_export_executor()
+    executor = set_export_executor(ExportExecutor(max_workers=1, **request.param))
+    yield executor
+    set_export_executor(previous)
+
+
+def _prediction(num_frames=4, h=8, w=10):
+    rng = np.random.default_rng(0)
+    return Prediction(
+        depth=rng.uniform(1, 2, (num_frames, h, w)).astype(np.float32),
+        is_metric=0,
+        conf=rng.uniform(0, 1, (num_frames, h, w)).astype(np.float32),
+        extrinsics=np.tile(np.eye(4, dtype=np.float32)[:3], (num_frames, 1, 1)),
+        intrinsics=np.tile(np.eye(3, dtype=np.float32), (num_frames, 1, 1)),
+        processed_images=rng.integers(0, 255, (num_frames, h, w, 3), dtype=np.uint8),
+    )
+
+
+LIMITS = [{"max_in_flight": 1}, {"max_in_flight": 4, "max_inflight_bytes": 1}]
+
+
+@pytest.mark.parametrize("executor", LIMITS, indirect=True)
+def test_nested_jobs_from_helper_threads_run_inline(executor):
+    @async_call
+    def double(x):
+        return 2 * x
+
+    def job():
+        futures = parallel_execution([1, 2, 3], action=double, num_processes=3)
+        return [future.result() for future in futures]
+
+    future = executor.submit(job)
+    assert executor.wait(timeout=10)
+    assert future.result() == [2, 4, 6]
+
+
+@pytest.mark.parametrize("executor", LIMITS, indirect=True)
+def test_multi_format_export_inside_executor(executor, tmp_path):
+    prediction = _prediction()
+    future = executor.submit(export, prediction, "mini_npz-npz", str(tmp_path))
+    assert executor.wait(timeout=30)
+    future.result()
+    for name in ("mini_npz", "npz"):
+        results = np.load(os.path.join(tmp_path, "exports", name, "results.npz"))
+        np.testing.assert_allclose(results["depth"], np.round(prediction.depth, 6))